@@ -0,0 +1,59 @@
+"""Benchmarks of :py:mod:`df_script_parser.processors.dict_processors`
+"""
+import libcst as cst
+import pytest
+
+from df_script_parser.processors.dict_processors import CHECK_MODES, Disambiguator, NodeProcessor, is_correct
+from df_script_parser.utils.code_wrappers import Python, StringTag
+
+
+def _collect_values(obj, values):
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            _collect_values(key, values)
+            _collect_values(value, values)
+    elif isinstance(obj, (list, tuple)):
+        for element in obj:
+            _collect_values(element, values)
+    elif isinstance(obj, StringTag):
+        values.append(obj.display_value)
+    return values
+
+
+@pytest.fixture(scope="module")
+def script_node(corpus_module):
+    for statement in corpus_module.body:
+        if isinstance(statement, cst.SimpleStatementLine) and isinstance(statement.body[0], cst.Assign):
+            assign = statement.body[0]
+            if isinstance(assign.value, cst.Dict) and assign.targets[0].target.value == "script":
+                return assign.value
+    raise ValueError("Corpus has no script")
+
+
+@pytest.mark.benchmark(group="is_correct")
+def bench_is_correct(benchmark, corpus_namespace):
+    names = list(corpus_namespace)
+    values = _collect_values(corpus_namespace.names[Python("script")], [])
+    benchmark.extra_info["values"] = len(values)
+    benchmark(lambda: [is_correct(names, value) for value in values])
+
+
+@pytest.mark.benchmark(group="NodeProcessor.process")
+@pytest.mark.parametrize("check_mode", CHECK_MODES)
+def bench_node_processor(benchmark, corpus_namespace, script_node, check_mode):
+    node_processor = NodeProcessor(corpus_namespace, check_mode=check_mode)
+    benchmark(node_processor.process, script_node)
+
+
+@pytest.mark.benchmark(group="Disambiguator")
+@pytest.mark.parametrize("check_mode", CHECK_MODES)
+def bench_disambiguator(benchmark, corpus_script, check_mode):
+    names = corpus_script["namespaces"]["main"]
+
+    def _disambiguate():
+        disambiguator = Disambiguator(check_mode)
+        for name, value in names.items():
+            disambiguator(value)
+            disambiguator.add_name(name)
+
+    benchmark(_disambiguate)
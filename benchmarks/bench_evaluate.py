@@ -0,0 +1,42 @@
+"""Benchmarks of :py:func:`df_script_parser.utils.convenience_functions.evaluate`
+"""
+import libcst as cst
+import pytest
+
+from df_script_parser.utils.convenience_functions import evaluate
+
+
+class _NodeCollector(cst.CSTVisitor):
+    """Collect nodes :py:func:`evaluate` is called on during parsing"""
+
+    def __init__(self):
+        super().__init__()
+        self.nodes = []
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        if isinstance(node, (cst.Name, cst.Attribute, cst.Call, cst.SimpleString, cst.Subscript)):
+            self.nodes.append(node)
+        return True
+
+
+@pytest.fixture(scope="module")
+def nodes(corpus_module):
+    collector = _NodeCollector()
+    corpus_module.visit(collector)
+    return collector.nodes
+
+
+def _evaluate_with_new_module(node: cst.CSTNode) -> str:
+    """Implementation of :py:func:`evaluate` that parses an empty module on every call"""
+    return cst.parse_module("").code_for_node(node)
+
+
+@pytest.mark.benchmark(group="evaluate")
+def bench_evaluate(benchmark, nodes):
+    result = benchmark(lambda: [evaluate(node) for node in nodes])
+    assert result == [_evaluate_with_new_module(node) for node in nodes]
+
+
+@pytest.mark.benchmark(group="evaluate")
+def bench_evaluate_with_new_module(benchmark, nodes):
+    benchmark(lambda: [_evaluate_with_new_module(node) for node in nodes])
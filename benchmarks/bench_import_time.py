@@ -0,0 +1,38 @@
+"""Benchmarks of the cli startup time
+
+``extra_info`` stores cumulative import times reported by ``python -X importtime``.
+The budget of the import time is enforced by ``tests/test_import_time.py``.
+"""
+import subprocess
+import sys
+
+import pytest
+
+COMMANDS = {
+    "import": "import df_script_parser",
+    "py2yaml --help": "from df_script_parser import py2yaml_cli; sys.argv = ['py2yaml', '--help']; py2yaml_cli()",
+    "yaml2py --help": "from df_script_parser import yaml2py_cli; sys.argv = ['yaml2py', '--help']; yaml2py_cli()",
+}
+
+REPORTED_MODULES = ["df_script_parser", "df_script_parser.cli", "ruamel.yaml"]
+
+
+@pytest.mark.benchmark(group="import-time")
+@pytest.mark.parametrize("command", list(COMMANDS))
+def bench_import_time(benchmark, command):
+    def _run():
+        return subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import sys; " + COMMANDS[command]],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        ).stderr
+
+    importtime = benchmark.pedantic(_run, rounds=5)
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")  # noqa: E203
+        if module.strip() in REPORTED_MODULES:
+            benchmark.extra_info[module.strip() + "_us"] = int(cumulative)
@@ -0,0 +1,96 @@
+"""Memory benchmarks of parsed scripts
+"""
+import gc
+import sys
+import tracemalloc
+import typing as tp
+
+import pytest
+
+from df_script_parser.processors.recursive_parser import RecursiveParser
+from df_script_parser.utils.code_wrappers import StringTag
+from df_script_parser.utils.namespaces import Call
+
+FLOWS = 2
+NODES_PER_FLOW = 25
+
+
+def _generate_script(flows: int, nodes_per_flow: int) -> str:
+    """Generate a script with common references in every node"""
+    lines = [
+        "from df_engine.core.keywords import TRANSITIONS, RESPONSE, MISC",
+        "from df_engine.core import Actor",
+        "import df_engine.conditions as cnd",
+        "import df_engine.labels as lbl",
+        "",
+        "script = {",
+    ]
+    for flow in range(flows):
+        lines.append(f"    'flow_{flow}': {{")
+        for node in range(nodes_per_flow):
+            lines.extend(
+                [
+                    f"        'node_{node}': {{",
+                    f"            RESPONSE: 'Response of node {node} in flow {flow}',",
+                    "            TRANSITIONS: {",
+                    f"                ('flow_{flow}', 'node_{(node + 1) % nodes_per_flow}'): cnd.regexp(r'next'),",
+                    "                lbl.repeat(): cnd.true(),",
+                    "                lbl.to_fallback(): cnd.regexp(r'stop'),",
+                    "            },",
+                    "            MISC: {'var': 'value'},",
+                    "        },",
+                ]
+            )
+        lines.append("    },")
+    lines.extend(
+        [
+            "}",
+            "",
+            "actor = Actor(script=script, start_label=('flow_0', 'node_0'), fallback_label=('flow_0', 'node_1'))",
+        ]
+    )
+    return "\n".join(lines) + "\n"
+
+
+def _value_objects_size() -> tp.Tuple[int, int]:
+    """Get the number and the total size of live value objects including their ``__dict__``"""
+    count = size = 0
+    for obj in gc.get_objects():
+        if isinstance(obj, (StringTag, Call)):
+            count += 1
+            size += sys.getsizeof(obj)
+            if hasattr(obj, "__dict__"):
+                size += sys.getsizeof(obj.__dict__)
+    return count, size
+
+
+@pytest.fixture(scope="module")
+def project(tmp_path_factory):
+    project_dir = tmp_path_factory.mktemp("project")
+    (project_dir / "main.py").write_text(_generate_script(FLOWS, NODES_PER_FLOW), encoding="utf-8")
+    return project_dir
+
+
+def bench_parsed_script_memory(benchmark, project):
+    def _parse():
+        recursive_parser = RecursiveParser(project)
+        recursive_parser.parse_project_dir(project / "main.py")
+        return recursive_parser
+
+    _parse()  # warm up module level caches so that only the parsed script is measured
+    gc.collect()
+    tracemalloc.start()
+    try:
+        recursive_parser = _parse()
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    value_objects, value_objects_bytes = _value_objects_size()
+    del recursive_parser
+
+    benchmark.extra_info["retained_bytes"] = retained
+    benchmark.extra_info["peak_bytes"] = peak
+    benchmark.extra_info["value_objects"] = value_objects
+    benchmark.extra_info["value_objects_bytes"] = value_objects_bytes
+    benchmark.pedantic(_parse, rounds=1)
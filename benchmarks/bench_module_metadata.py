@@ -0,0 +1,33 @@
+"""Benchmarks of :py:func:`df_script_parser.utils.module_metadata.get_module_info`
+"""
+from pathlib import Path
+
+import pytest
+
+from df_script_parser.utils.module_metadata import get_module_info, module_info_cache
+
+CORPUS_PROJECT_DIR = Path(__file__).parent / "corpus" / "python_files"
+
+MODULES = [
+    "df_engine.core.keywords",
+    "df_engine.conditions",
+    "df_engine.labels",
+    "df_engine.core",
+    "re",
+    "typing",
+    "flow",
+    "functions",
+]
+
+
+@pytest.mark.benchmark(group="get_module_info")
+@pytest.mark.parametrize("cached", [False, True])
+def bench_get_module_info(benchmark, cached):
+    inside_dir = CORPUS_PROJECT_DIR.absolute()
+
+    def _get_module_info():
+        if not cached:
+            module_info_cache.clear()
+        return [get_module_info(module, inside_dir) for module in MODULES]
+
+    benchmark(_get_module_info)
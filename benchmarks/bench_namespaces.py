@@ -0,0 +1,43 @@
+"""Benchmarks of name resolution in :py:class:`df_script_parser.utils.namespaces.Namespace` and
+:py:class:`df_script_parser.processors.recursive_parser.RecursiveParser`
+"""
+import pytest
+
+from df_script_parser.utils.code_wrappers import Python
+from df_script_parser.utils.namespaces import Request
+
+
+def _collect_names(obj, names):
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            _collect_names(key, names)
+            _collect_names(value, names)
+    elif isinstance(obj, Python):
+        names.append(obj.display_value)
+    return names
+
+
+@pytest.mark.benchmark(group="Namespace.get_absolute_name")
+def bench_get_absolute_name(benchmark, corpus_namespace):
+    names = _collect_names(corpus_namespace.names[Python("script")], [])
+    benchmark.extra_info["names"] = len(names)
+
+    def _get_absolute_names():
+        # memoized names are dropped to measure resolution
+        corpus_namespace.absolute_names.clear()
+        return [corpus_namespace.get_absolute_name(name) for name in names]
+
+    benchmark(_get_absolute_names)
+
+
+@pytest.mark.benchmark(group="RecursiveParser.get_object")
+def bench_get_object(benchmark, corpus_parser):
+    names = ["main.script", "main.global_flow", "flow.global_flow", "main.actor"]
+    requests = [Request.from_str(name) for name in names]
+
+    def _get_objects():
+        # memoized objects are dropped to measure resolution
+        corpus_parser.resolved.clear()
+        return [corpus_parser.get_object(request) for request in requests]
+
+    benchmark(_get_objects)
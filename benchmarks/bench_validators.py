@@ -0,0 +1,15 @@
+"""Benchmarks of :py:func:`df_script_parser.utils.validators.validate_path`
+"""
+import pytest
+
+from df_script_parser.utils.code_wrappers import Python
+from df_script_parser.utils.validators import validate_path
+
+
+@pytest.mark.benchmark(group="validate_path")
+def bench_validate_path(benchmark, corpus_parser, corpus_namespace):
+    paths = []
+    script = corpus_namespace.names[Python("script")]
+    corpus_parser.traverse_dict(script, lambda path, value: paths.append((list(path), value)))
+    benchmark.extra_info["paths"] = len(paths)
+    benchmark(lambda: [validate_path(path, value) for path, value in paths])
@@ -0,0 +1,112 @@
+"""Benchmarks of yaml dumpers | loaders in :py:data:`df_script_parser.dumpers_loaders.YAML_MODES`
+"""
+from io import StringIO
+
+import pytest
+
+from df_script_parser.dumpers_loaders import HAS_C_YAML, YAML_MODES, YamlStreamReader, get_yaml_dumper_loader
+from df_script_parser.utils.code_wrappers import Python, String
+from df_script_parser.utils.namespaces import ActorTag, AltName, Call, From, Import, NamespaceTag
+
+FLOWS = 10
+NODES_PER_FLOW = 50
+
+TAG_OBJECTS = 1000
+"""Number of objects of a single tag class dumped and loaded by :py:func:`bench_yaml_tag_dump`
+and :py:func:`bench_yaml_tag_load`"""
+
+TAG_FACTORIES = {
+    "String": lambda index: String(f"Response {index}"),
+    "Python": lambda index: Python(f"cnd.regexp(r'{index}')", show_yaml_tag=True),
+    "NamespaceTag": lambda index: NamespaceTag(f"flows.flow_{index}", show_yaml_tag=True),
+    "From": lambda index: From("df_engine.core.keywords", f"KEYWORD_{index}"),
+    "Import": lambda index: Import(f"module_{index}"),
+    "AltName": lambda index: AltName(f"name_{index}", show_yaml_tag=True),
+    "ActorTag": lambda index: ActorTag(f"actor_{index}", show_yaml_tag=True),
+    "Call": lambda index: Call("Actor", {"script": Python(f"script_{index}"), "start_label": ["flow", "node"]}),
+}
+
+
+def _generate_project(flows: int, nodes_per_flow: int) -> dict:
+    """Generate parser output with common references in every node"""
+    script = {}
+    for flow in range(flows):
+        nodes = {}
+        for node in range(nodes_per_flow):
+            nodes[Python(f"node_{node}")] = {
+                Python("RESPONSE"): String(f"Response of node {node} in flow {flow}"),
+                Python("TRANSITIONS"): {
+                    Python(f"('flow_{flow}', 'node_{(node + 1) % nodes_per_flow}')"): Python("cnd.regexp(r'next')"),
+                    Python("lbl.repeat()"): Python("cnd.true()"),
+                },
+                Python("MISC"): {String("var"): String("value")},
+            }
+        script[Python(f"flow_{flow}")] = nodes
+    names = {
+        "RESPONSE": From("df_engine.core.keywords", "RESPONSE"),
+        "TRANSITIONS": From("df_engine.core.keywords", "TRANSITIONS"),
+        "MISC": From("df_engine.core.keywords", "MISC"),
+        "Actor": From("df_engine.core", "Actor"),
+        "cnd": Import("df_engine.conditions"),
+        "lbl": Import("df_engine.labels"),
+        "script": script,
+        "actor": Call("Actor", {"script": Python("script"), "start_label": ["flow_0", "node_0"]}),
+    }
+    return {"requirements": ["df-engine==0.9.0"], "namespaces": {NamespaceTag("main"): names}}
+
+
+@pytest.fixture(scope="module")
+def document():
+    buffer = StringIO()
+    get_yaml_dumper_loader().dump(_generate_project(FLOWS, NODES_PER_FLOW), buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.benchmark(group="yaml-load")
+@pytest.mark.parametrize("mode", YAML_MODES)
+def bench_yaml_load(benchmark, document, mode):
+    benchmark.extra_info["c_extension"] = HAS_C_YAML
+    benchmark.extra_info["document_bytes"] = len(document)
+    namespaces = benchmark(lambda: list(YamlStreamReader(StringIO(document), mode).namespaces()))
+    assert len(namespaces) == 1
+
+
+@pytest.mark.benchmark(group="yaml-dump")
+@pytest.mark.parametrize("mode", YAML_MODES)
+def bench_yaml_dump(benchmark, document, mode):
+    """Dumping is checked to produce the same text in both modes"""
+    project = _generate_project(FLOWS, NODES_PER_FLOW)
+    dumper_loader = get_yaml_dumper_loader(mode)
+    benchmark.extra_info["c_extension"] = HAS_C_YAML
+
+    def _dump():
+        buffer = StringIO()
+        dumper_loader.dump(project, buffer)
+        return buffer.getvalue()
+
+    assert benchmark(_dump) == document
+
+
+@pytest.mark.benchmark(group="yaml-tag-dump")
+@pytest.mark.parametrize("tag_class", list(TAG_FACTORIES))
+def bench_yaml_tag_dump(benchmark, tag_class):
+    objects = [TAG_FACTORIES[tag_class](index) for index in range(TAG_OBJECTS)]
+    dumper_loader = get_yaml_dumper_loader()
+
+    def _dump():
+        buffer = StringIO()
+        dumper_loader.dump(objects, buffer)
+        return buffer.getvalue()
+
+    benchmark(_dump)
+
+
+@pytest.mark.benchmark(group="yaml-tag-load")
+@pytest.mark.parametrize("tag_class", list(TAG_FACTORIES))
+def bench_yaml_tag_load(benchmark, tag_class):
+    dumper_loader = get_yaml_dumper_loader()
+    buffer = StringIO()
+    dumper_loader.dump([TAG_FACTORIES[tag_class](index) for index in range(TAG_OBJECTS)], buffer)
+    document = buffer.getvalue()
+    objects = benchmark(dumper_loader.load, document)
+    assert isinstance(objects[0], type(TAG_FACTORIES[tag_class](0)))
@@ -0,0 +1,41 @@
+"""Fixtures shared by the benchmarks
+
+Benchmarks run against the project in ``benchmarks/corpus/python_files``.
+``benchmarks/corpus/script.yaml`` is the output of :py:func:`df_script_parser.tools.py2yaml` for that project.
+"""
+from pathlib import Path
+
+import libcst as cst
+import pytest
+
+from df_script_parser.dumpers_loaders import yaml_dumper_loader
+from df_script_parser.processors.recursive_parser import RecursiveParser
+from df_script_parser.utils.namespaces import NamespaceTag
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+CORPUS_PROJECT_DIR = CORPUS_DIR / "python_files"
+CORPUS_ROOT_FILE = CORPUS_PROJECT_DIR / "main.py"
+CORPUS_SCRIPT = CORPUS_DIR / "script.yaml"
+
+
+@pytest.fixture(scope="session")
+def corpus_module() -> cst.Module:
+    return cst.parse_module(CORPUS_ROOT_FILE.read_text(encoding="utf-8"))
+
+
+@pytest.fixture(scope="session")
+def corpus_parser() -> RecursiveParser:
+    recursive_parser = RecursiveParser(CORPUS_PROJECT_DIR.absolute())
+    recursive_parser.parse_project_dir(CORPUS_ROOT_FILE.absolute())
+    return recursive_parser
+
+
+@pytest.fixture(scope="session")
+def corpus_namespace(corpus_parser):
+    return corpus_parser.namespaces[NamespaceTag("main")]
+
+
+@pytest.fixture(scope="session")
+def corpus_script():
+    with open(CORPUS_SCRIPT, "r", encoding="utf-8") as infile:
+        return yaml_dumper_loader.load(infile)
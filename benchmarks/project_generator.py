@@ -0,0 +1,216 @@
+"""Generator of synthetic dff projects shaped like ``examples/example_py2yaml``
+
+A generated project consists of:
+
+- ``main.py``: imports every flow, assembles them into ``script`` and creates an ``Actor``
+- ``flows_<file>.py``: flows of the project and a ``MISC`` dictionary shared with other files
+- ``functions.py``: a processing function used by every node
+
+Nodes of a flow transition to the next node of the flow, to the first node of a flow in the next file
+and to the fallback node. ``MISC`` of every node is nested ``depth`` levels deep and references
+shared dictionaries of up to ``references`` previous files
+(files are imported only by files with greater indices so that there are no import cycles).
+
+Run ``python benchmarks/project_generator.py --help`` to generate a project from the command line.
+"""
+import argparse
+import typing as tp
+from pathlib import Path
+
+
+class ProjectShape(tp.NamedTuple):
+    """Size of a synthetic project
+
+    :param files: Number of flow files
+    :type files: int
+    :param flows_per_file: Number of flows in each file
+    :type flows_per_file: int
+    :param nodes_per_flow: Number of nodes in each flow
+    :type nodes_per_flow: int
+    :param depth: Nesting depth of the ``MISC`` dictionary of every node
+    :type depth: int
+    :param references: Number of other files whose shared dictionaries are referenced by every node
+    :type references: int
+    """
+
+    files: int = 4
+    flows_per_file: int = 2
+    nodes_per_flow: int = 10
+    depth: int = 2
+    references: int = 1
+
+
+def _flow_name(file: int, flow: int) -> str:
+    return f"flow_{file}_{flow}"
+
+
+def _nested_misc(
+    file: int, flow: int, node: int, depth: int, referenced_files: tp.List[int], indent: str
+) -> tp.List[str]:
+    lines = [f"{indent}MISC: {{", f'{indent}    "var": "{file}_{flow}_{node}",']
+    lines.extend(f'{indent}    "shared_{other}": shared_misc_{other},' for other in referenced_files)
+    for level in range(depth):
+        lines.append(f'{indent}{"    " * (level + 1)}"level_{level}": {{')
+        lines.append(f'{indent}{"    " * (level + 2)}"value": {level},')
+    lines.append(f'{indent}{"    " * (depth + 1)}"leaf": "node_{node}",')
+    for level in reversed(range(depth)):
+        lines.append(f'{indent}{"    " * (level + 1)}}},')
+    lines.append(f"{indent}}},")
+    return lines
+
+
+def _referenced_files(file: int, shape: ProjectShape) -> tp.List[int]:
+    """Files referenced by ``file``: up to ``shape.references`` preceding files"""
+    return list(range(max(0, file - shape.references), file))
+
+
+def generate_functions_file() -> str:
+    """Generate contents of ``functions.py``
+
+    :return: Contents of the file
+    :rtype: str
+    """
+    return "\n".join(
+        [
+            "from df_engine.core import Actor, Context",
+            "",
+            "",
+            "def add_prefix(prefix):",
+            "    def add_prefix_processing(ctx: Context, actor: Actor, *args, **kwargs) -> Context:",
+            '        processed_node = ctx.a_s.get("processed_node", ctx.a_s["next_node"])',
+            '        processed_node.response = f"{prefix}: {processed_node.response}"',
+            '        ctx.a_s["processed_node"] = processed_node',
+            "        return ctx",
+            "",
+            "    return add_prefix_processing",
+            "",
+        ]
+    )
+
+
+def generate_flow_file(file: int, shape: ProjectShape) -> str:
+    """Generate contents of ``flows_<file>.py``
+
+    :param file: Index of the file
+    :type file: int
+    :param shape: Size of the project
+    :type shape: :py:class:`ProjectShape`
+    :return: Contents of the file
+    :rtype: str
+    """
+    referenced_files = _referenced_files(file, shape)
+    lines = [
+        "from df_engine.core.keywords import TRANSITIONS, RESPONSE, PROCESSING, MISC",
+        "import df_engine.conditions as cnd",
+        "import df_engine.labels as lbl",
+        "import re",
+        "",
+        "from functions import add_prefix",
+        *[f"from flows_{other} import shared_misc_{other}" for other in referenced_files],
+        "",
+        "",
+        f'shared_misc_{file} = {{"file": "flows_{file}", "prefix": "l{file}"}}',
+    ]
+    next_file = (file + 1) % shape.files
+    for flow in range(shape.flows_per_file):
+        lines.extend(["", f"{_flow_name(file, flow)} = {{"])
+        for node in range(shape.nodes_per_flow):
+            next_node = (node + 1) % shape.nodes_per_flow
+            lines.extend(
+                [
+                    f'    "node_{node}": {{',
+                    f'        RESPONSE: "Response of node {node} in flow {flow} of file {file}",',
+                    "        TRANSITIONS: {",
+                    f'            "node_{next_node}": cnd.regexp(r"next", re.IGNORECASE),',
+                    f'            ("{_flow_name(next_file, flow)}", "node_0", 0.5): cnd.regexp(r"switch {file}"),',
+                    '            lbl.repeat(0.2): cnd.regexp(r"repeat"),',
+                    "            lbl.to_fallback(0.1): cnd.true(),",
+                    "        },",
+                    f'        PROCESSING: {{1: add_prefix("l{file}_{flow}_{node}")}},',
+                    *_nested_misc(file, flow, node, shape.depth, referenced_files, "        "),
+                    "    },",
+                ]
+            )
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_main_file(shape: ProjectShape) -> str:
+    """Generate contents of ``main.py``
+
+    :param shape: Size of the project
+    :type shape: :py:class:`ProjectShape`
+    :return: Contents of the file
+    :rtype: str
+    """
+    lines = [
+        "from df_engine.core.keywords import TRANSITIONS, GLOBAL",
+        "from df_engine.core import Actor as Act",
+        "import df_engine.conditions as cnd",
+        "import df_engine.labels as lbl",
+    ]
+    for file in range(shape.files):
+        flows = ", ".join(_flow_name(file, flow) for flow in range(shape.flows_per_file))
+        lines.append(f"from flows_{file} import {flows}")
+    lines.extend(
+        [
+            "",
+            "",
+            "script = {",
+            "    GLOBAL: {TRANSITIONS: {lbl.to_fallback(0.1): cnd.true()}},",
+            '    "global_flow": {',
+            '        "start_node": {TRANSITIONS: {("flow_0_0", "node_0"): cnd.true()}},',
+            '        "fallback_node": {TRANSITIONS: {lbl.previous(): cnd.regexp(r"previous")}},',
+            "    },",
+        ]
+    )
+    for file in range(shape.files):
+        for flow in range(shape.flows_per_file):
+            lines.append(f'    "{_flow_name(file, flow)}": {_flow_name(file, flow)},')
+    lines.extend(
+        [
+            "}",
+            "",
+            "actor = Act(",
+            '    fallback_label=("global_flow", "fallback_node"),',
+            "    script=script,",
+            '    start_label=("global_flow", "start_node"),',
+            ")",
+        ]
+    )
+    return "\n".join(lines) + "\n"
+
+
+def generate_project(directory: Path, shape: ProjectShape) -> Path:
+    """Write a synthetic project to a directory
+
+    :param directory: Directory to write the project to, created if it does not exist
+    :type directory: :py:class:`pathlib.Path`
+    :param shape: Size of the project
+    :type shape: :py:class:`ProjectShape`
+    :return: Path to the root file of the project
+    :rtype: :py:class:`pathlib.Path`
+    """
+    if shape.files < 1 or shape.flows_per_file < 1 or shape.nodes_per_flow < 1:
+        raise ValueError(f"Project must have at least one file, flow and node: {shape}")
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "functions.py").write_text(generate_functions_file(), encoding="utf-8")
+    for file in range(shape.files):
+        (directory / f"flows_{file}.py").write_text(generate_flow_file(file, shape), encoding="utf-8")
+    root_file = directory / "main.py"
+    root_file.write_text(generate_main_file(shape), encoding="utf-8")
+    return root_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic dff project.")
+    parser.add_argument("directory", metavar="DIRECTORY", help="Directory to write the project to", type=Path)
+    for field, default in ProjectShape._field_defaults.items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, default=default)
+    args = vars(parser.parse_args())
+    directory = args.pop("directory")
+    print(generate_project(directory, ProjectShape(**args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Scaling benchmark of :py:func:`df_script_parser.tools.py2yaml` and :py:func:`df_script_parser.tools.yaml2py`
+
+Synthetic projects (see :py:mod:`project_generator`) are generated for a grid of sizes:
+every dimension of :py:class:`project_generator.ProjectShape` is varied while the other dimensions
+keep their base values. Both directions are run in a separate process for every project to record
+wall time, peak RSS and output size. Peak RSS includes the interpreter and the imported modules.
+
+The report contains every measurement and, for every dimension, the exponent of the fitted power law
+``metric ~ size ** exponent``. With ``--check`` the driver exits with a non-zero code if the exponent
+of the wall time exceeds the expected complexity class of the dimension (see :py:data:`EXPECTED_COMPLEXITY`).
+
+Run ``python benchmarks/scaling.py --help`` for the list of options.
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import typing as tp
+from pathlib import Path
+
+from project_generator import ProjectShape, generate_project
+
+BASE_SHAPE = ProjectShape()
+"""Values of the dimensions that are not varied"""
+
+DEFAULT_GRID: tp.Dict[str, tp.List[int]] = {
+    "files": [1, 2, 4, 8, 16],
+    "flows_per_file": [1, 2, 4, 8, 16],
+    "nodes_per_flow": [5, 10, 20, 40, 80],
+    "depth": [1, 2, 4, 8, 16],
+    "references": [1, 2, 3],
+}
+"""Sizes of every dimension. ``references`` cannot exceed ``files - 1`` of :py:data:`BASE_SHAPE`"""
+
+COMPLEXITY_CLASSES = {"constant": 0.0, "linear": 1.0, "quadratic": 2.0}
+"""Exponents of the power laws of complexity classes"""
+
+EXPECTED_COMPLEXITY = {dimension: "linear" for dimension in ProjectShape._fields}
+"""Expected complexity class of the wall time in every dimension"""
+
+TOLERANCE = 0.25
+"""Allowed excess of the fitted exponent over the exponent of the expected complexity class"""
+
+METRICS = ("wall_time", "peak_rss", "output_size")
+
+_CHILD = """
+import json, sys, time
+from pathlib import Path
+from df_script_parser import tools
+direction, kwargs = sys.argv[1], json.loads(sys.argv[2])
+function = getattr(tools, direction)
+start = time.perf_counter()
+function(*[Path(arg) for arg in kwargs.pop("paths")], **kwargs)
+print(time.perf_counter() - start)
+"""
+
+
+def _run(direction: str, paths: tp.List[Path], **kwargs) -> tp.Tuple[float, int]:
+    """Run ``direction`` in a separate process
+
+    :return: Wall time of the call in seconds and peak RSS of the process in bytes
+    """
+    kwargs["paths"] = [str(path) for path in paths]
+    process = subprocess.Popen(
+        [sys.executable, "-c", _CHILD, direction, json.dumps(kwargs)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    assert process.stdout is not None
+    stdout = process.stdout.read()
+    process.stdout.close()
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -1
+    if process.returncode != 0:
+        raise RuntimeError(f"{direction} failed with exit code {process.returncode}: {kwargs}")
+    # ``ru_maxrss`` is measured in kilobytes on linux and in bytes on macOS
+    peak_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+    return float(stdout), peak_rss
+
+
+def _directory_size(directory: Path) -> int:
+    return sum(file.stat().st_size for file in directory.rglob("*") if file.is_file())
+
+
+def measure(shape: ProjectShape, work_dir: Path, format_mode: str) -> tp.Dict[str, tp.Dict[str, float]]:
+    """Generate a project and measure both directions on it
+
+    :param shape: Size of the project
+    :type shape: :py:class:`project_generator.ProjectShape`
+    :param work_dir: Empty directory for the project and the outputs
+    :type work_dir: :py:class:`pathlib.Path`
+    :param format_mode: ``format_mode`` of :py:func:`df_script_parser.tools.yaml2py`
+    :type format_mode: str
+    :return: Dictionary that maps directions to their metrics
+    :rtype: dict[str, dict[str, float]]
+    """
+    project_dir = work_dir / "project"
+    root_file = generate_project(project_dir, shape)
+    yaml_file = work_dir / "script.yaml"
+    extract_dir = work_dir / "extracted"
+
+    wall_time, peak_rss = _run("py2yaml", [root_file, project_dir, yaml_file])
+    results = {"py2yaml": {"wall_time": wall_time, "peak_rss": peak_rss, "output_size": yaml_file.stat().st_size}}
+    wall_time, peak_rss = _run("yaml2py", [yaml_file, extract_dir], format_mode=format_mode)
+    results["yaml2py"] = {"wall_time": wall_time, "peak_rss": peak_rss, "output_size": _directory_size(extract_dir)}
+    results["input"] = {"input_size": _directory_size(project_dir)}
+    return results
+
+
+def fit_exponent(sizes: tp.Sequence[float], values: tp.Sequence[float]) -> float:
+    """Fit a power law ``value ~ size ** exponent`` with the least squares method in log-log coordinates
+
+    :param sizes: Sizes of a dimension
+    :type sizes: Sequence[float]
+    :param values: Measured values
+    :type values: Sequence[float]
+    :return: Fitted exponent
+    :rtype: float
+    """
+    points = [(math.log(size), math.log(value)) for size, value in zip(sizes, values) if size > 0 and value > 0]
+    if len(points) < 2:
+        return math.nan
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return math.nan
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def run_grid(grid: tp.Dict[str, tp.List[int]], format_mode: str) -> dict:
+    """Measure both directions for every size in a grid
+
+    :param grid: Dictionary that maps dimensions of :py:class:`project_generator.ProjectShape` to their sizes
+    :type grid: dict[str, list[int]]
+    :param format_mode: ``format_mode`` of :py:func:`df_script_parser.tools.yaml2py`
+    :type format_mode: str
+    :return: Report with measurements and fitted exponents of every dimension
+    :rtype: dict
+    """
+    report: dict = {"base_shape": BASE_SHAPE._asdict(), "format_mode": format_mode, "dimensions": {}}
+    for dimension, sizes in grid.items():
+        points = []
+        for size in sizes:
+            shape = BASE_SHAPE._replace(**{dimension: size})
+            with tempfile.TemporaryDirectory() as work_dir:
+                results = measure(shape, Path(work_dir), format_mode)
+            points.append({"size": size, **results})
+            print(f"{dimension}={size}: {json.dumps(results)}", file=sys.stderr)
+        exponents = {
+            direction: {
+                metric: fit_exponent(sizes, [point[direction][metric] for point in points]) for metric in METRICS
+            }
+            for direction in ("py2yaml", "yaml2py")
+        }
+        report["dimensions"][dimension] = {"points": points, "exponents": exponents}
+    return report
+
+
+def check_complexity(report: dict, expected: tp.Dict[str, str]) -> tp.List[str]:
+    """Compare fitted exponents of the wall time with the expected complexity classes
+
+    :param report: Report returned by :py:func:`run_grid`
+    :type report: dict
+    :param expected: Dictionary that maps dimensions to keys of :py:data:`COMPLEXITY_CLASSES`
+    :type expected: dict[str, str]
+    :return: Descriptions of the dimensions that grow faster than expected
+    :rtype: list[str]
+    """
+    failures = []
+    for dimension, results in report["dimensions"].items():
+        limit = COMPLEXITY_CLASSES[expected[dimension]] + TOLERANCE
+        for direction, exponents in results["exponents"].items():
+            if exponents["wall_time"] > limit:
+                failures.append(
+                    f"{direction} wall time grows as {dimension} ** {exponents['wall_time']:.2f}, "
+                    f"expected {expected[dimension]} (exponent <= {limit:.2f})"
+                )
+    return failures
+
+
+def format_report(report: dict) -> str:
+    """Render scaling curves of a report as text tables
+
+    :param report: Report returned by :py:func:`run_grid`
+    :type report: dict
+    :return: Text of the tables
+    :rtype: str
+    """
+    lines = []
+    for dimension, results in report["dimensions"].items():
+        lines.append(f"{dimension} (other dimensions: {report['base_shape']})")
+        lines.append(
+            f"{'size':>6} {'input':>10} | {'py2yaml s':>10} {'RSS MiB':>8} {'output':>10} | "
+            f"{'yaml2py s':>10} {'RSS MiB':>8} {'output':>10}"
+        )
+        for point in results["points"]:
+            row = [f"{point['size']:>6} {point['input']['input_size']:>10}"]
+            for direction in ("py2yaml", "yaml2py"):
+                metrics = point[direction]
+                row.append(
+                    f"{metrics['wall_time']:>10.3f} {metrics['peak_rss'] / 2 ** 20:>8.1f} {metrics['output_size']:>10}"
+                )
+            lines.append(" | ".join(row))
+        row = [f"{'exp':>6} {'':>10}"]
+        for direction in ("py2yaml", "yaml2py"):
+            exponents = results["exponents"][direction]
+            row.append(" ".join(f"{exponents[metric]:>{width}.2f}" for metric, width in zip(METRICS, (10, 8, 10))))
+        lines.append(" | ".join(row))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def _parse_sizes(arg: str) -> tp.Tuple[str, tp.List[int]]:
+    dimension, _, sizes = arg.partition("=")
+    dimension = dimension.replace("-", "_")
+    if dimension not in ProjectShape._fields or not sizes:
+        raise argparse.ArgumentTypeError(f"Expected DIMENSION=SIZE[,SIZE...], got: {arg}")
+    return dimension, [int(size) for size in sizes.split(",")]
+
+
+def _parse_expectation(arg: str) -> tp.Tuple[str, str]:
+    dimension, _, complexity = arg.partition("=")
+    dimension = dimension.replace("-", "_")
+    if dimension not in ProjectShape._fields or complexity not in COMPLEXITY_CLASSES:
+        raise argparse.ArgumentTypeError(f"Expected DIMENSION={'|'.join(COMPLEXITY_CLASSES)}, got: {arg}")
+    return dimension, complexity
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how py2yaml and yaml2py scale with the project size.")
+    parser.add_argument(
+        "--sizes",
+        metavar="DIMENSION=SIZE[,SIZE...]",
+        help=f"Sizes of a dimension, replaces the default sizes. Dimensions: {', '.join(ProjectShape._fields)}",
+        type=_parse_sizes,
+        action="append",
+        default=[],
+    )
+    parser.add_argument(
+        "--only",
+        metavar="DIMENSION",
+        help="Measure only these dimensions",
+        choices=ProjectShape._fields,
+        nargs="+",
+    )
+    parser.add_argument(
+        "--format-mode",
+        help="Formatting mode of yaml2py",
+        choices=["full", "fast", "none"],
+        default="full",
+    )
+    parser.add_argument("--output", metavar="OUTPUT_FILE", help="Json file to save the report to", type=Path)
+    parser.add_argument(
+        "--check",
+        help="Exit with code 1 if the wall time grows faster than the expected complexity class",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--expect",
+        metavar=f"DIMENSION={'|'.join(COMPLEXITY_CLASSES)}",
+        help="Override the expected complexity class of a dimension, implies --check",
+        type=_parse_expectation,
+        action="append",
+        default=[],
+    )
+    args = parser.parse_args()
+
+    grid = {**DEFAULT_GRID, **dict(args.sizes)}
+    if args.only:
+        grid = {dimension: grid[dimension] for dimension in args.only}
+    report = run_grid(grid, args.format_mode)
+    print(format_report(report))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as outfile:
+            json.dump(report, outfile, indent=2)
+
+    if args.check or args.expect:
+        failures = check_complexity(report, {**EXPECTED_COMPLEXITY, **dict(args.expect)})
+        for failure in failures:
+            print(failure, file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,4 +4,4 @@ __author__ = "Denis Kuznetsov"
 __email__ = "kuznetsov.den.p@gmail.com"
 __version__ = "0.2.0"
 
-from df_script_parser.cli import py2yaml, py2yaml_cli, yaml2py, yaml2py_cli  # noqa: F401
+from df_script_parser.cli import main_cli, py2yaml, py2yaml_cli, validate, yaml2py, yaml2py_cli  # noqa: F401
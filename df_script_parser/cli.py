@@ -2,7 +2,23 @@
 """
 from pathlib import Path
 import argparse
-from df_script_parser.tools import py2yaml, yaml2py
+import json
+import logging
+import sys
+import time
+import typing as tp
+from df_script_parser.dumpers_loaders import FORMATS, YAML_MODES
+from df_script_parser.processors.dict_processors import CHECK_MODES
+from df_script_parser.tools import FORMAT_MODES, load_manifest, py2yaml, py2yaml_batch, validate, yaml2py
+from df_script_parser.utils import profiling
+from df_script_parser.utils.exceptions import ServerUnavailableError
+from df_script_parser.utils.parse_cache import DEFAULT_MAX_CACHE_SIZE
+
+DEFAULT_SERVER_FILE = Path.home() / ".cache" / "df_script_parser" / "server.json"
+"""File the address and the token of a running conversion server are stored in"""
+
+DEFAULT_MAX_PROJECTS = 8
+"""Number of projects whose parsers are kept in memory by a conversion server"""
 
 
 def is_dir(arg: str) -> Path:
@@ -31,14 +47,35 @@ def is_file(arg: str) -> Path:
     raise argparse.ArgumentTypeError(f"Not a file: {path}")
 
 
-def py2yaml_cli():
-    """:py:func:`.py2yaml` cli wrapper"""
-    parser = argparse.ArgumentParser(description=py2yaml.__doc__.split("\n\n", maxsplit=1)[0])
+def run_profiled(function: tp.Callable, args: dict) -> tp.Any:
+    """Call a function with the parsed cli arguments. If the ``profile`` argument is set
+    collect statistics of the conversion stages and save them into it, see :py:mod:`.profiling`
+
+    :param function: Function to call
+    :type function: Callable
+    :param args: Parsed cli arguments
+    :type args: dict
+    :return: Result of the function
+    """
+    profile_file = args.pop("profile", None)
+    if profile_file is None:
+        return function(**args)
+    with profiling.profile() as profiler:
+        try:
+            return function(**args)
+        finally:
+            profiler.save(profile_file)
+            logging.info("Saved profile to %s", profile_file)
+
+
+def _add_project_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "root_file",
         metavar="ROOT_FILE",
-        help="Python file to start parsing with",
+        help="Python file to start parsing with. If several files are passed modules imported by several of them "
+        "are parsed once",
         type=is_file,
+        nargs="+",
     )
     parser.add_argument(
         "project_root_dir",
@@ -46,10 +83,70 @@ def py2yaml_cli():
         help="Directory that contains all the local files required to run ROOT_FILE",
         type=is_dir,
     )
+
+
+def _add_parser_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache-dir",
+        metavar="CACHE_DIR",
+        help="Directory to cache parsed files in. Files that did not change since the last run are not parsed again",
+        type=Path,
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--cache-size",
+        metavar="CACHE_SIZE",
+        help="Maximum size of CACHE_DIR in bytes. Least recently used entries are removed to satisfy the limit",
+        type=int,
+        required=False,
+        default=DEFAULT_MAX_CACHE_SIZE,
+    )
+    parser.add_argument(
+        "--workers",
+        metavar="WORKERS",
+        help="Number of processes used to parse files",
+        type=int,
+        required=False,
+        default=1,
+    )
+    parser.add_argument(
+        "--check-mode",
+        metavar="CHECK_MODE",
+        help="How dictionary values are checked for correctness: 'fast' classifies simple values without pyflakes, "
+        "'batch' checks values with a single pyflakes run, 'pyflakes' checks every value with a separate pyflakes run",
+        choices=CHECK_MODES,
+        required=False,
+        default="fast",
+    )
+    parser.add_argument(
+        "--check-workers",
+        metavar="CHECK_WORKERS",
+        help="Number of processes used to check dictionary values of a file with 'fast' and 'batch' CHECK_MODE. "
+        "Processes are started only for files with many values that need a pyflakes check",
+        type=int,
+        required=False,
+        default=1,
+    )
+
+
+def _add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        metavar="PROFILE_FILE",
+        help="Json file to save per-stage and per-file wall and CPU time, call counts and cache hit rates in",
+        type=Path,
+        required=False,
+        default=None,
+    )
+
+
+def _add_py2yaml_arguments(parser: argparse.ArgumentParser) -> None:
+    _add_project_arguments(parser)
     parser.add_argument(
         "output_file",
         metavar="OUTPUT_FILE",
-        help="Yaml file to store parser output in",
+        help="File to store parser output in",
         type=str,
     )
     parser.add_argument(
@@ -60,17 +157,52 @@ def py2yaml_cli():
         required=False,
         default=None,
     )
-    args = parser.parse_args()
-    py2yaml(**vars(args))
+    _add_parser_arguments(parser)
+    parser.add_argument(
+        "--watch",
+        help="Keep running and update OUTPUT_FILE every time files inside PROJECT_ROOT_DIR change",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        metavar="POLL_INTERVAL",
+        help="Interval between checks for changes in seconds when --watch is used",
+        type=float,
+        required=False,
+        default=1.0,
+    )
+    parser.add_argument(
+        "--stream",
+        help="Write every namespace to OUTPUT_FILE as soon as it is parsed. Requirements are written last",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--format",
+        metavar="FORMAT",
+        dest="output_format",
+        help="Format of OUTPUT_FILE: 'yaml', 'json' or 'pickle'. "
+        "By default it is chosen by the suffix of OUTPUT_FILE: '.json', '.pickle' or '.pkl', otherwise yaml",
+        choices=FORMATS,
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--yaml-mode",
+        metavar="YAML_MODE",
+        help="How OUTPUT_FILE is written: 'rt' uses the pure python round-trip dumper, "
+        "'fast' uses the libyaml based C emitter if ruamel.yaml.clib is installed",
+        choices=YAML_MODES,
+        required=False,
+        default="rt",
+    )
+    _add_profile_argument(parser)
 
 
-def yaml2py_cli():
-    """:py:func:`.yaml2py` cli wrapper"""
-    parser = argparse.ArgumentParser(description=yaml2py.__doc__.split("\n\n", maxsplit=1)[0])
+def _add_yaml2py_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "yaml_file",
         metavar="YAML_FILE",
-        help="Yaml file to load",
+        help="File to load: yaml, json or pickle",
         type=is_file,
     )
     parser.add_argument(
@@ -79,5 +211,264 @@ def yaml2py_cli():
         help="Path to the directory to extract project to",
         type=is_dir,
     )
+    parser.add_argument(
+        "--workers",
+        metavar="WORKERS",
+        help="Number of processes used to write and format files",
+        type=int,
+        required=False,
+        default=1,
+    )
+    parser.add_argument(
+        "--format-mode",
+        metavar="FORMAT_MODE",
+        help="How extracted files are formatted: 'full' formats files with black, 'fast' skips the check that "
+        "formatted code is equivalent to the source code, 'none' does not format files",
+        choices=FORMAT_MODES,
+        required=False,
+        default="full",
+    )
+    parser.add_argument(
+        "--format",
+        metavar="FORMAT",
+        dest="input_format",
+        help="Format of YAML_FILE: 'yaml', 'json' or 'pickle'. By default it is detected by the contents of YAML_FILE",
+        choices=FORMATS,
+        required=False,
+        default=None,
+    )
+    parser.add_argument(
+        "--yaml-mode",
+        metavar="YAML_MODE",
+        help="How YAML_FILE is read: 'rt' uses the pure python round-trip loader, "
+        "'fast' uses the libyaml based C parser if ruamel.yaml.clib is installed",
+        choices=YAML_MODES,
+        required=False,
+        default="rt",
+    )
+    _add_profile_argument(parser)
+
+
+def _add_validate_arguments(parser: argparse.ArgumentParser) -> None:
+    _add_project_arguments(parser)
+    _add_parser_arguments(parser)
+    _add_profile_argument(parser)
+
+
+def py2yaml_cli():
+    """:py:func:`.py2yaml` cli wrapper"""
+    parser = argparse.ArgumentParser(description=py2yaml.__doc__.split("\n\n", maxsplit=1)[0])
+    _add_py2yaml_arguments(parser)
     args = parser.parse_args()
-    yaml2py(**vars(args))
+    try:
+        run_profiled(py2yaml, vars(args))
+    except KeyboardInterrupt:
+        if not args.watch:
+            raise
+
+
+def yaml2py_cli():
+    """:py:func:`.yaml2py` cli wrapper"""
+    parser = argparse.ArgumentParser(description=yaml2py.__doc__.split("\n\n", maxsplit=1)[0])
+    _add_yaml2py_arguments(parser)
+    args = parser.parse_args()
+    run_profiled(yaml2py, vars(args))
+
+
+def run_command(command: str, args: dict) -> tp.Any:
+    """Execute a command on a running conversion server, see :py:mod:`df_script_parser.server`.
+    Execute it in this process if no server is running, if the ``no_server`` argument is set
+    or if the command is :py:func:`.py2yaml` in watch mode
+
+    :param command: One of :py:data:`df_script_parser.server.COMMANDS`
+    :type command: str
+    :param args: Parsed cli arguments
+    :type args: dict
+    :return: Result of the command
+    """
+    # the server module imports http modules that are not needed by the other commands
+    from df_script_parser import server  # pylint: disable=import-outside-toplevel
+
+    server_file = args.pop("server_file")
+    if not args.pop("no_server") and not args.get("watch"):
+        try:
+            return server.send_command(command, args, server_file)
+        except ServerUnavailableError as error:
+            logging.debug("Executing %s in process: %s", command, error)
+    functions: tp.Dict[str, tp.Callable] = {"py2yaml": py2yaml, "yaml2py": yaml2py, "validate": validate}
+    return run_profiled(functions[command], args)
+
+
+def run_batch(manifest: Path, report: tp.Optional[Path] = None, **kwargs) -> bool:
+    """Convert the projects of a manifest with :py:func:`.py2yaml_batch`, print their status
+
+    :param manifest: Manifest file, see :py:func:`df_script_parser.tools.load_manifest`
+    :type manifest: :py:class:`.Path`
+    :param report: Json file to save the reports of the projects in, defaults to None
+    :type report: :py:class:`.Path`, optional
+    :param kwargs: Other arguments of :py:func:`.py2yaml_batch`
+    :return: Whether all the projects are converted
+    :rtype: bool
+    """
+    start = time.perf_counter()
+    reports = py2yaml_batch(load_manifest(manifest), **kwargs)
+    wall_time = time.perf_counter() - start
+    for project in reports:
+        line = f"{project['status']:<6} {project['wall_time']:>8.3f}s {project['root_file']}"
+        if project["status"] == "ok":
+            print(f"{line} -> {project['output_file']}")
+        else:
+            print(f"{line}: {project['error']}: {project['message']}")
+    failed = sum(project["status"] != "ok" for project in reports)
+    print(f"Converted {len(reports) - failed} of {len(reports)} projects in {wall_time:.3f}s")
+    if report is not None:
+        with open(report, "w", encoding="utf-8") as outfile:
+            json.dump({"wall_time": wall_time, "projects": reports}, outfile, indent=2)
+    return failed == 0
+
+
+def main_cli():
+    """``df_script_parser`` cli: run a conversion server or execute a command on it"""
+    parser = argparse.ArgumentParser(
+        description="Convert dff projects. Commands are executed by a conversion server started with "
+        "'df_script_parser serve' if it is running, otherwise they are executed in this process"
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    subparsers.required = True
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run a conversion server that keeps parsers of recently converted projects in memory"
+    )
+    serve_parser.add_argument(
+        "--host",
+        metavar="HOST",
+        help="Host to listen on",
+        type=str,
+        required=False,
+        default="127.0.0.1",
+    )
+    serve_parser.add_argument(
+        "--port",
+        metavar="PORT",
+        help="Port to listen on. By default a free port is chosen",
+        type=int,
+        required=False,
+        default=0,
+    )
+    serve_parser.add_argument(
+        "--max-projects",
+        metavar="MAX_PROJECTS",
+        help="Number of projects whose parsers are kept in memory",
+        type=int,
+        required=False,
+        default=DEFAULT_MAX_PROJECTS,
+    )
+
+    for command, function, add_arguments, command_help in (
+        ("py2yaml", py2yaml, _add_py2yaml_arguments, "Compress a dff project into a yaml file"),
+        ("yaml2py", yaml2py, _add_yaml2py_arguments, "Extract a dff project from a yaml file"),
+        ("validate", validate, _add_validate_arguments, "Check that a dff project can be compressed"),
+    ):
+        subparser = subparsers.add_parser(
+            command, help=command_help, description=function.__doc__.split("\n\n", maxsplit=1)[0]
+        )
+        add_arguments(subparser)
+        subparser.add_argument(
+            "--no-server",
+            help="Execute the command in this process even if a conversion server is running",
+            action="store_true",
+        )
+
+    for subparser in subparsers.choices.values():
+        subparser.add_argument(
+            "--server-file",
+            metavar="SERVER_FILE",
+            help="File that stores the address of the conversion server",
+            type=Path,
+            required=False,
+            default=DEFAULT_SERVER_FILE,
+        )
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Compress several dff projects listed in a manifest, always executed in this process",
+        description=py2yaml_batch.__doc__.split("\n\n", maxsplit=1)[0],
+    )
+    batch_parser.add_argument(
+        "manifest",
+        metavar="MANIFEST",
+        help="Yaml or json list of projects. Every project is a mapping with the 'root_file' (a file or a list "
+        "of files), 'project_root_dir' and 'output_file' keys and optional 'requirements', 'check_mode', "
+        "'check_workers', 'stream', 'output_format' and 'yaml_mode' keys. Relative paths are relative to the directory "
+        "of MANIFEST",
+        type=is_file,
+    )
+    batch_parser.add_argument(
+        "--workers",
+        metavar="WORKERS",
+        help="Number of processes used to convert projects",
+        type=int,
+        required=False,
+        default=1,
+    )
+    batch_parser.add_argument(
+        "--cache-dir",
+        metavar="CACHE_DIR",
+        help="Directory to cache parsed files and resolved modules of all the projects in",
+        type=Path,
+        required=False,
+        default=None,
+    )
+    batch_parser.add_argument(
+        "--cache-size",
+        metavar="CACHE_SIZE",
+        help="Maximum size of CACHE_DIR in bytes. Least recently used entries are removed to satisfy the limit",
+        type=int,
+        required=False,
+        default=DEFAULT_MAX_CACHE_SIZE,
+    )
+    batch_parser.add_argument(
+        "--check-mode",
+        metavar="CHECK_MODE",
+        help="Check mode of the projects that do not set it, see 'df_script_parser py2yaml --help'",
+        choices=CHECK_MODES,
+        required=False,
+        default="fast",
+    )
+    batch_parser.add_argument(
+        "--yaml-mode",
+        metavar="YAML_MODE",
+        help="Yaml mode of the projects that do not set it, see 'df_script_parser py2yaml --help'",
+        choices=YAML_MODES,
+        required=False,
+        default="rt",
+    )
+    batch_parser.add_argument(
+        "--report",
+        metavar="REPORT_FILE",
+        help="Json file to save the status and the wall time of every project in",
+        type=Path,
+        required=False,
+        default=None,
+    )
+
+    args = vars(parser.parse_args())
+    command = args.pop("command")
+    if command == "serve":
+        # the server module imports http modules that are not needed by the other commands
+        from df_script_parser.server import serve  # pylint: disable=import-outside-toplevel
+
+        serve(**args)
+        return
+    if command == "batch":
+        if not run_batch(**args):
+            sys.exit(1)
+        return
+    try:
+        result = run_command(command, args)
+    except KeyboardInterrupt:
+        if not args.get("watch"):
+            raise
+        return
+    if command == "validate":
+        print(f"{len(result['namespaces'])} namespaces, {len(result['requirements'])} requirements")
@@ -1,21 +1,478 @@
-"""This module contains a yaml dumper | loader
+"""This module contains a yaml dumper | loader as well as json and pickle dumpers | loaders of the same data
 """
+import json
+import pickle
+import typing as tp
+from io import StringIO
 from math import inf
+from pathlib import Path
 
 from ruamel.yaml import YAML
+from ruamel.yaml.composer import Composer
+from ruamel.yaml.events import MappingEndEvent, MappingStartEvent
+from ruamel.yaml.main import CEmitter, CParser
 
-from df_script_parser.utils.code_wrappers import String, Python
+from df_script_parser.utils.code_wrappers import String, Python, StringTag
+from df_script_parser.utils.exceptions import SerializationError, YamlStructureError
 from df_script_parser.utils.namespaces import NamespaceTag, From, Import, AltName, ActorTag, Call
 
-yaml_dumper_loader = YAML()
 
-yaml_dumper_loader.register_class(String)
-yaml_dumper_loader.register_class(Python)
-yaml_dumper_loader.register_class(NamespaceTag)
-yaml_dumper_loader.register_class(From)
-yaml_dumper_loader.register_class(Import)
-yaml_dumper_loader.register_class(AltName)
-yaml_dumper_loader.register_class(ActorTag)
-yaml_dumper_loader.register_class(Call)
+YAML_MODES = ("rt", "fast")
+"""Modes of yaml dumpers | loaders:
 
-yaml_dumper_loader.width = inf  # type: ignore
+- ``"rt"``: round-trip dumper | loader. It is implemented in pure python and preserves comments
+- ``"fast"``: safe dumper | loader that uses the libyaml based C extension (``ruamel.yaml.clib``) if it is installed
+  and falls back to pure python otherwise. Comments are not preserved, mappings are loaded as :py:class:`dict`.
+  Loaded data and dumped data are the same as in the ``"rt"`` mode
+"""
+
+HAS_C_YAML = CParser is not None and CEmitter is not None
+"""Whether the C extension used in the ``"fast"`` mode is available"""
+
+
+def _create_dumper_loader(mode: str = "rt") -> YAML:
+    if mode == "fast":
+        dumper_loader = YAML(typ="safe")
+        # must be set before representer is created by ``register_class``
+        dumper_loader.default_flow_style = False
+    else:
+        dumper_loader = YAML()
+
+    dumper_loader.register_class(String)
+    dumper_loader.register_class(Python)
+    dumper_loader.register_class(NamespaceTag)
+    dumper_loader.register_class(From)
+    dumper_loader.register_class(Import)
+    dumper_loader.register_class(AltName)
+    dumper_loader.register_class(ActorTag)
+    dumper_loader.register_class(Call)
+
+    if mode == "fast":
+        dumper_loader.representer.sort_base_mapping_type_on_output = False  # type: ignore
+    # libyaml uses -1 for an unlimited width
+    dumper_loader.width = -1 if dumper_loader.Emitter is CEmitter else inf  # type: ignore
+    return dumper_loader
+
+
+yaml_dumper_loader = _create_dumper_loader()
+
+fast_yaml_dumper_loader = _create_dumper_loader("fast")
+
+
+def get_yaml_dumper_loader(mode: str = "rt") -> YAML:
+    """Get a yaml dumper | loader
+
+    :param mode: One of :py:data:`YAML_MODES`, defaults to ``"rt"``
+    :type mode: str
+    :return: :py:data:`yaml_dumper_loader` or :py:data:`fast_yaml_dumper_loader`
+    :rtype: :py:class:`ruamel.yaml.YAML`
+
+    :raise :py:exc:`ValueError`:
+        If ``mode`` is not one of :py:data:`YAML_MODES`
+    """
+    if mode not in YAML_MODES:
+        raise ValueError(f"Unknown yaml mode {mode}, expected one of {YAML_MODES}")
+    return fast_yaml_dumper_loader if mode == "fast" else yaml_dumper_loader
+
+
+class YamlStreamWriter:
+    """Write the output of :py:func:`df_script_parser.tools.py2yaml` one namespace at a time
+
+    Every namespace is dumped by :py:data:`yaml_dumper_loader` as soon as it is written and nested under
+    the ``namespaces`` key, so the representation of the whole project is never built.
+    Requirements are written last.
+
+    :param stream: Stream to write to
+    :type stream: TextIO
+    :param mode: One of :py:data:`YAML_MODES`, defaults to ``"rt"``
+    :type mode: str
+    """
+
+    def __init__(self, stream: tp.TextIO, mode: str = "rt"):
+        self.stream = stream
+        self.dumper = get_yaml_dumper_loader(mode)
+        self.written: tp.Set[NamespaceTag] = set()
+        self.stream.write("namespaces:\n")
+
+    def write_namespace(self, tag: NamespaceTag, names: dict) -> None:
+        """Write a namespace
+
+        :param tag: Name of the namespace
+        :type tag: :py:class:`df_script_parser.utils.namespaces.NamespaceTag`
+        :param names: Contents of the namespace
+        :type names: dict
+        :return: None
+        """
+        buffer = StringIO()
+        self.dumper.dump({tag: names}, buffer)
+        self.stream.write("".join("  " + line if line.strip() else line for line in buffer.getvalue().splitlines(True)))
+        self.stream.flush()
+        self.written.add(tag)
+
+    def finish(self, namespaces: dict, requirements: tp.List[str]) -> None:
+        """Write namespaces that were not written yet and requirements
+
+        :param namespaces: All the namespaces
+        :type namespaces: dict
+        :param requirements: Project requirements
+        :type requirements: list[str]
+        :return: None
+        """
+        for tag, names in namespaces.items():
+            if tag not in self.written:
+                self.write_namespace(tag, names)
+        self.dumper.dump({"requirements": requirements}, self.stream)
+
+
+class YamlStreamReader:
+    """Read the output of :py:func:`df_script_parser.tools.py2yaml` one namespace at a time
+
+    Only the nodes of the namespace being read are kept in memory.
+    :py:attr:`YamlStreamReader.requirements` is set when the ``requirements`` key is read.
+
+    :param stream: Stream to read from
+    :type stream: TextIO
+    :param mode: One of :py:data:`YAML_MODES`, defaults to ``"rt"``
+    :type mode: str
+    """
+
+    def __init__(self, stream: tp.TextIO, mode: str = "rt"):
+        if mode not in YAML_MODES:
+            raise ValueError(f"Unknown yaml mode {mode}, expected one of {YAML_MODES}")
+        self.stream = stream
+        self.mode = mode
+        self.requirements: tp.Optional[list] = None
+
+    def namespaces(self) -> tp.Iterator[tp.Tuple[str, dict]]:
+        """Read namespaces
+
+        :return: Iterator over namespace names and contents
+
+        :raise :py:exc:`df_script_parser.utils.exceptions.YamlStructureError`:
+            If the document is not a mapping
+        """
+        loader = _create_dumper_loader(self.mode)
+        constructor, parser = loader.get_constructor_parser(self.stream)
+        if parser is constructor:
+            # the C extension combines reader, scanner, parser and composer in one object
+            # that does not allow composing one node at a time
+            parser.max_depth = loader.max_depth
+            composer = Composer(loader=parser)
+        else:
+            composer = loader.composer
+        try:
+            # skip the stream start and the document start events
+            parser.get_event()
+            parser.get_event()
+            if not parser.check_event(MappingStartEvent):
+                raise YamlStructureError("Document is not a mapping")
+            parser.get_event()
+            while not parser.check_event(MappingEndEvent):
+                key = constructor.construct_document(composer.compose_node(None, None))
+                if key == "namespaces" and parser.check_event(MappingStartEvent):
+                    parser.get_event()
+                    while not parser.check_event(MappingEndEvent):
+                        name = constructor.construct_document(composer.compose_node(None, None))
+                        yield name, constructor.construct_document(composer.compose_node(None, None))
+                    parser.get_event()
+                else:
+                    value = constructor.construct_document(composer.compose_node(None, None))
+                    if key == "requirements":
+                        self.requirements = value
+        finally:
+            parser.dispose()
+
+
+FORMATS = ("yaml", "json", "pickle")
+"""Formats a project can be stored in:
+
+- ``"yaml"``: human readable format
+- ``"json"``: json with the yaml tags stored as type markers, see :py:func:`to_json`.
+  Loading it gives the same data as loading the yaml
+- ``"pickle"``: versioned pickle snapshot of the parser output. Only load snapshots from trusted sources
+"""
+
+FORMAT_NAME = "df_script_parser"
+"""Value of the ``format`` key in json and pickle files"""
+
+JSON_FORMAT_VERSION = 1
+"""Version of the json format"""
+
+PICKLE_FORMAT_VERSION = 1
+"""Version of the pickle format"""
+
+_SUFFIXES = {".json": "json", ".pickle": "pickle", ".pkl": "pickle"}
+
+_TAGS: tp.Dict[str, type] = {
+    cls.yaml_tag: cls for cls in (String, Python, NamespaceTag, From, Import, AltName, ActorTag)
+}
+
+_MAP_TAG = "!map"
+
+
+def get_format(path: Path) -> str:
+    """Get a format of a file to write by its suffix. ``.json`` -- json, ``.pickle`` and ``.pkl`` -- pickle,
+    any other suffix -- yaml
+
+    :param path: File
+    :type path: :py:class:`pathlib.Path`
+    :return: One of :py:data:`FORMATS`
+    :rtype: str
+    """
+    return _SUFFIXES.get(Path(path).suffix.lower(), "yaml")
+
+
+def detect_format(path: Path) -> str:
+    """Detect a format of an existing file by its contents
+
+    :param path: File
+    :type path: :py:class:`pathlib.Path`
+    :return: One of :py:data:`FORMATS`
+    :rtype: str
+    """
+    with open(path, "rb") as file:
+        head = file.read(64)
+    if head.startswith(b"\x80"):
+        return "pickle"
+    if head.lstrip().startswith(b"{"):
+        return "json"
+    return "yaml"
+
+
+def to_json(obj: tp.Any) -> tp.Any:
+    """Convert an object to a json serializable object
+
+    Objects that are dumped to yaml with a tag are replaced with a single key dictionary that maps the tag to
+    the scalar value, e.g. ``{"!py": "cnd.true()"}``. :py:class:`.Call` is replaced with
+    ``{"!call": {"name": ..., "args": ...}}``. Dictionaries that have keys other than strings or keys that start
+    with ``!`` are replaced with ``{"!map": [[key, value], ...]}``
+
+    :param obj: Object to convert
+    :return: Json serializable object
+    """
+    if isinstance(obj, StringTag):
+        value = obj.absolute_value if obj.display_absolute_value else obj.display_value
+        return {obj.yaml_tag: value} if obj.show_yaml_tag else value
+    if isinstance(obj, Call):
+        return {Call.yaml_tag: {"name": obj.name, "args": to_json(obj.args)}}
+    if isinstance(obj, dict):
+        items = [(to_json(key), to_json(value)) for key, value in obj.items()]
+        if all(isinstance(key, str) and not key.startswith("!") for key, _ in items):
+            return dict(items)
+        return {_MAP_TAG: [list(item) for item in items]}
+    if isinstance(obj, (list, tuple)):
+        return [to_json(element) for element in obj]
+    return obj
+
+
+def from_json(obj: tp.Any) -> tp.Any:
+    """Convert an object created by :py:func:`to_json` back
+
+    :param obj: Object to convert
+    :return: Converted object
+
+    :raise :py:exc:`df_script_parser.utils.exceptions.SerializationError`:
+        If the object contains an unknown type marker
+    """
+    if isinstance(obj, list):
+        return [from_json(element) for element in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if len(obj) == 1:
+        ((key, value),) = obj.items()
+        if key in _TAGS:
+            if key == From.yaml_tag:
+                return From(*value.split(" "))
+            return _TAGS[key](value)
+        if key == Call.yaml_tag:
+            return Call(value["name"], from_json(value["args"]))
+        if key == _MAP_TAG:
+            return {from_json(item_key): from_json(item_value) for item_key, item_value in value}
+        if key.startswith("!"):
+            raise SerializationError(f"Unknown type marker: {key}")
+    return {key: from_json(value) for key, value in obj.items()}
+
+
+def dump_json(dictionary: dict, stream: tp.TextIO) -> None:
+    """Dump the output of :py:meth:`df_script_parser.processors.recursive_parser.RecursiveParser.parse_project_dir`
+    in json format
+
+    :param dictionary: Dictionary with ``namespaces`` and ``requirements`` keys
+    :type dictionary: dict
+    :param stream: Stream to write to
+    :type stream: TextIO
+    :return: None
+    """
+    writer = JsonStreamWriter(stream)
+    writer.finish(dictionary["namespaces"], dictionary["requirements"])
+
+
+def dump_pickle(dictionary: dict, stream: tp.BinaryIO) -> None:
+    """Dump the output of :py:meth:`df_script_parser.processors.recursive_parser.RecursiveParser.parse_project_dir`
+    in pickle format
+
+    :param dictionary: Dictionary with ``namespaces`` and ``requirements`` keys
+    :type dictionary: dict
+    :param stream: Stream to write to
+    :type stream: BinaryIO
+    :return: None
+    """
+    snapshot = {
+        "format": FORMAT_NAME,
+        "version": PICKLE_FORMAT_VERSION,
+        "namespaces": dictionary["namespaces"],
+        "requirements": dictionary["requirements"],
+    }
+    pickle.dump(snapshot, stream, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class JsonStreamWriter:
+    """Write the output of :py:func:`df_script_parser.tools.py2yaml` in json format one namespace at a time
+
+    Has the same interface as :py:class:`YamlStreamWriter`.
+
+    :param stream: Stream to write to
+    :type stream: TextIO
+    """
+
+    def __init__(self, stream: tp.TextIO):
+        self.stream = stream
+        self.written: tp.Set[NamespaceTag] = set()
+        self.stream.write(f'{{"format": "{FORMAT_NAME}", "version": {JSON_FORMAT_VERSION}, "namespaces": {{')
+
+    def write_namespace(self, tag: NamespaceTag, names: dict) -> None:
+        """Write a namespace
+
+        :param tag: Name of the namespace
+        :type tag: :py:class:`df_script_parser.utils.namespaces.NamespaceTag`
+        :param names: Contents of the namespace
+        :type names: dict
+        :return: None
+        """
+        if self.written:
+            self.stream.write(", ")
+        self.stream.write(json.dumps(str(tag)) + ": " + json.dumps(to_json(names), ensure_ascii=False))
+        self.stream.flush()
+        self.written.add(tag)
+
+    def finish(self, namespaces: dict, requirements: tp.List[str]) -> None:
+        """Write namespaces that were not written yet and requirements
+
+        :param namespaces: All the namespaces
+        :type namespaces: dict
+        :param requirements: Project requirements
+        :type requirements: list[str]
+        :return: None
+        """
+        for tag, names in namespaces.items():
+            if tag not in self.written:
+                self.write_namespace(tag, names)
+        self.stream.write('}, "requirements": ' + json.dumps(requirements, ensure_ascii=False) + "}\n")
+
+
+def _check_header(snapshot: tp.Any, version: int) -> None:
+    if not isinstance(snapshot, dict) or snapshot.get("format") != FORMAT_NAME:
+        raise SerializationError("Not a df_script_parser file")
+    if snapshot.get("version") != version:
+        raise SerializationError(f"Unsupported format version {snapshot.get('version')}, expected {version}")
+
+
+class JsonReader:
+    """Read a file written by :py:class:`JsonStreamWriter`
+
+    Has the same interface as :py:class:`YamlStreamReader`.
+
+    :param stream: Stream to read from
+    :type stream: TextIO
+    """
+
+    def __init__(self, stream: tp.TextIO):
+        self.stream = stream
+        self.requirements: tp.Optional[list] = None
+
+    def namespaces(self) -> tp.Iterator[tp.Tuple[str, dict]]:
+        """Read namespaces
+
+        :return: Iterator over namespace names and contents
+
+        :raise :py:exc:`df_script_parser.utils.exceptions.SerializationError`:
+            If the file is not a json file of a supported version
+        """
+        try:
+            snapshot = json.load(self.stream)
+        except json.JSONDecodeError as error:
+            raise SerializationError(f"Cannot decode json: {error}") from error
+        _check_header(snapshot, JSON_FORMAT_VERSION)
+        self.requirements = snapshot.get("requirements")
+        for name, names in snapshot.get("namespaces", {}).items():
+            yield name, from_json(names)
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """Unpickler that only creates builtin containers and value classes of this package
+
+    Globals are looked up by their exact module and name, dotted names are rejected since pickle resolves them
+    attribute by attribute.
+    """
+
+    _allowed_globals = frozenset(
+        [
+            (cls.__module__, cls.__qualname__)
+            for cls in (String, Python, NamespaceTag, Import, From, AltName, ActorTag, Call)
+        ]
+        + [("collections", "OrderedDict")]
+        + [
+            ("builtins", name)
+            for name in ("dict", "list", "tuple", "set", "frozenset", "str", "int", "float", "bool", "complex")
+        ]
+    )
+
+    def find_class(self, module_name, global_name):
+        if "." not in global_name and (module_name, global_name) in self._allowed_globals:
+            return super().find_class(module_name, global_name)
+        raise SerializationError(f"Forbidden global in a pickle snapshot: {module_name}.{global_name}")
+
+
+def load_pickle(stream: tp.BinaryIO) -> tp.Any:
+    """Load a pickled object that consists of builtin containers and value classes of this package only
+
+    :param stream: Stream to read from
+    :type stream: BinaryIO
+    :return: Loaded object
+
+    :raise :py:exc:`df_script_parser.utils.exceptions.SerializationError`:
+        If the stream is not a pickle or it contains other objects
+    """
+    try:
+        return _SnapshotUnpickler(stream).load()
+    except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, IndexError, TypeError, ValueError) as error:
+        raise SerializationError(f"Cannot load pickle snapshot: {error}") from error
+
+
+class PickleReader:
+    """Read a file written by :py:func:`dump_pickle`
+
+    Has the same interface as :py:class:`YamlStreamReader`. Only value classes of this package and builtin
+    containers can be loaded.
+
+    :param stream: Stream to read from
+    :type stream: BinaryIO
+    """
+
+    def __init__(self, stream: tp.BinaryIO):
+        self.stream = stream
+        self.requirements: tp.Optional[list] = None
+
+    def namespaces(self) -> tp.Iterator[tp.Tuple[str, dict]]:
+        """Read namespaces
+
+        :return: Iterator over namespace names and contents
+
+        :raise :py:exc:`df_script_parser.utils.exceptions.SerializationError`:
+            If the file is not a pickle snapshot of a supported version
+        """
+        snapshot = load_pickle(self.stream)
+        _check_header(snapshot, PICKLE_FORMAT_VERSION)
+        self.requirements = snapshot.get("requirements")
+        for tag, names in snapshot.get("namespaces", {}).items():
+            yield str(tag), names
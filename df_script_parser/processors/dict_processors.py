@@ -2,24 +2,37 @@
 The purpose of these processors is to take a dictionary
 and replace all the keys and values that are not dicts, lists or tuples with StringTag instances.
 """
+import ast
+import keyword
 import logging
 import re
+import sys
 import typing as tp
+import unicodedata
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from os import devnull
 
-import libcst as cst
-from pyflakes.api import check  # type: ignore
-from pyflakes.reporter import Reporter  # type: ignore
-
+from df_script_parser.utils import profiling
 from df_script_parser.utils.code_wrappers import (
     String,
+    StringTag,
     Python,
 )
-from df_script_parser.utils.convenience_functions import evaluate
+from df_script_parser.utils.convenience_functions import evaluate, lazy_import
 from df_script_parser.utils.exceptions import StarredError
 from df_script_parser.utils.namespaces import Namespace
 
+if tp.TYPE_CHECKING:
+    import libcst as cst
+    from pyflakes import api as pyflakes_api, checker as pyflakes_checker, reporter as pyflakes_reporter  # type: ignore
+else:
+    cst = lazy_import("libcst")
+    pyflakes_api = lazy_import("pyflakes.api")
+    pyflakes_checker = lazy_import("pyflakes.checker")
+    pyflakes_reporter = lazy_import("pyflakes.reporter")
+
 
 class NodeProcessor:
     """Process :py:class:`.Dict`. Return a python object
@@ -28,17 +41,27 @@ class NodeProcessor:
     :type namespace: :py:class:`.Namespace`
     :param parse_tuples: If true parse tuples as well, defaults to False
     :type parse_tuples: bool
+    :param check_workers: Number of processes used to check values for correctness, defaults to 1
+    :type check_workers: int
+    :param check_mode: One of :py:data:`CHECK_MODES`. Defines how values are checked for correctness,
+        defaults to ``"fast"``
+    :type check_mode: str
     """
 
     def __init__(
         self,
         namespace: Namespace,
         parse_tuples: bool = False,
+        check_workers: int = 1,
+        check_mode: str = "fast",
     ):
         self.namespace: Namespace = namespace
         self.parse_tuples = parse_tuples
+        self.check_workers = check_workers
+        self.check_mode = check_mode
+        self._unchecked: tp.List[tp.Tuple[StringTag, str]] = []
 
-    def _process_dict(self, node: cst.Dict) -> dict:
+    def _process_dict(self, node: "cst.Dict") -> dict:
         result = OrderedDict()
         for element in node.elements:
             if not isinstance(element, cst.DictElement):
@@ -47,7 +70,7 @@ class NodeProcessor:
             result[key] = self._process_node(element.value)
         return dict(result)
 
-    def _process_list(self, node: tp.Union[cst.List, cst.Tuple]) -> list:
+    def _process_list(self, node: "tp.Union[cst.List, cst.Tuple]") -> list:
         result = []
         for element in node.elements:
             if not isinstance(element, cst.Element):
@@ -55,7 +78,7 @@ class NodeProcessor:
             result.append(self._process_node(element.value))
         return result
 
-    def _process_node(self, node: cst.CSTNode) -> object:
+    def _process_node(self, node: "cst.CSTNode") -> object:
         if isinstance(node, cst.Dict):
             return self._process_dict(node)
 
@@ -67,27 +90,46 @@ class NodeProcessor:
 
         if isinstance(node, cst.SimpleString):
             value = node.evaluated_value
-            return String(value, show_yaml_tag=is_correct(list(self.namespace), value))
+            string = String(value, show_yaml_tag=False)
+            self._unchecked.append((string, value))
+            return string
 
         value = re.sub(r"\n[ \t]*", "", evaluate(node))
 
-        if not is_correct(list(self.namespace), value):
-            logging.warning("Value %s is not a correct line of python code", value)
-            return Python(value, self.namespace.get_absolute_name(value), show_yaml_tag=True)
-
-        return Python(value, self.namespace.get_absolute_name(value))
-
-    def process(self, node: cst.CSTNode) -> object:
+        python = Python(value, self.namespace.get_absolute_name(value))
+        self._unchecked.append((python, value))
+        return python
+
+    @profiling.profiled("check_values")
+    def _check_values(self) -> None:
+        """Set :py:attr:`.StringTag.show_yaml_tag` of the processed values depending on their correctness"""
+        unchecked, self._unchecked = self._unchecked, []
+        correct = check_values(
+            list(self.namespace), [value for _, value in unchecked], self.check_workers, self.check_mode
+        )
+        for (string_tag, value), is_value_correct in zip(unchecked, correct):
+            if isinstance(string_tag, String):
+                string_tag.show_yaml_tag = is_value_correct
+            elif not is_value_correct:
+                logging.warning("Value %s is not a correct line of python code", value)
+                string_tag.show_yaml_tag = True
+
+    def process(self, node: "cst.CSTNode") -> object:
         """Process a node
 
+        Values of the node are checked for correctness all at once after the node is processed
+
         :param node: A node to process
         :type node: :py:class:`libcst.CSTNode`
         :return: A python object corresponding to the ``node`` type. Any unsupported types are replaced with a
             :py:class:`.Python` instance
         """
-        return self._process_node(node)
+        self._unchecked = []
+        result = self._process_node(node)
+        self._check_values()
+        return result
 
-    def __call__(self, node: cst.CSTNode):
+    def __call__(self, node: "cst.CSTNode"):
         return self.process(node)
 
 
@@ -98,11 +140,16 @@ class Disambiguator:
     names in the namespace
 
     If :py:property:`replace_lists_with_tuples` is set to True Disambiguator replaces lists with tuples
+
+    :param check_mode: One of :py:data:`CHECK_MODES`. Defines how strings are checked for correctness,
+        defaults to ``"fast"``
+    :type check_mode: str
     """
 
-    def __init__(self):
+    def __init__(self, check_mode: str = "fast"):
         self.names: tp.List[str] = []
         self.replace_lists_with_tuples: bool = False
+        self.check_mode = check_mode
 
     def add_name(self, name: str):
         """Add a name to the list of names in a namespace
@@ -113,33 +160,49 @@ class Disambiguator:
         """
         self.names.append(name)
 
-    def _process_dict(self, obj: dict) -> dict:
+    def _collect_strings(self, obj: tp.Any, strings: tp.Dict[str, None]) -> None:
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                self._collect_strings(key, strings)
+                self._collect_strings(value, strings)
+        elif isinstance(obj, list):
+            for element in obj:
+                self._collect_strings(element, strings)
+        elif isinstance(obj, str):
+            strings[obj] = None
+
+    def _process_dict(self, obj: dict, correct: tp.Dict[str, bool]) -> dict:
         result = OrderedDict()
         for key in obj:
-            result[self._process(key)] = self._process(obj[key])
+            result[self._process(key, correct)] = self._process(obj[key], correct)
         return dict(result)
 
-    def _process_list(self, obj: list) -> tp.Union[list, tuple]:
+    def _process_list(self, obj: list, correct: tp.Dict[str, bool]) -> tp.Union[list, tuple]:
         result = []
         for element in obj:
-            result.append(self._process(element))
+            result.append(self._process(element, correct))
         if self.replace_lists_with_tuples:
             return tuple(result)
         return result
 
-    def _process(self, obj: tp.Any) -> tp.Any:
+    def _process(self, obj: tp.Any, correct: tp.Dict[str, bool]) -> tp.Any:
         if isinstance(obj, dict):
-            return self._process_dict(obj)
+            return self._process_dict(obj, correct)
         if isinstance(obj, list):
-            return self._process_list(obj)
+            return self._process_list(obj, correct)
         if isinstance(obj, str):
-            return Python(obj) if is_correct(self.names, obj) else String(obj)
+            return Python(obj) if correct[obj] else String(obj)
         return obj
 
     def __call__(self, node: tp.Any):
-        return self._process(node)
+        # all the strings of an object are checked with a single call
+        strings: tp.Dict[str, None] = {}
+        self._collect_strings(node, strings)
+        correct = dict(zip(strings, check_values(self.names, list(strings), mode=self.check_mode)))
+        return self._process(node, correct)
 
 
+@profiling.profiled("pyflakes")
 def is_correct(names: tp.List[str], code: str) -> bool:
     """Check code for correctness if names are available in the namespace.
 
@@ -152,4 +215,192 @@ def is_correct(names: tp.List[str], code: str) -> bool:
     """
     code_string = "\n".join([*(f"import {name}\n{name}" for name in names), code])
     with open(devnull, "w", encoding="utf-8") as null:
-        return check(code_string, "", Reporter(null, null)) == 0
+        return pyflakes_api.check(code_string, "", pyflakes_reporter.Reporter(null, null)) == 0
+
+
+CHECK_MODES = ("fast", "batch", "pyflakes")
+"""Modes of :py:func:`check_values`:
+
+- ``"fast"``: values are classified by :py:func:`classify`. Values it cannot classify are checked with pyflakes
+  as in the ``"batch"`` mode
+- ``"batch"``: values that consist of expressions are checked with a single pyflakes run,
+  other values are checked separately
+- ``"pyflakes"``: every value is checked with :py:func:`is_correct`
+"""
+
+if sys.version_info < (3, 8):
+    _CONSTANT_NODES: tuple = (ast.Num, ast.Str, ast.Bytes, ast.NameConstant, ast.Ellipsis)
+else:
+    _CONSTANT_NODES = (ast.Constant,)
+
+
+@lru_cache(maxsize=None)
+def _get_builtins() -> tp.FrozenSet[str]:
+    """Names pyflakes considers defined in any module"""
+    return frozenset(pyflakes_checker.Checker(ast.parse(""), filename="").builtIns)
+
+
+def get_bound_names(names: tp.List[str]) -> tp.Optional[tp.Set[str]]:
+    """Get names bound by the imports :py:func:`is_correct` adds before the code it checks
+
+    :param names: Namespace in which the correctness is asserted
+    :type names: list[str]
+    :return: Bound names. None if some of the ``names`` are not dotted identifiers
+    :rtype: set[str], optional
+    """
+    bound_names = set()
+    for name in map(str, names):
+        parts = name.split(".")
+        if not all(part.isidentifier() and not keyword.iskeyword(part) for part in parts):
+            return None
+        bound_names.add(unicodedata.normalize("NFKC", parts[0]))
+    return bound_names
+
+
+def classify(bound_names: tp.Set[str], code: str) -> tp.Optional[bool]:
+    """Check code for correctness without running pyflakes
+
+    Code that is not valid python is incorrect. Constants and references to defined names and their attributes
+    are correct. Other code is not classified.
+
+    :param bound_names: Names defined in the namespace, result of :py:func:`get_bound_names`
+    :type bound_names: set[str]
+    :param code: String to check for correctness
+    :type code: str
+    :return: The same value as :py:func:`is_correct` would return. None if code cannot be classified
+    :rtype: bool, optional
+    """
+    try:
+        tree = ast.parse(code)
+    except Exception:  # pylint: disable=broad-except
+        # pyflakes reports any error raised while parsing code
+        return False
+    if len(tree.body) == 0:
+        return True
+    if len(tree.body) != 1 or not isinstance(tree.body[0], ast.Expr):
+        return None
+    node = tree.body[0].value
+    if isinstance(node, _CONSTANT_NODES):
+        return True
+    while isinstance(node, ast.Attribute):
+        node = node.value
+    if isinstance(node, ast.Name):
+        return node.id in bound_names or node.id in _get_builtins()
+    return None
+
+
+MIN_VALUES_PER_WORKER = 256
+"""Minimum number of values :py:func:`check_values` passes to a single process"""
+
+_LINE_BREAKS = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+class _LineCollector:
+    """Pyflakes reporter that stores line numbers of the reported problems"""
+
+    def __init__(self):
+        self.lines: tp.Set[int] = set()
+        self.failed: bool = False
+
+    def unexpectedError(self, filename, msg):  # pylint: disable=invalid-name,unused-argument
+        self.failed = True
+
+    def syntaxError(self, filename, msg, lineno, offset, text):  # pylint: disable=invalid-name,unused-argument
+        self.failed = True
+
+    def flake(self, message):
+        self.lines.add(message.lineno)
+
+
+def _is_expression_list(code: str) -> bool:
+    """Check that code consists of expressions that do not bind names
+
+    Problems reported by pyflakes for such code do not depend on the code surrounding it.
+    """
+    if _LINE_BREAKS.search(code):
+        return False
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return False
+    return all(isinstance(statement, ast.Expr) for statement in tree.body) and not any(
+        isinstance(node, getattr(ast, "NamedExpr", ())) for node in ast.walk(tree)
+    )
+
+
+def _check_expression_lists(names: tp.List[str], values: tp.List[str]) -> tp.List[bool]:
+    """Check values returned :py:obj:`True` by :py:func:`_is_expression_list` with a single pyflakes run"""
+    preamble = [f"import {name}\n{name}" for name in names]
+    first_lines = []
+    line = 2 * len(names) + 1
+    for value in values:
+        first_lines.append(line)
+        line += value.count("\n") + 1
+
+    collector = _LineCollector()
+    with profiling.stage("pyflakes"):
+        pyflakes_api.check("\n".join([*preamble, *values]), "", collector)
+    if collector.failed or any(line < 2 * len(names) + 1 for line in collector.lines):
+        return [is_correct(names, value) for value in values]
+
+    return [
+        not any(first_line <= line < first_line + value.count("\n") + 1 for line in collector.lines)
+        for first_line, value in zip(first_lines, values)
+    ]
+
+
+def check_values(names: tp.List[str], values: tp.List[str], workers: int = 1, mode: str = "fast") -> tp.List[bool]:
+    """Check several values for correctness if names are available in the namespace.
+
+    Equivalent to calling :py:func:`is_correct` for every value.
+
+    :param names: Namespace in which the correctness is asserted
+    :type names: list[str]
+    :param values: Strings to check for correctness
+    :type values: list[str]
+    :param workers: Number of processes to check values in. Processes are used only if every process gets
+        at least :py:data:`MIN_VALUES_PER_WORKER` values, defaults to 1
+    :type workers: int
+    :param mode: One of :py:data:`CHECK_MODES`, defaults to ``"fast"``
+    :type mode: str
+    :return: Whether each value is a correct python code
+    :rtype: list[bool]
+
+    :raise :py:exc:`ValueError`:
+        If ``mode`` is not one of :py:data:`CHECK_MODES`
+    """
+    if mode not in CHECK_MODES:
+        raise ValueError(f"Unknown check mode {mode}, expected one of {CHECK_MODES}")
+    if mode == "pyflakes":
+        return [is_correct(names, value) for value in values]
+
+    result: tp.List[tp.Optional[bool]] = [None] * len(values)
+    bound_names = get_bound_names(names) if mode == "fast" else None
+    if bound_names is not None:
+        result = [classify(bound_names, value) for value in values]
+
+    batch = []
+    for index, value in enumerate(values):
+        if result[index] is not None:
+            continue
+        if _is_expression_list(value):
+            batch.append(index)
+        else:
+            result[index] = is_correct(names, value)
+
+    workers = min(workers, len(batch) // MIN_VALUES_PER_WORKER)
+    batch_values = [values[index] for index in batch]
+    if workers > 1:
+        chunk_size = -(-len(batch) // workers)
+        chunks = [batch_values[start : start + chunk_size] for start in range(0, len(batch), chunk_size)]  # noqa: E203
+        with ProcessPoolExecutor(workers) as executor:
+            chunk_results = executor.map(_check_expression_lists, [names] * len(chunks), chunks)
+            batch_result = [correct for chunk_result in chunk_results for correct in chunk_result]
+    elif batch:
+        batch_result = _check_expression_lists(names, batch_values)
+    else:
+        batch_result = []
+
+    for index, correct in zip(batch, batch_result):
+        result[index] = correct
+    return [bool(correct) for correct in result]
@@ -2,11 +2,11 @@
 """
 import logging
 import typing as tp
+from functools import lru_cache
 from pathlib import Path
 
 import libcst as cst
 import libcst.matchers as m
-from df_engine.core.actor import Actor  # type: ignore
 
 from df_script_parser.processors.dict_processors import NodeProcessor
 from df_script_parser.utils.convenience_functions import evaluate
@@ -16,6 +16,19 @@ from df_script_parser.utils.namespaces import Namespace
 call_matcher = m.OneOf(m.Assign(value=m.Call()), m.AnnAssign(value=m.Call()))
 
 
+@lru_cache(maxsize=None)
+def get_actor_arg_order() -> tp.Tuple[str, ...]:
+    """Get names of the :py:class:`~df_engine.core.actor.Actor` arguments in the order of their positions.
+    df_engine is imported on the first call
+
+    :return: Names of the arguments
+    :rtype: tuple[str, ...]
+    """
+    from df_engine.core.actor import Actor  # type: ignore # pylint: disable=import-outside-toplevel
+
+    return Actor.__init__.__wrapped__.__code__.co_varnames[1:]  # pylint: disable=no-member
+
+
 class Parser(m.MatcherDecoratableTransformer):
     """Class that parses python script files. Removes all the supported nodes
 
@@ -23,13 +36,20 @@ class Parser(m.MatcherDecoratableTransformer):
     :type project_root_dir: :py:class:`pathlib.Path`
     :param namespace: Namespace to store all the extracted objects in
     :type namespace: :py:class:`df_script_parser.utils.namespaces.Namespace`
+    :param check_workers: Number of processes used to check values for correctness, defaults to 1
+    :type check_workers: int
+    :param check_mode: Mode of checking values for correctness,
+        one of :py:data:`df_script_parser.processors.dict_processors.CHECK_MODES`, defaults to ``"fast"``
+    :type check_mode: str
     """
 
-    def __init__(self, project_root_dir: Path, namespace: Namespace):
+    def __init__(self, project_root_dir: Path, namespace: Namespace, check_workers: int = 1, check_mode: str = "fast"):
         super().__init__()
         self.project_root_dir: Path = Path(project_root_dir)
         self.namespace: Namespace = namespace
-        self.node_processor: NodeProcessor = NodeProcessor(namespace)
+        self.node_processor: NodeProcessor = NodeProcessor(
+            namespace, check_workers=check_workers, check_mode=check_mode
+        )
 
     def add_assignment(self, add_function: tp.Callable[..., None], node: tp.Union[cst.Assign, cst.AnnAssign], *args):
         """Process :py:class:`libcst.Assign` and :py:class:`libcst.AnnAssign`
@@ -90,17 +110,15 @@ class Parser(m.MatcherDecoratableTransformer):
         func_name = evaluate(cst.ensure_type(original_node.value, cst.Call).func)
         self.node_processor.parse_tuples = True
 
+        args: tp.Dict[tp.Union[str, int], tp.Any] = {}
         if self.namespace.get_absolute_name(func_name) in ["df_engine.core.actor.Actor", "df_engine.core.Actor"]:
-            args = {}
-            actor_arg_order = Actor.__init__.__wrapped__.__code__.co_varnames[1:]  # pylint: disable=no-member
-            for arg, keyword in zip(cst.ensure_type(original_node.value, cst.Call).args, actor_arg_order):
+            for arg, keyword in zip(cst.ensure_type(original_node.value, cst.Call).args, get_actor_arg_order()):
                 if arg.keyword is not None:
                     keyword = evaluate(arg.keyword)
                 args[keyword] = self.node_processor(arg.value)
                 logging.info("Found actor call arg %s = %s", keyword, args[keyword])
             self.add_assignment(self.namespace.add_function_call, original_node, func_name, args, True)
         else:
-            args = {}
             for idx, arg in enumerate(cst.ensure_type(original_node.value, cst.Call).args):
                 if arg.keyword is not None:
                     key: tp.Union[str, int] = evaluate(arg.keyword)
@@ -1,49 +1,226 @@
-"""This module contains a parser that recursively parses all the files imported in a root file
+"""This module contains a parser that recursively parses all the files imported in root files
 """
 import logging
 import typing as tp
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import ExitStack
 from pathlib import Path
 
 import libcst as cst
 
 from df_script_parser.processors.parse import Parser
+from df_script_parser.utils import profiling
 from df_script_parser.utils.code_wrappers import Python, String
-from df_script_parser.utils.convenience_functions import get_module_name, remove_suffix
+from df_script_parser.utils.convenience_functions import (
+    RootFiles,
+    get_module_name,
+    get_root_files,
+    remove_suffix,
+    split_dotted_name,
+)
 from df_script_parser.utils.exceptions import (
     KeyNotFoundError,
-    NamespaceNotParsedError,
-    ObjectNotFoundError,
+    ModuleNotFoundParserError,
     ResolutionError,
     ParserError,
     ScriptValidationError,
+    StaleCacheError,
 )
-from df_script_parser.utils.module_metadata import ModuleType
-from df_script_parser.utils.namespaces import Namespace, NamespaceTag, Request, Import, Call
+from df_script_parser.utils.module_metadata import ModuleType, get_module_info, module_info_cache
+from df_script_parser.utils.namespaces import Namespace, NamespaceTag, Operation, Request, Import, Call
+from df_script_parser.utils.parse_cache import ParseCache
 from df_script_parser.utils.validators import check_file_structure, validate_path
 
 
 ScriptDict = tp.Dict[tp.Union[Python, String], tp.Union["ScriptDict", Python, String]]  # type: ignore
 
 
+def extract_operations(
+    file: Path, project_root_dir: Path, check_mode: str = "fast"
+) -> tp.Optional[tp.Tuple[str, tp.List[Operation], tp.List[Path]]]:
+    """Parse a file without parsing the modules it imports and without validating actor arguments
+
+    Used by :py:meth:`RecursiveParser.prefetch` in worker processes or in the current process.
+
+    :param file: File to parse
+    :type file: :py:class:`pathlib.Path`
+    :param project_root_dir: Root directory of the project
+    :type project_root_dir: :py:class:`pathlib.Path`
+    :param check_mode: Mode of checking values for correctness, defaults to ``"fast"``
+    :type check_mode: str
+    :return: Cache key of the file, operations performed on its namespace and local modules imported in it.
+        None if the file cannot be parsed
+    :rtype: tuple[str, list[:py:data:`.Operation`], list[:py:class:`pathlib.Path`]], optional
+    """
+    local_imports: tp.List[Path] = []
+
+    def _collect_local_import(module_type: ModuleType, module_metadata: str) -> None:
+        if module_type == ModuleType.LOCAL:
+            local_imports.append(Path(module_metadata).absolute())
+
+    namespace = Namespace(file, project_root_dir, _collect_local_import)
+    try:
+        with open(file, "r", encoding="utf-8") as input_file:
+            py_contents = input_file.read()
+        transformer = Parser(project_root_dir, namespace, check_mode=check_mode)
+        check_file_structure(cst.parse_module(py_contents).visit(transformer))
+    except Exception as error:  # pylint: disable=broad-except
+        # the error is raised again when the file is parsed by :py:meth:`RecursiveParser.fill_namespace_from_file`
+        logging.debug("%s: %s\nparams:\nfile=%s", type(error), error, file)
+        return None
+    return ParseCache.get_key(py_contents, namespace.name), namespace.operations, local_imports
+
+
 class RecursiveParser:
-    """Parse multiple files inside project root dir starting with the root file
+    """Parse multiple files inside project root dir starting with one or several root files
 
     :param project_root_dir: Root directory of a project
     :type project_root_dir: :py:class:`pathlib.Path`
+    :param parse_cache: Cache of namespace contents. Files found in the cache are not parsed, defaults to None
+    :type parse_cache: :py:class:`.ParseCache`, optional
+    :param workers: Number of processes used to parse files. If greater than 1 files are parsed
+        by :py:meth:`RecursiveParser.prefetch` before they are added to namespaces, defaults to 1
+    :type workers: int
+    :param check_mode: Mode of checking values for correctness,
+        one of :py:data:`df_script_parser.processors.dict_processors.CHECK_MODES`, defaults to ``"fast"``
+    :type check_mode: str
+    :param check_workers: Number of processes used to check values of a file for correctness.
+        Used for files parsed in this process, defaults to 1
+    :type check_workers: int
+    :param namespace_done_hook: Function that is called with a namespace name and contents when all
+        the contents of the namespace are collected, defaults to None
+    :type namespace_done_hook: Callable[[:py:class:`.NamespaceTag`, dict], None], optional
     """
 
     def __init__(
         self,
         project_root_dir: Path,
+        parse_cache: tp.Optional[ParseCache] = None,
+        workers: int = 1,
+        check_mode: str = "fast",
+        namespace_done_hook: tp.Optional[tp.Callable[[NamespaceTag, dict], None]] = None,
+        check_workers: int = 1,
     ):
         self.project_root_dir = Path(project_root_dir).absolute()
+        self.parse_cache = parse_cache
+        self.workers = workers
+        self.check_mode = check_mode
+        self.check_workers = check_workers
+        self.namespace_done_hook = namespace_done_hook
+        self.memo: tp.Dict[Path, tp.Tuple[str, tp.List[Operation]]] = {}
         self.requirements: tp.List[str] = []
         self.namespaces: tp.Dict[NamespaceTag, tp.Union[Namespace, None]] = {}
         self.unprocessed: tp.List[NamespaceTag] = []
+        self.imported_by: tp.Dict[Path, tp.Set[Path]] = {}
+        self.parsing: tp.List[Path] = []
+        self.objects: tp.Dict[tp.Tuple[str, str], tp.Any] = {}
+        self.resolved: tp.Dict[tp.Tuple[str, ...], tp.Any] = {}
         self.script: tp.Optional[Python] = None
         self.start_label: tp.Optional[tp.Tuple[tp.Union[Python, String]]] = None
         self.fallback_label: tp.Optional[tp.Tuple[tp.Union[Python, String]]] = None
 
+    def reset(self) -> None:
+        """Forget the results of the previous parsing. Keep :py:attr:`RecursiveParser.memo`
+
+        :return: None
+        """
+        self.requirements = []
+        self.namespaces = {}
+        self.unprocessed = []
+        self.imported_by = {}
+        self.parsing = []
+        self.objects = {}
+        self.resolved = {}
+
+    def invalidate(self, files: tp.Iterable[Path]) -> tp.Set[Path]:
+        """Remove files and all the files that import them directly or indirectly from :py:attr:`RecursiveParser.memo`
+
+        Importing files are found using the import graph of the last parsing.
+
+        :param files: Changed files
+        :type files: Iterable[:py:class:`pathlib.Path`]
+        :return: Files of the project affected by the change
+        :rtype: set[:py:class:`pathlib.Path`]
+        """
+        affected: tp.Set[Path] = set()
+        stack = [Path(file).absolute() for file in files]
+        while stack:
+            file = stack.pop()
+            if file in affected or file not in self.imported_by:
+                continue
+            affected.add(file)
+            self.memo.pop(file, None)
+            stack.extend(self.imported_by[file])
+        return affected
+
+    def index_name(self, namespace: Namespace, name: Python, obj: tp.Any) -> None:
+        """Add name hook for :py:class:`.Namespace`
+
+        Adds an object to :py:attr:`RecursiveParser.objects`, an index of objects of all the namespaces by
+        namespace names and object names. Drops resolved names memoized in :py:attr:`RecursiveParser.resolved`
+
+        :param namespace: Namespace the object is added to
+        :type namespace: :py:class:`.Namespace`
+        :param name: Name of the object
+        :type name: :py:class:`.Python`
+        :param obj: The object
+        :return: None
+        """
+        self.objects[(namespace.name, name.absolute_value)] = obj
+        self.resolved.clear()
+
+    def unindex_namespace(self, namespace: Namespace) -> None:
+        """Remove objects of a namespace from :py:attr:`RecursiveParser.objects`
+
+        :param namespace: Namespace to remove
+        :type namespace: :py:class:`.Namespace`
+        :return: None
+        """
+        for name in namespace.names:
+            self.objects.pop((namespace.name, name.absolute_value), None)
+        self.resolved.clear()
+
+    @staticmethod
+    def _split_name(name: str) -> tp.Tuple[str, ...]:
+        parts = split_dotted_name(name)
+        if parts is not None:
+            return tuple(parts)
+        return tuple(map(repr, Request.from_str(name).attributes))
+
+    def _resolve(self, attributes: tp.Tuple[str, ...], resolving: tp.Set[tp.Tuple[str, ...]]) -> tp.Any:
+        """Find an object by attributes of its request. Aliases are followed until a non-alias object is found
+
+        :param attributes: Attributes of a request
+        :type attributes: tuple[str, ...]
+        :param resolving: Attributes being resolved, used to stop at circular aliases
+        :type resolving: set[tuple[str, ...]]
+        :return: The object. None if the object is not found
+        """
+        if attributes in self.resolved:
+            return self.resolved[attributes]
+        if attributes in resolving:
+            logging.debug("Circular reference: %s", ".".join(attributes))
+            return None
+        resolving.add(attributes)
+
+        # try the longest namespace names first
+        for i in reversed(range(1, len(attributes))):
+            obj = self.objects.get((".".join(attributes[:i]), attributes[i]))
+            if obj is None:
+                continue
+            if isinstance(obj, Python):
+                try:
+                    target = self._split_name(obj.absolute_value)
+                except ResolutionError as error:
+                    logging.debug("Name not found reason: %s", error)
+                    continue
+                obj = self._resolve(target + attributes[i + 1 :], resolving)  # noqa: E203
+                if obj is None:
+                    continue
+            self.resolved[attributes] = obj
+            return obj
+        return None
+
     def get_object(self, request: Request) -> tp.Union[dict, Call]:
         """Return an object requested in ``request``
 
@@ -52,29 +229,30 @@ class RecursiveParser:
         :return: Object requested in a ``request``
         :rtype: dict
 
-        :raise :py:exc:`df_script_parser.exceptions.ObjectNotFoundError`:
+        :raise :py:exc:`df_script_parser.exceptions.ResolutionError`:
             If a requested object is not found
         """
-        for i in reversed(range(1, len(request.attributes))):
-            try:
-                left = request.attributes[:i]
-                middle = request.attributes[i]
-                right = request.attributes[i + 1 :]  # noqa: E203
-                potential_namespace = NamespaceTag(".".join(map(repr, left)))
-                namespace = self.namespaces.get(potential_namespace)
-                if namespace is None:
-                    raise NamespaceNotParsedError(f"Not found namespace {repr(potential_namespace)}, request={request}")
-                name = namespace.names.get(middle)
-                if name is None:
-                    raise ObjectNotFoundError(
-                        f"Not found {request.attributes[-1]} in {potential_namespace}, request={request}"
-                    )
-                if isinstance(name, Python):
-                    name = self.get_object(Request.from_str(".".join([name.absolute_value, *map(repr, right)])))
-                return name
-            except ResolutionError as error:
-                logging.debug("Name not found reason: %s", error)
-        raise ResolutionError(f"Cannot find object {request}")
+        obj = self._resolve(tuple(map(repr, request.attributes)), set())
+        if obj is None:
+            raise ResolutionError(f"Cannot find object {request}")
+        return obj
+
+    def get_object_by_name(self, name: str) -> tp.Union[dict, Call]:
+        """Return an object referred to by an absolute name. The same as
+        ``get_object(Request.from_str(name))`` but dotted names are not parsed
+
+        :param name: Absolute name of an object
+        :type name: str
+        :return: The object
+        :rtype: dict
+
+        :raise :py:exc:`df_script_parser.exceptions.ResolutionError`:
+            If a requested object is not found
+        """
+        obj = self._resolve(self._split_name(name), set())
+        if obj is None:
+            raise ResolutionError(f"Cannot find object {name}")
+        return obj
 
     def traverse_dict(
         self,
@@ -84,6 +262,8 @@ class RecursiveParser:
     ):
         """Traverse a dictionary as a tree call ``func`` at leaf nodes of a tree
 
+        The tree is traversed iteratively. References to other objects are resolved once per traversal.
+
         :param script: Dictionary to traverse
         :type script: :py:class:`.ScriptDict`
         :param func: Function to be called
@@ -92,22 +272,55 @@ class RecursiveParser:
         :param traversed_path: Path to the current node, defaults to None
         :type traversed_path: list[:py:class:`.Python` | :py:class:`.String`], optional
         :return: None
+
+        :raise :py:exc:`df_script_parser.utils.exceptions.ScriptValidationError`:
+            If a dictionary contains itself
         """
-        if traversed_path is None:
-            traversed_path = []
-        for key in script:
-            value = script[key]
-            while isinstance(value, Python):
-                absolute_value = value.absolute_value
-                try:
-                    value = self.get_object(Request.from_str(absolute_value))
-                except ResolutionError:
-                    logging.debug("Cannot resolve request: %s", absolute_value)
-                    break
+        path: tp.List[tp.Union[Python, String]] = list(traversed_path) if traversed_path else []
+        resolved: tp.Dict[str, tp.Any] = {}
+        traversed_dicts: tp.Set[int] = {id(script)}
+        stack: tp.List[tp.Tuple[dict, tp.Iterator[tp.Tuple[tp.Any, tp.Any]]]] = [(script, iter(script.items()))]
+        while stack:
+            current, items = stack[-1]
+            item = next(items, None)
+            if item is None:
+                stack.pop()
+                traversed_dicts.discard(id(current))
+                if stack:
+                    path.pop()
+                continue
+
+            key, value = item
+            if isinstance(value, Python):
+                value = self._resolve_reference(value, resolved)
             if isinstance(value, dict):
-                self.traverse_dict(value, func, traversed_path + [key])
+                if id(value) in traversed_dicts:
+                    raise ScriptValidationError(f"Circular reference in a script: {path + [key]}")
+                traversed_dicts.add(id(value))
+                path.append(key)
+                stack.append((value, iter(value.items())))
             else:
-                func(traversed_path + [key], value)
+                func(path + [key], value)
+
+    def _resolve_reference(self, value: Python, resolved: tp.Dict[str, tp.Any]) -> tp.Any:
+        """Get an object a :py:class:`.Python` value refers to
+
+        :param value: Value to resolve
+        :type value: :py:class:`.Python`
+        :param resolved: Objects already resolved by their absolute names. Unresolved names are mapped to None
+        :type resolved: dict[str, Any]
+        :return: The object. ``value`` if it does not refer to an object
+        """
+        absolute_value = value.absolute_value
+        if absolute_value not in resolved:
+            try:
+                resolved[absolute_value] = self.get_object_by_name(absolute_value)
+            except ResolutionError:
+                logging.debug("Cannot resolve request: %s", absolute_value)
+                resolved[absolute_value] = None
+        if resolved[absolute_value] is None:
+            return value
+        return resolved[absolute_value]
 
     def check_node_existence(
         self,
@@ -126,7 +339,7 @@ class RecursiveParser:
         value: tp.Union[ScriptDict, Import, Python, Call, String] = script
         for key in path:
             if isinstance(value, Python):
-                value = self.get_object(Request.from_str(value.absolute_value))
+                value = self.get_object_by_name(value.absolute_value)
             if not isinstance(value, dict):
                 raise ResolutionError(f"Object {value} is not a dict.")
 
@@ -137,6 +350,7 @@ class RecursiveParser:
             value = value[key]
         return value
 
+    @profiling.profiled("check_actor_args")
     def check_actor_args(self, actor_args: dict):
         """Checks :py:class:`~df_engine.core.actor.Actor` args for correctness
 
@@ -155,8 +369,7 @@ class RecursiveParser:
         if not isinstance(script, dict):
             if not isinstance(script, Python):
                 raise RuntimeError(f"Script argument in actor is not a Python instance: {script}")
-            script_request = Request.from_str(script.absolute_value)
-            script = self.get_object(script_request)
+            script = self.get_object_by_name(script.absolute_value)
             if not isinstance(script, dict):
                 raise RuntimeError(f"Script is not a dict: {script}")
 
@@ -180,6 +393,10 @@ class RecursiveParser:
         if module_type == ModuleType.PIP and module_metadata not in self.requirements:
             self.requirements.append(module_metadata)
         if module_type == ModuleType.LOCAL:
+            imported_by = self.imported_by.setdefault(Path(module_metadata).absolute(), set())
+            if self.parsing:
+                imported_by.add(self.parsing[-1])
+
             module_name = get_module_name(Path(module_metadata), self.project_root_dir)
 
             tag = NamespaceTag(module_name, remove_suffix(module_name, ".__init__"))
@@ -187,25 +404,54 @@ class RecursiveParser:
             if tag not in self.namespaces or self.namespaces[tag] is None:
 
                 namespace = self.namespaces[tag] = Namespace(
-                    Path(module_metadata), self.project_root_dir, self.process_import, self.check_actor_args
+                    Path(module_metadata),
+                    self.project_root_dir,
+                    self.process_import,
+                    self.check_actor_args,
+                    self.index_name,
                 )
 
                 try:
                     self.fill_namespace_from_file(Path(module_metadata).absolute(), namespace)
                     logging.info("Added namespace %s", namespace.name)
+                    if self.namespace_done_hook:
+                        self.namespace_done_hook(tag, namespace.names)
                     return namespace
                 except ParserError as error:
                     self.unprocessed.append(tag)
                     logging.warning("File %s not included: %s", module_metadata, error)
         return None
 
-    def fill_namespace_from_file(self, file: Path, namespace: Namespace) -> Parser:
+    def fill_namespace_from_file(self, file: Path, namespace: Namespace) -> tp.Optional[Parser]:
         """Parse a file, add its contents to a namespace
 
+        If the file is found in :py:attr:`RecursiveParser.memo` or :py:attr:`RecursiveParser.parse_cache`
+        its contents are replayed instead
+
         :param file:
         :param namespace:
-        :return:
+        :return: Transformer used to parse the file. None if the file contents were taken from the cache
         """
+        file = Path(file).absolute()
+        self.parsing.append(file)
+        try:
+            with profiling.stage("parse_file", file):
+                return self._fill_namespace_from_file(file, namespace)
+        finally:
+            self.parsing.pop()
+
+    def _load_operations(self, file: Path, cache_key: str) -> tp.Optional[tp.List[Operation]]:
+        if file in self.memo and self.memo[file][0] == cache_key:
+            profiling.count("memo", True)
+            return self.memo[file][1]
+        profiling.count("memo", False)
+        if self.parse_cache is not None:
+            operations = self.parse_cache.load(cache_key)
+            profiling.count("parse_cache", operations is not None)
+            return operations
+        return None
+
+    def _fill_namespace_from_file(self, file: Path, namespace: Namespace) -> tp.Optional[Parser]:
         # Add parent init files to namespaces
         path_to_file = Path(file).absolute().parent.relative_to(self.project_root_dir.parent).parts
 
@@ -218,31 +464,148 @@ class RecursiveParser:
                 self.namespaces[tag] = None
 
         # Parse file contents
-        with open(file, "r", encoding="utf-8") as input_file:
+        with profiling.stage("read"), open(file, "r", encoding="utf-8") as input_file:
             py_contents = input_file.read()
 
-        parsed_file = cst.parse_module(py_contents)
+        cache_key = ParseCache.get_key(py_contents, namespace.name)
+        operations = self._load_operations(file, cache_key)
+        if operations is not None:
+            try:
+                with profiling.stage("replay"):
+                    namespace.replay(operations)
+                self.memo[file] = (cache_key, operations)
+                logging.debug("Loaded namespace %s from cache", namespace.name)
+                return None
+            except StaleCacheError as error:
+                logging.debug("Cache entry of %s is stale: %s", namespace.name, error)
+                self.unindex_namespace(namespace)
+                namespace.clear()
+
+        with profiling.stage("libcst_parse"):
+            parsed_file = cst.parse_module(py_contents)
+
+        transformer = Parser(
+            self.project_root_dir, namespace, check_workers=self.check_workers, check_mode=self.check_mode
+        )
 
-        transformer = Parser(self.project_root_dir, namespace)
+        with profiling.stage("transform"):
+            transformed_file = parsed_file.visit(transformer)
+        check_file_structure(transformed_file)
 
-        check_file_structure(parsed_file.visit(transformer))
+        self.memo[file] = (cache_key, namespace.operations)
+        if self.parse_cache is not None:
+            self.parse_cache.save(cache_key, namespace.operations)
         return transformer
 
-    def parse_project_dir(self, starting_from_file: Path) -> dict:
-        """Parse a file, mark it as a Root file.
-
-        :param starting_from_file:
-        :return:
+    def _get_local_imports(self, file: Path, operations: tp.List[Operation]) -> tp.List[Path]:
+        local_imports = []
+        for method, args, _ in operations:
+            if method in ("add_import", "add_from_import"):
+                try:
+                    module_type, module_metadata = get_module_info(args[0], file.parent)
+                except ModuleNotFoundParserError:
+                    continue
+                if module_type == ModuleType.LOCAL:
+                    local_imports.append(Path(module_metadata).absolute())
+        return local_imports
+
+    def prefetch(self, starting_from_file: RootFiles) -> None:
+        """Parse all the local modules imported by files directly or indirectly in a process pool.
+        Store the results in :py:attr:`RecursiveParser.memo`
+
+        Files found in :py:attr:`RecursiveParser.memo` or in the parse cache are not parsed again.
+        The process pool is started only when at least two files need parsing at the same time,
+        a single file is parsed in the current process.
+
+        :param starting_from_file: File or files to start with
+        :type starting_from_file: :py:class:`pathlib.Path` | Iterable[:py:class:`pathlib.Path`]
+        :return: None
+        """
+        seen: tp.Set[Path] = set()
+        pending: tp.List[Path] = []
+        futures: tp.Dict[Future, Path] = {}
+
+        def _visit(file: Path) -> None:
+            if file in seen:
+                return
+            seen.add(file)
+            with open(file, "r", encoding="utf-8") as input_file:
+                module_name = remove_suffix(get_module_name(file, self.project_root_dir), ".__init__")
+                cache_key = ParseCache.get_key(input_file.read(), module_name)
+            operations = self._load_operations(file, cache_key)
+            if operations is None:
+                pending.append(file)
+                return
+            self.memo[file] = (cache_key, operations)
+            for local_import in self._get_local_imports(file, operations):
+                _visit(local_import)
+
+        def _store(file: Path, result: tp.Optional[tp.Tuple[str, tp.List[Operation], tp.List[Path]]]) -> None:
+            if result is None:
+                return
+            cache_key, operations, local_imports = result
+            self.memo[file] = (cache_key, operations)
+            if self.parse_cache is not None:
+                self.parse_cache.save(cache_key, operations)
+            for local_import in local_imports:
+                _visit(local_import)
+
+        for root_file in get_root_files(starting_from_file):
+            _visit(root_file)
+
+        with ExitStack() as stack:
+            executor: tp.Optional[ProcessPoolExecutor] = None
+            while pending or futures:
+                if executor is None and len(pending) == 1:
+                    file = pending.pop()
+                    _store(file, extract_operations(file, self.project_root_dir, self.check_mode))
+                    continue
+                if executor is None:
+                    executor = stack.enter_context(ProcessPoolExecutor(self.workers))
+                for file in pending:
+                    futures[executor.submit(extract_operations, file, self.project_root_dir, self.check_mode)] = file
+                pending.clear()
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file = futures.pop(future)
+                    _store(file, future.result())
+
+    def parse_project_dir(self, starting_from_file: RootFiles) -> dict:
+        """Parse root files and all the local modules they import. Modules imported by several root files
+        are parsed once
+
+        :param starting_from_file: Root file or several root files
+        :type starting_from_file: :py:class:`pathlib.Path` | Iterable[:py:class:`pathlib.Path`]
+        :return: Result of :py:meth:`RecursiveParser.to_dict`
+        :rtype: dict
         """
-        starting_from_file = Path(starting_from_file).absolute()
-        module_name = get_module_name(starting_from_file, self.project_root_dir)
+        root_files = get_root_files(starting_from_file)
+        if self.parse_cache is not None:
+            module_info_cache.load(self.parse_cache.module_info_file)
+        if self.workers > 1:
+            self.prefetch(root_files)
 
-        tag = NamespaceTag(module_name, remove_suffix(module_name, ".__init__"))
-        namespace = self.namespaces[tag] = Namespace(
-            starting_from_file, self.project_root_dir, self.process_import, self.check_actor_args
-        )
+        for root_file in root_files:
+            self.imported_by.setdefault(root_file, set())
+            module_name = get_module_name(root_file, self.project_root_dir)
 
-        self.fill_namespace_from_file(starting_from_file, namespace)
+            tag = NamespaceTag(module_name, remove_suffix(module_name, ".__init__"))
+            if self.namespaces.get(tag) is not None:
+                # the root file is imported by one of the previous root files
+                continue
+            namespace = self.namespaces[tag] = Namespace(
+                root_file, self.project_root_dir, self.process_import, self.check_actor_args, self.index_name
+            )
+
+            self.fill_namespace_from_file(root_file, namespace)
+            if self.namespace_done_hook:
+                self.namespace_done_hook(tag, namespace.names)
+
+        if self.parse_cache is not None:
+            self.parse_cache.evict()
+            # merge entries saved by other processes since the file was loaded
+            module_info_cache.load(self.parse_cache.module_info_file)
+            module_info_cache.save(self.parse_cache.module_info_file)
 
         return self.to_dict()
 
@@ -0,0 +1,421 @@
+"""This module contains a long-lived conversion server and a client that sends commands to it
+
+Every run of :py:func:`.py2yaml` in a new process imports libcst and df_engine, reads metadata of
+the installed distributions and resolves the imported modules again. The server runs these commands
+in a single process so that imported modules, :py:data:`df_script_parser.utils.module_metadata.module_info_cache`
+and the parsed files of recently converted projects stay in memory between commands.
+
+The server listens on localhost. Its address and a secret token are written to a server file that is readable
+only by its owner (:py:data:`df_script_parser.cli.DEFAULT_SERVER_FILE` by default). Clients read the file
+to find the server and send the token with every command. Commands are executed one at a time.
+
+Protocol: ``POST /<command>`` with a json object of the command arguments. Paths are absolute.
+The response is a json object with the ``"result"`` of the command or with the ``"error"`` class name
+and its ``"message"``. ``GET /status`` returns the version of the server, its pid and the loaded projects.
+"""
+import hmac
+import json
+import logging
+import os
+import secrets
+import signal
+import threading
+import time
+import typing as tp
+from collections import OrderedDict
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+from df_script_parser import __version__, tools
+from df_script_parser.cli import DEFAULT_MAX_PROJECTS, DEFAULT_SERVER_FILE, run_profiled
+from df_script_parser.utils import exceptions
+from df_script_parser.utils.convenience_functions import RootFiles
+from df_script_parser.utils.exceptions import ParserError, ServerError, ServerUnavailableError
+from df_script_parser.utils.file_watcher import FileWatcher
+from df_script_parser.utils.module_metadata import get_environment_fingerprint
+from df_script_parser.utils.parse_cache import DEFAULT_MAX_CACHE_SIZE
+
+if tp.TYPE_CHECKING:
+    from df_script_parser.processors.recursive_parser import RecursiveParser
+
+COMMANDS = ("py2yaml", "yaml2py", "validate")
+"""Commands executed by the server"""
+
+PATH_ARGUMENTS = (
+    "root_file",
+    "project_root_dir",
+    "output_file",
+    "requirements",
+    "cache_dir",
+    "yaml_file",
+    "extract_to_directory",
+    "profile",
+)
+"""Command arguments that are paths. They are sent as absolute paths"""
+
+
+def _convert_paths(key: str, value: tp.Any, convert: tp.Callable[[tp.Any], tp.Any]) -> tp.Any:
+    """Convert a path or a list of paths (several root files) if ``key`` is one of :py:data:`PATH_ARGUMENTS`"""
+    if key not in PATH_ARGUMENTS or value is None:
+        return value
+    if isinstance(value, list):
+        return [convert(path) for path in value]
+    return convert(value)
+
+
+class ProjectPool:
+    """Least recently used parsers of projects
+
+    Parsers are keyed by the project root directory and the parser settings. Before a parser is reused
+    the files of its project that changed since the previous command are removed from its memo.
+
+    :param max_projects: Maximum number of parsers, defaults to :py:data:`df_script_parser.cli.DEFAULT_MAX_PROJECTS`
+    :type max_projects: int
+    """
+
+    def __init__(self, max_projects: int = DEFAULT_MAX_PROJECTS):
+        self.max_projects = max_projects
+        self.projects: tp.Dict[tuple, tp.Tuple["RecursiveParser", FileWatcher]] = OrderedDict()
+
+    def get(
+        self,
+        project_root_dir: Path,
+        cache_dir: tp.Optional[Path] = None,
+        cache_size: int = DEFAULT_MAX_CACHE_SIZE,
+        workers: int = 1,
+        check_mode: str = "fast",
+        check_workers: int = 1,
+    ) -> "RecursiveParser":
+        """Get a parser of a project. Create it with :py:func:`df_script_parser.tools.create_parser`
+        if the project is not in the pool. Evict the least recently used parser if the pool is full
+
+        See :py:func:`df_script_parser.tools.py2yaml` for the description of the parameters.
+
+        :return: Parser of the project
+        :rtype: :py:class:`.RecursiveParser`
+        """
+        # installed distributions may change between commands; cached entries are keyed by the fingerprint
+        get_environment_fingerprint.cache_clear()
+
+        project_root_dir = Path(project_root_dir).absolute()
+        key = (
+            project_root_dir,
+            Path(cache_dir).absolute() if cache_dir else None,
+            cache_size,
+            workers,
+            check_mode,
+            check_workers,
+        )
+        if key in self.projects:
+            recursive_parser, watcher = self.projects.pop(key)
+            affected = recursive_parser.invalidate(watcher.poll())
+            logging.debug("Files affected by changes in %s: %s", project_root_dir, affected)
+        else:
+            recursive_parser = tools.create_parser(
+                project_root_dir, cache_dir, cache_size, workers, check_mode, check_workers
+            )
+            watcher = FileWatcher(project_root_dir)
+        self.projects[key] = (recursive_parser, watcher)
+        while len(self.projects) > self.max_projects:
+            evicted = next(iter(self.projects))
+            del self.projects[evicted]
+            logging.debug("Evicted project %s", evicted[0])
+        return recursive_parser
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Handler of the requests to :py:class:`ConversionServer`"""
+
+    server: "ConversionServer"
+
+    def _send_json(self, code: int, contents: dict) -> None:
+        body = json.dumps(contents).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        if hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {self.server.token}"):
+            return True
+        self._send_json(403, {"error": "ServerError", "message": "Wrong token"})
+        return False
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if not self._authorized():
+            return
+        if self.path != "/status":
+            self._send_json(404, {"error": "ServerError", "message": f"Unknown path {self.path}"})
+            return
+        self._send_json(200, {"result": self.server.status()})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        if not self._authorized():
+            return
+        command = self.path.lstrip("/")
+        try:
+            args = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            result = self.server.execute(command, args)
+        except (ParserError, ValueError, TypeError) as error:
+            self._send_json(400, {"error": type(error).__name__, "message": str(error)})
+            return
+        except Exception as error:  # pylint: disable=broad-except
+            logging.exception("Command %s failed", command)
+            self._send_json(500, {"error": type(error).__name__, "message": str(error)})
+            return
+        self._send_json(200, {"result": result})
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logging.debug("%s - " + format, self.address_string(), *args)
+
+
+class ConversionServer(HTTPServer):
+    """Server that executes :py:data:`COMMANDS` in its process
+
+    :param host: Host to listen on, defaults to ``"127.0.0.1"``
+    :type host: str
+    :param port: Port to listen on. If 0 a free port is chosen, defaults to 0
+    :type port: int
+    :param max_projects: Number of projects whose parsers are kept in memory,
+        defaults to :py:data:`df_script_parser.cli.DEFAULT_MAX_PROJECTS`
+    :type max_projects: int
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, max_projects: int = DEFAULT_MAX_PROJECTS):
+        super().__init__((host, port), _RequestHandler)
+        self.token = secrets.token_hex(16)
+        self.projects = ProjectPool(max_projects)
+        self.commands: tp.Dict[str, tp.Callable] = {
+            "py2yaml": self.py2yaml,
+            "yaml2py": tools.yaml2py,
+            "validate": self.validate,
+        }
+
+    def save_address(self, server_file: Path) -> None:
+        """Write the address and the token of the server to a server file that is readable only by its owner
+
+        :param server_file: File to write to
+        :type server_file: :py:class:`pathlib.Path`
+        :return: None
+        """
+        info = {
+            "host": self.server_address[0],
+            "port": self.server_address[1],
+            "token": self.token,
+            "pid": os.getpid(),
+            "version": __version__,
+        }
+        server_file = Path(server_file)
+        server_file.parent.mkdir(parents=True, exist_ok=True)
+        if server_file.exists():
+            server_file.unlink()
+        # the token gives access to the files of the user
+        descriptor = os.open(str(server_file), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(descriptor, "w", encoding="utf-8") as outfile:
+            json.dump(info, outfile)
+
+    def status(self) -> dict:
+        """Get the status of the server
+
+        :return: Dictionary with the version of the server, its pid and the root directories of the loaded projects
+        :rtype: dict
+        """
+        return {
+            "version": __version__,
+            "pid": os.getpid(),
+            "projects": [str(key[0]) for key in self.projects.projects],
+        }
+
+    def execute(self, command: str, args: dict) -> tp.Any:
+        """Execute a command
+
+        :param command: One of :py:data:`COMMANDS`
+        :type command: str
+        :param args: Arguments of the command. Paths must be absolute
+        :type args: dict
+        :return: Result of the command
+        """
+        if command not in self.commands:
+            raise ServerError(f"Unknown command {command}, expected one of {COMMANDS}")
+        args = {key: _convert_paths(key, value, Path) for key, value in args.items()}
+        start = time.perf_counter()
+        result = run_profiled(self.commands[command], args)
+        logging.info("Executed %s in %.3fs", command, time.perf_counter() - start)
+        return result
+
+    def py2yaml(
+        self,
+        root_file: RootFiles,
+        project_root_dir: Path,
+        output_file: Path,
+        requirements: tp.Optional[Path] = None,
+        cache_dir: tp.Optional[Path] = None,
+        cache_size: int = DEFAULT_MAX_CACHE_SIZE,
+        workers: int = 1,
+        check_mode: str = "fast",
+        check_workers: int = 1,
+        stream: bool = False,
+        output_format: tp.Optional[str] = None,
+        yaml_mode: str = "rt",
+        watch: bool = False,
+        poll_interval: float = 1.0,  # pylint: disable=unused-argument
+    ) -> None:
+        """:py:func:`df_script_parser.tools.py2yaml` that reuses the parser of the project
+
+        :raise :py:exc:`ValueError`: If ``watch`` is True. Watch mode is not supported by the server
+        """
+        if watch:
+            raise ValueError("Watch mode is not supported by the server")
+        recursive_parser = self.projects.get(
+            project_root_dir, cache_dir, cache_size, workers, check_mode, check_workers
+        )
+        tools.dump_project(recursive_parser, root_file, output_file, requirements, stream, output_format, yaml_mode)
+
+    def validate(
+        self,
+        root_file: RootFiles,
+        project_root_dir: Path,
+        cache_dir: tp.Optional[Path] = None,
+        cache_size: int = DEFAULT_MAX_CACHE_SIZE,
+        workers: int = 1,
+        check_mode: str = "fast",
+        check_workers: int = 1,
+    ) -> dict:
+        """:py:func:`df_script_parser.tools.validate` that reuses the parser of the project"""
+        recursive_parser = self.projects.get(
+            project_root_dir, cache_dir, cache_size, workers, check_mode, check_workers
+        )
+        return tools.validate_project(recursive_parser, root_file)
+
+
+def _read_server_file(server_file: Path) -> dict:
+    try:
+        with open(server_file, "r", encoding="utf-8") as infile:
+            return json.load(infile)
+    except (OSError, ValueError) as error:
+        raise ServerUnavailableError(f"Cannot read server file {server_file}: {error}") from error
+
+
+def _request(info: dict, method: str, path: str, args: tp.Optional[dict] = None) -> tp.Any:
+    """Send a request to a server
+
+    :param info: Contents of the server file
+    :type info: dict
+    :return: Result of the request
+
+    :raise :py:exc:`df_script_parser.utils.exceptions.ServerUnavailableError`: If the server cannot be reached
+    """
+    connection = HTTPConnection(info["host"], info["port"])
+    try:
+        body = None if args is None else json.dumps(args).encode("utf-8")
+        headers = {"Authorization": f"Bearer {info['token']}", "Content-Type": "application/json"}
+        try:
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+        except OSError as error:
+            raise ServerUnavailableError(f"Cannot connect to the server at {info['host']}:{info['port']}") from error
+        contents = json.loads(response.read())
+    finally:
+        connection.close()
+    if "error" in contents:
+        raise _get_error(contents["error"], contents["message"])
+    return contents["result"]
+
+
+def _get_error(name: str, message: str) -> Exception:
+    """Recreate an exception raised by a command on the server"""
+    error_class = ValueError if name == "ValueError" else getattr(exceptions, name, None)
+    if isinstance(error_class, type) and issubclass(error_class, (ParserError, ValueError)):
+        return error_class(message)
+    return ServerError(f"{name}: {message}")
+
+
+def get_status(server_file: Path = DEFAULT_SERVER_FILE) -> dict:
+    """Get the status of a running server, see :py:meth:`ConversionServer.status`
+
+    :param server_file: Server file of the server, defaults to :py:data:`df_script_parser.cli.DEFAULT_SERVER_FILE`
+    :type server_file: :py:class:`pathlib.Path`
+    :return: Status of the server
+    :rtype: dict
+
+    :raise :py:exc:`df_script_parser.utils.exceptions.ServerUnavailableError`: If the server is not running
+    """
+    return _request(_read_server_file(server_file), "GET", "/status")
+
+
+def send_command(command: str, args: dict, server_file: Path = DEFAULT_SERVER_FILE) -> tp.Any:
+    """Execute a command on a running server
+
+    :param command: One of :py:data:`COMMANDS`
+    :type command: str
+    :param args: Arguments of the command, see :py:mod:`df_script_parser.tools`.
+        Relative paths are resolved against the current directory
+    :type args: dict
+    :param server_file: Server file of the server, defaults to :py:data:`df_script_parser.cli.DEFAULT_SERVER_FILE`
+    :type server_file: :py:class:`pathlib.Path`
+    :return: Result of the command
+
+    :raise :py:exc:`df_script_parser.utils.exceptions.ServerUnavailableError`:
+        If the server is not running or runs a different version of :py:mod:`df_script_parser`
+    :raise :py:exc:`df_script_parser.utils.exceptions.ParserError`: If the command fails. Exceptions
+        raised by the command are raised again if they are :py:exc:`ValueError` or defined
+        in :py:mod:`df_script_parser.utils.exceptions`, otherwise :py:exc:`.ServerError` is raised
+    """
+    info = _read_server_file(server_file)
+    if info.get("version") != __version__:
+        raise ServerUnavailableError(f"Server runs version {info.get('version')}, expected {__version__}")
+    args = {key: _convert_paths(key, value, lambda path: str(Path(path).absolute())) for key, value in args.items()}
+    return _request(info, "POST", f"/{command}", args)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt()
+
+
+def serve(
+    server_file: Path = DEFAULT_SERVER_FILE,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    max_projects: int = DEFAULT_MAX_PROJECTS,
+) -> None:
+    """Run a :py:class:`ConversionServer` until it is interrupted
+
+    :param server_file: File to write the address and the token of the server to. It is removed when
+        the server stops, defaults to :py:data:`df_script_parser.cli.DEFAULT_SERVER_FILE`
+    :type server_file: :py:class:`pathlib.Path`
+    :param host: Host to listen on, defaults to ``"127.0.0.1"``
+    :type host: str
+    :param port: Port to listen on. If 0 a free port is chosen, defaults to 0
+    :type port: int
+    :param max_projects: Number of projects whose parsers are kept in memory,
+        defaults to :py:data:`df_script_parser.cli.DEFAULT_MAX_PROJECTS`
+    :type max_projects: int
+    :return: None
+
+    :raise :py:exc:`df_script_parser.utils.exceptions.ServerError`: If a server with the same server file is running
+    """
+    try:
+        status = get_status(server_file)
+    except ServerUnavailableError:
+        pass
+    else:
+        raise ServerError(f"Server {status['pid']} is already running, see {server_file}")
+
+    server_file = Path(server_file).absolute()
+    with ConversionServer(host, port, max_projects) as server:
+        server.save_address(server_file)
+        print(f"Listening on {host}:{server.server_address[1]}", flush=True)
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, _interrupt)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            try:
+                if _read_server_file(server_file).get("token") == server.token:
+                    server_file.unlink()
+            except (ServerUnavailableError, OSError):
+                pass
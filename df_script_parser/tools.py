@@ -1,94 +1,639 @@
-"""This module contains implementations of :py:func:`.py2yaml` and :py:func:`.yaml2py` parsers
+"""This module contains implementations of :py:func:`.py2yaml` and :py:func:`.yaml2py` parsers,
+of the :py:func:`.validate` check and of the batch conversion :py:func:`.py2yaml_batch`
 """
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from io import StringIO
 from pathlib import Path
 import typing as tp
 import logging
+import time
 
-from black import format_file_in_place, FileMode, WriteBack
+from ruamel.yaml import YAML
+from ruamel.yaml.error import YAMLError
 
-from df_script_parser.dumpers_loaders import yaml_dumper_loader
+from df_script_parser.dumpers_loaders import (
+    FORMATS,
+    YAML_MODES,
+    JsonReader,
+    JsonStreamWriter,
+    PickleReader,
+    YamlStreamReader,
+    YamlStreamWriter,
+    detect_format,
+    dump_json,
+    dump_pickle,
+    get_format,
+    get_yaml_dumper_loader,
+)
 from df_script_parser.processors.dict_processors import Disambiguator
-from df_script_parser.processors.recursive_parser import RecursiveParser
+from df_script_parser.utils.convenience_functions import RootFiles, get_root_files
+from df_script_parser.utils import profiling
 from df_script_parser.utils.namespaces import Import, From, Call
-from df_script_parser.utils.exceptions import YamlStructureError
+from df_script_parser.utils.exceptions import ManifestError, ParserError, YamlStructureError
+from df_script_parser.utils.file_watcher import FileWatcher
+from df_script_parser.utils.module_metadata import (
+    get_distribution_index,
+    get_environment_fingerprint,
+    module_info_cache,
+)
+from df_script_parser.utils.parse_cache import ParseCache, DEFAULT_MAX_CACHE_SIZE
+
+if tp.TYPE_CHECKING:
+    from df_script_parser.processors.recursive_parser import RecursiveParser
+
+FORMAT_MODES = ("full", "fast", "none")
+"""Modes of formatting files extracted by :py:func:`.yaml2py`:
+
+- ``"full"``: files are formatted with black. Black checks that the formatted code is equivalent to the source code
+- ``"fast"``: files are formatted with black without the equivalence check
+- ``"none"``: files are not formatted
+"""
+
+BATCH_ENTRY_KEYS = (
+    "root_file",
+    "project_root_dir",
+    "output_file",
+    "requirements",
+    "check_mode",
+    "check_workers",
+    "stream",
+    "output_format",
+    "yaml_mode",
+)
+"""Keys of the manifest entries of :py:func:`.py2yaml_batch`. The first three keys are required,
+the others are optional arguments of :py:func:`.py2yaml`
+"""
+
+_BATCH_PATH_KEYS = ("root_file", "project_root_dir", "output_file", "requirements")
 
 
 def py2yaml(
-    root_file: Path,
+    root_file: RootFiles,
     project_root_dir: Path,
     output_file: Path,
     requirements: tp.Optional[Path] = None,
+    cache_dir: tp.Optional[Path] = None,
+    cache_size: int = DEFAULT_MAX_CACHE_SIZE,
+    watch: bool = False,
+    poll_interval: float = 1.0,
+    workers: int = 1,
+    check_mode: str = "fast",
+    check_workers: int = 1,
+    stream: bool = False,
+    output_format: tp.Optional[str] = None,
+    yaml_mode: str = "rt",
 ):
     """Compress a dff project into a yaml file by parsing files inside PROJECT_ROOT_DIR starting with ROOT_FILE.
     Extract imports, assignments of dictionaries and function calls from each file.
     Recursively parse imported local modules. Collect non-local modules as project requirements
 
-    :param root_file: Python file to start parsing with
-    :type root_file: :py:class:`.Path`
+    :param root_file: Python file to start parsing with or several files. Modules imported by several files
+        are parsed once and all the files are stored in ``output_file``
+    :type root_file: :py:class:`.Path` | list[:py:class:`.Path`]
     :param project_root_dir: Directory that contains all the local files required to run ``root_file``
     :type project_root_dir: :py:class:`.Path`
     :param output_file: Yaml file to store parser output in
     :type output_file: :py:class:`.Path`
     :param requirements: Path to a file containing project requirements, defaults to None
     :type requirements: :pu:class:`.Path`, optional
+    :param cache_dir: Directory to cache parsed files in. Unchanged files are not parsed again, defaults to None
+    :type cache_dir: :py:class:`.Path`, optional
+    :param cache_size: Maximum size of the cache directory in bytes,
+        defaults to :py:data:`df_script_parser.utils.parse_cache.DEFAULT_MAX_CACHE_SIZE`
+    :type cache_size: int
+    :param watch: Keep running after the conversion and update ``output_file`` every time
+        files inside ``project_root_dir`` change, defaults to False
+    :type watch: bool
+    :param poll_interval: Interval between checks for changes in seconds, defaults to 1.0
+    :type poll_interval: float
+    :param workers: Number of processes used to parse files, defaults to 1
+    :type workers: int
+    :param check_mode: Mode of checking dictionary values for correctness,
+        one of :py:data:`df_script_parser.processors.dict_processors.CHECK_MODES`, defaults to ``"fast"``
+    :type check_mode: str
+    :param check_workers: Number of processes used to check dictionary values of a file in the ``"fast"`` and
+        ``"batch"`` check modes. Processes are started only for files with many values that need a pyflakes check,
+        defaults to 1
+    :type check_workers: int
+    :param stream: Write every namespace to ``output_file`` as soon as it is parsed. Namespaces are written in
+        the order they are parsed and requirements are written last, defaults to False
+    :type stream: bool
+    :param output_format: One of :py:data:`df_script_parser.dumpers_loaders.FORMATS`.
+        If None the format is chosen by the suffix of ``output_file``, defaults to None
+    :type output_format: str, optional
+    :param yaml_mode: One of :py:data:`df_script_parser.dumpers_loaders.YAML_MODES`, defaults to ``"rt"``
+    :type yaml_mode: str
     :return:
+
+    :raise :py:exc:`ValueError`:
+        If ``output_format`` is not one of :py:data:`df_script_parser.dumpers_loaders.FORMATS`,
+        ``yaml_mode`` is not one of :py:data:`df_script_parser.dumpers_loaders.YAML_MODES`
+        or if ``stream`` is used with the pickle format
     """
-    with open(Path(output_file).absolute(), "w", encoding="utf-8") as outfile:
-        dictionary = RecursiveParser(Path(project_root_dir).absolute()).parse_project_dir(Path(root_file).absolute())
+    output_format = _check_output_args(Path(output_file), stream, output_format, yaml_mode)
+    recursive_parser = create_parser(project_root_dir, cache_dir, cache_size, workers, check_mode, check_workers)
+
+    if not watch:
+        dump_project(recursive_parser, root_file, Path(output_file), requirements, stream, output_format, yaml_mode)
+        return
+
+    watcher = FileWatcher(recursive_parser.project_root_dir, files=[requirements] if requirements else [])
+    fingerprint = get_environment_fingerprint()
+    rebuild = True
+    failed = False
+    while True:
+        if rebuild:
+            try:
+                dump_project(
+                    recursive_parser, root_file, Path(output_file), requirements, stream, output_format, yaml_mode
+                )
+                logging.info("Updated %s", output_file)
+                failed = False
+            except ParserError as error:
+                logging.error("Cannot parse project: %s", error)
+                failed = True
+        time.sleep(poll_interval)
 
+        previous_snapshot = watcher.snapshot
+        changed = watcher.poll()
+        affected = recursive_parser.invalidate(changed)
+        logging.debug("Changed files: %s; affected files: %s", changed, affected)
+        # files that were not reached by a failed run are missing from the import graph
+        rebuild = bool(affected) or any(file not in previous_snapshot for file in changed) or (failed and bool(changed))
         if requirements:
-            with open(requirements, "r", encoding="utf-8") as reqs:
-                dictionary["requirements"] = [x for x in reqs.read().split("\n") if x]
+            rebuild = rebuild or Path(requirements).absolute() in changed
+
+        # installed distributions may change while watching; cached entries are keyed by the fingerprint
+        get_environment_fingerprint.cache_clear()
+        if get_environment_fingerprint() != fingerprint:
+            fingerprint = get_environment_fingerprint()
+            rebuild = True
+
+
+def _check_output_args(output_file: Path, stream: bool, output_format: tp.Optional[str], yaml_mode: str) -> str:
+    """Check the output arguments of :py:func:`.py2yaml`
 
-        yaml_dumper_loader.dump(dictionary, outfile)
+    :return: Format of ``output_file``
+    :rtype: str
 
+    :raise :py:exc:`ValueError`: If the arguments are not valid, see :py:func:`.py2yaml`
+    """
+    output_format = output_format or get_format(Path(output_file))
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown format {output_format}, expected one of {FORMATS}")
+    if stream and output_format == "pickle":
+        raise ValueError("Pickle format does not support stream mode")
+    if yaml_mode not in YAML_MODES:
+        raise ValueError(f"Unknown yaml mode {yaml_mode}, expected one of {YAML_MODES}")
+    return output_format
+
+
+def create_parser(
+    project_root_dir: Path,
+    cache_dir: tp.Optional[Path] = None,
+    cache_size: int = DEFAULT_MAX_CACHE_SIZE,
+    workers: int = 1,
+    check_mode: str = "fast",
+    check_workers: int = 1,
+) -> "RecursiveParser":
+    """Create a parser of a project. The parser can be reused by :py:func:`.dump_project`
+    and :py:func:`.validate_project` to parse only the files that changed since its last run
+
+    See :py:func:`.py2yaml` for the description of the parameters.
+
+    :return: Parser of the project
+    :rtype: :py:class:`.RecursiveParser`
+    """
+    # libcst and df_engine are imported only by the commands that parse python files
+    from df_script_parser.processors.recursive_parser import RecursiveParser  # pylint: disable=import-outside-toplevel
+
+    parse_cache = ParseCache(Path(cache_dir), cache_size) if cache_dir else None
+    return RecursiveParser(
+        Path(project_root_dir).absolute(), parse_cache, workers, check_mode, check_workers=check_workers
+    )
+
+
+@profiling.profiled("py2yaml")
+def dump_project(
+    recursive_parser: "RecursiveParser",
+    root_file: RootFiles,
+    output_file: Path,
+    requirements: tp.Optional[Path] = None,
+    stream: bool = False,
+    output_format: tp.Optional[str] = None,
+    yaml_mode: str = "rt",
+):
+    """Parse a project with a parser, write the result into a file
+
+    :param recursive_parser: Parser to use. Results of its previous parsing are discarded
+    :type recursive_parser: :py:class:`.RecursiveParser`
+    :param root_file: Python file to start parsing with or several files
+    :type root_file: :py:class:`.Path` | list[:py:class:`.Path`]
+    :param output_file: File to store parser output in
+    :type output_file: :py:class:`.Path`
+    :param requirements: Path to a file containing project requirements, defaults to None
+    :type requirements: :py:class:`.Path`, optional
+    :param stream: Write namespaces with :py:class:`.YamlStreamWriter` or :py:class:`.JsonStreamWriter`
+        as soon as they are parsed, defaults to False. If parsing fails ``output_file`` is left incomplete
+    :type stream: bool
+    :param output_format: One of :py:data:`df_script_parser.dumpers_loaders.FORMATS`.
+        If None the format is chosen by the suffix of ``output_file``, defaults to None
+    :type output_format: str, optional
+    :param yaml_mode: One of :py:data:`df_script_parser.dumpers_loaders.YAML_MODES`, defaults to ``"rt"``
+    :type yaml_mode: str
+    :return: None
+
+    :raise :py:exc:`ValueError`: If the output arguments are not valid, see :py:func:`.py2yaml`
+    """
+    output_format = _check_output_args(output_file, stream, output_format, yaml_mode)
+    recursive_parser.reset()
+    if not stream:
+        dictionary = recursive_parser.parse_project_dir(root_file)
+        _override_requirements(dictionary, requirements)
+        if output_format == "pickle":
+            with profiling.stage("dump"), open(output_file.absolute(), "wb") as binary_outfile:
+                dump_pickle(dictionary, binary_outfile)
+            return
+        with profiling.stage("dump"), open(output_file.absolute(), "w", encoding="utf-8") as outfile:
+            if output_format == "json":
+                dump_json(dictionary, outfile)
+            else:
+                get_yaml_dumper_loader(yaml_mode).dump(dictionary, outfile)
+        return
+
+    with open(output_file.absolute(), "w", encoding="utf-8") as outfile:
+        writer: tp.Union[YamlStreamWriter, JsonStreamWriter] = (
+            JsonStreamWriter(outfile) if output_format == "json" else YamlStreamWriter(outfile, yaml_mode)
+        )
+        recursive_parser.namespace_done_hook = profiling.profiled("dump")(writer.write_namespace)
+        try:
+            dictionary = recursive_parser.parse_project_dir(root_file)
+        finally:
+            recursive_parser.namespace_done_hook = None
+        _override_requirements(dictionary, requirements)
+        with profiling.stage("dump"):
+            writer.finish(dictionary["namespaces"], dictionary["requirements"])
+
+
+def validate(
+    root_file: RootFiles,
+    project_root_dir: Path,
+    cache_dir: tp.Optional[Path] = None,
+    cache_size: int = DEFAULT_MAX_CACHE_SIZE,
+    workers: int = 1,
+    check_mode: str = "fast",
+    check_workers: int = 1,
+) -> dict:
+    """Check that a dff project can be converted into a yaml file by parsing files inside PROJECT_ROOT_DIR
+    starting with ROOT_FILE. The result of parsing is not written
+
+    See :py:func:`.py2yaml` for the description of the parameters.
+
+    :return: Summary of the project, see :py:func:`.validate_project`
+    :rtype: dict
+
+    :raise :py:exc:`df_script_parser.utils.exceptions.ParserError`: If the project cannot be converted
+    """
+    recursive_parser = create_parser(project_root_dir, cache_dir, cache_size, workers, check_mode, check_workers)
+    return validate_project(recursive_parser, root_file)
+
+
+@profiling.profiled("validate")
+def validate_project(recursive_parser: "RecursiveParser", root_file: RootFiles) -> dict:
+    """Parse a project with a parser
+
+    :param recursive_parser: Parser to use. Results of its previous parsing are discarded
+    :type recursive_parser: :py:class:`.RecursiveParser`
+    :param root_file: Python file to start parsing with or several files
+    :type root_file: :py:class:`.Path` | list[:py:class:`.Path`]
+    :return: Dictionary with names of the parsed namespaces and collected requirements
+    :rtype: dict
+
+    :raise :py:exc:`df_script_parser.utils.exceptions.ParserError`: If the project cannot be converted
+    """
+    recursive_parser.reset()
+    dictionary = recursive_parser.parse_project_dir(root_file)
+    return {
+        "namespaces": [str(namespace) for namespace in dictionary["namespaces"]],
+        "requirements": dictionary["requirements"],
+    }
+
+
+def load_manifest(manifest_file: Path) -> tp.List[dict]:
+    """Read a manifest of :py:func:`.py2yaml_batch`
+
+    The manifest is a yaml or json list of mappings with :py:data:`BATCH_ENTRY_KEYS`.
+    ``root_file`` may be a list of root files. Relative paths are relative to the directory of the manifest.
+
+    :param manifest_file: File to read
+    :type manifest_file: :py:class:`.Path`
+    :return: Entries of the manifest with paths converted to :py:class:`.Path`
+    :rtype: list[dict]
+
+    :raise :py:exc:`df_script_parser.utils.exceptions.ManifestError`:
+        If the manifest cannot be read or does not have a correct structure
+    """
+    manifest_file = Path(manifest_file).absolute()
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as infile:
+            contents = YAML(typ="safe").load(infile)
+    except (OSError, YAMLError) as error:
+        raise ManifestError(f"Cannot read manifest {manifest_file}: {error}") from error
+    if not isinstance(contents, list):
+        raise ManifestError(f"Manifest {manifest_file} is not a list")
 
+    entries = []
+    for index, entry in enumerate(contents):
+        if not isinstance(entry, dict):
+            raise ManifestError(f"Entry {index} of {manifest_file} is not a mapping")
+        missing = [key for key in BATCH_ENTRY_KEYS[:3] if key not in entry]
+        unknown = [key for key in entry if key not in BATCH_ENTRY_KEYS]
+        if missing or unknown:
+            raise ManifestError(f"Entry {index} of {manifest_file}: missing keys {missing}, unknown keys {unknown}")
+        entries.append({key: _resolve_paths(manifest_file.parent, key, value) for key, value in entry.items()})
+    return entries
+
+
+def _resolve_paths(directory: Path, key: str, value: tp.Any) -> tp.Any:
+    """Resolve a path or a list of paths of a manifest entry relative to a directory"""
+    if key not in _BATCH_PATH_KEYS or value is None:
+        return value
+    if isinstance(value, list):
+        return [directory / path for path in value]
+    return directory / value
+
+
+def py2yaml_batch(
+    entries: tp.List[dict],
+    workers: int = 1,
+    cache_dir: tp.Optional[Path] = None,
+    cache_size: int = DEFAULT_MAX_CACHE_SIZE,
+    check_mode: str = "fast",
+    yaml_mode: str = "rt",
+) -> tp.List[dict]:
+    """Convert several dff projects with :py:func:`.py2yaml`. A failed project does not stop the conversion
+    of the other projects
+
+    Parser dependencies are imported and installed distributions are indexed once before the projects are
+    converted. Worker processes return the non-local modules they resolved, those are merged in the main process
+    and written to :py:attr:`df_script_parser.utils.parse_cache.ParseCache.module_info_file` once
+    all the projects are converted (if ``cache_dir`` is set).
+
+    :param entries: Arguments of :py:func:`.py2yaml` for every project, see :py:data:`BATCH_ENTRY_KEYS`
+    :type entries: list[dict]
+    :param workers: Number of processes used to convert projects, defaults to 1
+    :type workers: int
+    :param cache_dir: Directory to cache parsed files in, shared by all the projects, defaults to None
+    :type cache_dir: :py:class:`.Path`, optional
+    :param cache_size: Maximum size of the cache directory in bytes,
+        defaults to :py:data:`df_script_parser.utils.parse_cache.DEFAULT_MAX_CACHE_SIZE`
+    :type cache_size: int
+    :param check_mode: Mode of checking dictionary values for projects that do not set it, defaults to ``"fast"``
+    :type check_mode: str
+    :param yaml_mode: Yaml mode for projects that do not set it, defaults to ``"rt"``
+    :type yaml_mode: str
+    :return: Reports of the projects in the order of ``entries``. A report contains ``root_file``, ``output_file``,
+        ``status`` (``"ok"`` or ``"failed"``), ``wall_time`` in seconds and for failed projects
+        the ``error`` class name and its ``message``
+    :rtype: list[dict]
+    """
+    entries = [{"check_mode": check_mode, "yaml_mode": yaml_mode, **entry} for entry in entries]
+    _warm_up()
+    if workers <= 1:
+        return [_convert_project(entry, cache_dir, cache_size) for entry in entries]
+
+    reports = []
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_convert_project_in_worker, entry, cache_dir, cache_size) for entry in entries]
+        for entry, future in zip(entries, futures):
+            try:
+                report, fingerprint, modules = future.result()
+            except Exception as error:  # pylint: disable=broad-except
+                # the worker process running the project was terminated
+                reports.append(_get_report(entry, 0.0, error))
+                continue
+            reports.append(report)
+            # modules resolved by the workers are merged here, workers do not write the file concurrently
+            if fingerprint == get_environment_fingerprint():
+                module_info_cache.update(modules)
+    if cache_dir:
+        module_info_file = ParseCache(Path(cache_dir), cache_size).module_info_file
+        module_info_cache.load(module_info_file)
+        module_info_cache.save(module_info_file)
+    return reports
+
+
+def _warm_up() -> None:
+    """Import the parser dependencies and index installed distributions.
+    Worker processes started with the fork method inherit them
+    """
+    # pylint: disable=import-outside-toplevel
+    from df_script_parser.processors.parse import get_actor_arg_order
+    from df_script_parser.utils.validators import get_keywords
+
+    get_actor_arg_order()
+    get_keywords()
+    get_distribution_index(get_environment_fingerprint())
+
+
+def _get_report(entry: dict, wall_time: float, error: tp.Optional[BaseException] = None) -> dict:
+    """Get a report of a project converted by :py:func:`.py2yaml_batch`"""
+    return {
+        "root_file": " ".join(str(root_file) for root_file in get_root_files(entry["root_file"])),
+        "output_file": str(entry["output_file"]),
+        "status": "ok" if error is None else "failed",
+        "wall_time": wall_time,
+        "error": None if error is None else type(error).__name__,
+        "message": None if error is None else str(error),
+    }
+
+
+def _convert_project(entry: dict, cache_dir: tp.Optional[Path], cache_size: int) -> tp.Dict[str, tp.Any]:
+    """Convert a project of :py:func:`.py2yaml_batch`
+
+    :return: Report of the project
+    :rtype: dict
+    """
+    error: tp.Optional[Exception] = None
+    start = time.perf_counter()
+    try:
+        py2yaml(**entry, cache_dir=cache_dir, cache_size=cache_size)
+    except Exception as exception:  # pylint: disable=broad-except
+        logging.debug("%s: %s\nparams:\nentry=%s", type(exception), exception, entry)
+        error = exception
+    return _get_report(entry, time.perf_counter() - start, error)
+
+
+def _convert_project_in_worker(
+    entry: dict, cache_dir: tp.Optional[Path], cache_size: int
+) -> tp.Tuple[tp.Dict[str, tp.Any], tp.Optional[str], dict]:
+    """Convert a project of :py:func:`.py2yaml_batch` in a worker process
+
+    :return: Report of the project, environment fingerprint and resolved non-local modules of the worker
+    :rtype: tuple[dict, str, dict]
+    """
+    report = _convert_project(entry, cache_dir, cache_size)
+    return report, module_info_cache.fingerprint, module_info_cache.modules
+
+
+def _override_requirements(dictionary: dict, requirements: tp.Optional[Path] = None) -> None:
+    """Replace requirements collected by parser with the contents of a requirements file if it is provided"""
+    if requirements:
+        with open(requirements, "r", encoding="utf-8") as reqs:
+            dictionary["requirements"] = [x for x in reqs.read().split("\n") if x]
+
+
+@profiling.profiled("yaml2py")
 def yaml2py(
     yaml_file: Path,
     extract_to_directory: Path,
+    workers: int = 1,
+    format_mode: str = "full",
+    input_format: tp.Optional[str] = None,
+    yaml_mode: str = "rt",
 ):
     """Extract project from a yaml file to a directory
 
-    :param yaml_file: Yaml file to extract from
+    The yaml file is read one namespace at a time with :py:class:`.YamlStreamReader`.
+    Every namespace is written before the next one is read.
+    Files in json or pickle format are read with :py:class:`.JsonReader` or :py:class:`.PickleReader`.
+
+    :param yaml_file: File to load
     :type yaml_file: :py:class:`.Path`
     :param extract_to_directory: Directory to extract to
     :type extract_to_directory: :py:class:`.Path`
+    :param workers: Number of processes used to write and format files, defaults to 1
+    :type workers: int
+    :param format_mode: One of :py:data:`FORMAT_MODES`, defaults to ``"full"``
+    :type format_mode: str
+    :param input_format: One of :py:data:`df_script_parser.dumpers_loaders.FORMATS`.
+        If None the format is detected by :py:func:`df_script_parser.dumpers_loaders.detect_format`, defaults to None
+    :type input_format: str, optional
+    :param yaml_mode: One of :py:data:`df_script_parser.dumpers_loaders.YAML_MODES`, defaults to ``"rt"``
+    :type yaml_mode: str
     :return: None
+
+    :raise :py:exc:`ValueError`:
+        If ``format_mode`` is not one of :py:data:`FORMAT_MODES`
+        or ``input_format`` is not one of :py:data:`df_script_parser.dumpers_loaders.FORMATS`
+        or ``yaml_mode`` is not one of :py:data:`df_script_parser.dumpers_loaders.YAML_MODES`
+    :raise :py:exc:`df_script_parser.utils.exceptions.SerializationError`:
+        If a json or pickle file cannot be read
+    :raise :py:exc:`df_script_parser.utils.exceptions.YamlStructureError`:
+        If the yaml file contains no namespaces or no requirements. Namespaces read before
+        the error is found are extracted
     """
-    with open(Path(yaml_file).absolute(), "r", encoding="utf-8") as infile:
-        processed_file = yaml_dumper_loader.load(infile)
-    namespaces = processed_file.get("namespaces")
-    requirements = processed_file.get("requirements")
-    if not namespaces:
+    if format_mode not in FORMAT_MODES:
+        raise ValueError(f"Unknown format mode {format_mode}, expected one of {FORMAT_MODES}")
+    input_format = input_format or detect_format(Path(yaml_file))
+    if input_format not in FORMATS:
+        raise ValueError(f"Unknown format {input_format}, expected one of {FORMATS}")
+    if yaml_mode not in YAML_MODES:
+        raise ValueError(f"Unknown yaml mode {yaml_mode}, expected one of {YAML_MODES}")
+
+    with ExitStack() as stack:
+        reader: tp.Union[YamlStreamReader, JsonReader, PickleReader]
+        if input_format == "pickle":
+            reader = PickleReader(stack.enter_context(open(Path(yaml_file).absolute(), "rb")))
+        else:
+            infile = stack.enter_context(open(Path(yaml_file).absolute(), "r", encoding="utf-8"))
+            reader = JsonReader(infile) if input_format == "json" else YamlStreamReader(infile, yaml_mode)
+        executor = stack.enter_context(ProcessPoolExecutor(workers)) if workers > 1 else None
+        pending: tp.Set[Future] = set()
+        found_namespaces = False
+
+        for namespace, names in profiling.iterate("load", reader.namespaces()):
+            found_namespaces = True
+            path_to_file = _get_module_path(Path(extract_to_directory), namespace)
+            with profiling.stage("render", path_to_file):
+                source = _render_namespace(names)
+            if executor is None:
+                _write_module(path_to_file, source, format_mode)
+                continue
+            # bound the number of rendered modules waiting for a worker
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(executor.submit(_write_module, path_to_file, source, format_mode))
+
+        for future in pending:
+            future.result()
+
+    if not found_namespaces:
         raise YamlStructureError("No namespaces found")
-    if requirements is None:
+    if reader.requirements is None:
         raise YamlStructureError("No requirements found")
-
-    for namespace in namespaces:
-        path = namespace.split(".")
-        path_to_file = Path(extract_to_directory).absolute().joinpath(*path[:-1])
-        if not path_to_file.exists():
-            path_to_file.mkdir(parents=True, exist_ok=True)
-        path_to_file = path_to_file / (str(path[-1]) + ".py")
-        if path_to_file.exists():
-            logging.warning("File %s already exists", path_to_file)
-
-        with open(path_to_file, "w", encoding="utf-8") as outfile:
-            disambiguator = Disambiguator()
-            for name, value in namespaces[namespace].items():
-                if isinstance(value, (Import, From)):
-                    outfile.write(repr(value) + f" as {name}\n")
-                elif isinstance(value, Call):
-                    disambiguator.replace_lists_with_tuples = True
-                    for arg in value.args:
-                        value.args[arg] = disambiguator(value.args[arg])
-                    outfile.write(f"{name} = {repr(value)}\n")
-                    disambiguator.replace_lists_with_tuples = False
-                else:
-                    disambiguator.replace_lists_with_tuples = False
-                    outfile.write(f"{name} = {disambiguator(value)}\n")
-
-                disambiguator.add_name(name)
-        format_file_in_place(path_to_file, fast=False, mode=FileMode(), write_back=WriteBack.YES)
     with open(extract_to_directory / "requirements.txt", "w", encoding="utf-8") as reqs:
-        reqs.write("\n".join(requirements))
+        reqs.write("\n".join(reader.requirements))
+
+
+def _get_module_path(extract_to_directory: Path, namespace: str) -> Path:
+    """Get a file to extract a namespace to, create its parent directories
+
+    :param extract_to_directory: Directory to extract to
+    :type extract_to_directory: :py:class:`.Path`
+    :param namespace: Name of the namespace
+    :type namespace: str
+    :return: File to extract to
+    :rtype: :py:class:`.Path`
+    """
+    path = namespace.split(".")
+    path_to_file = extract_to_directory.absolute().joinpath(*path[:-1])
+    if not path_to_file.exists():
+        path_to_file.mkdir(parents=True, exist_ok=True)
+    path_to_file = path_to_file / (str(path[-1]) + ".py")
+    if path_to_file.exists():
+        logging.warning("File %s already exists", path_to_file)
+    return path_to_file
+
+
+def _render_namespace(names: dict) -> str:
+    """Get the source code of a namespace
+
+    :param names: Contents of a namespace loaded from a yaml file
+    :type names: dict
+    :return: Unformatted source code
+    :rtype: str
+    """
+    source = StringIO()
+    disambiguator = Disambiguator()
+    for name, value in names.items():
+        if isinstance(value, (Import, From)):
+            source.write(repr(value) + f" as {name}\n")
+        elif isinstance(value, Call):
+            disambiguator.replace_lists_with_tuples = True
+            for arg in value.args:
+                value.args[arg] = disambiguator(value.args[arg])
+            source.write(f"{name} = {repr(value)}\n")
+            disambiguator.replace_lists_with_tuples = False
+        else:
+            disambiguator.replace_lists_with_tuples = False
+            source.write(f"{name} = {disambiguator(value)}\n")
+
+        disambiguator.add_name(name)
+    return source.getvalue()
+
+
+def _write_module(path_to_file: Path, source: str, format_mode: str) -> None:
+    """Format source code, write it into a file
+
+    :param path_to_file: File to write
+    :type path_to_file: :py:class:`.Path`
+    :param source: Source code
+    :type source: str
+    :param format_mode: One of :py:data:`FORMAT_MODES`
+    :type format_mode: str
+    :return: None
+    """
+    if format_mode != "none":
+        from black import format_file_contents, FileMode, NothingChanged  # pylint: disable=import-outside-toplevel
+
+        try:
+            with profiling.stage("format", path_to_file):
+                source = format_file_contents(source, fast=format_mode == "fast", mode=FileMode())
+        except NothingChanged:
+            pass
+    with profiling.stage("write", path_to_file), open(path_to_file, "w", encoding="utf-8") as outfile:
+        outfile.write(source)
@@ -2,6 +2,7 @@
 to provide flexibility in how that python code should be displayed
 """
 from abc import ABC
+import sys
 import typing as tp
 
 from ruamel.yaml.constructor import Constructor
@@ -10,6 +11,10 @@ from ruamel.yaml.representer import Representer
 from df_script_parser.utils.convenience_functions import enquote_string
 
 
+def _intern(value: str) -> str:
+    return sys.intern(value) if type(value) is str else value  # pylint: disable=unidiomatic-typecheck
+
+
 class StringTag(ABC):
     """Abstract class for python code wrappers
 
@@ -24,8 +29,13 @@ class StringTag(ABC):
     :param display_absolute_value: Whether to display :py:attr:`StringTag.absolute_value` instead of
         :py:attr:`StringTag.display_value`, defaults to False
     :type display_absolute_value: bool
+
+    Instances use ``__slots__`` and intern their string values since identical values (e.g. keywords)
+    occur many times in a script. Hashes of subclasses are computed once and cached.
     """
 
+    __slots__ = ("display_value", "absolute_value", "show_yaml_tag", "display_absolute_value", "_hash")
+
     yaml_tag = "!tag"
 
     def __init__(
@@ -35,11 +45,31 @@ class StringTag(ABC):
         absolute_value: tp.Union[str, None] = None,
         display_absolute_value: bool = False,
     ):
-        self.display_value: str = display_value
-        self.absolute_value: str = absolute_value if absolute_value else display_value
+        self.display_value: str = _intern(display_value)
+        self.absolute_value: str = _intern(absolute_value) if absolute_value else self.display_value
         self.show_yaml_tag: bool = show_yaml_tag
         self.display_absolute_value: bool = display_absolute_value
 
+    def _get_hash(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash: int = hash(self.absolute_value)
+            return self._hash
+
+    def __getstate__(self):
+        # the cached hash is not pickled since string hashes differ between processes
+        return {
+            slot: getattr(self, slot)
+            for cls in type(self).__mro__
+            for slot in getattr(cls, "__slots__", ())
+            if slot != "_hash" and hasattr(self, slot)
+        }
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
     def __str__(self):
         return self.display_value
 
@@ -92,10 +122,12 @@ class String(StringTag):
     Overrides :py:meth:`StringTag.__repr__` to enquote its result
     """
 
+    __slots__ = ()
+
     yaml_tag = "!str"
 
     def __hash__(self):
-        return hash(self.absolute_value)
+        return self._get_hash()
 
     def __eq__(self, other):
         if isinstance(other, String):
@@ -126,6 +158,8 @@ class Python(StringTag):
     :type display_absolute_value: bool
     """
 
+    __slots__ = ()
+
     yaml_tag = "!py"
 
     def __init__(
@@ -138,7 +172,7 @@ class Python(StringTag):
         super().__init__(display_value, show_yaml_tag, absolute_value, display_absolute_value)
 
     def __hash__(self):
-        return hash(self.absolute_value)
+        return self._get_hash()
 
     def __eq__(self, other):
         if isinstance(other, Python):
@@ -1,15 +1,59 @@
 """This module contains functions that don't serve any particular purpose
 """
+import importlib.util
+import keyword
 import re
+import sys
+from functools import lru_cache
 from pathlib import Path
+from types import ModuleType
 import typing as tp
 
-import libcst as cst
 
+def lazy_import(name: str) -> ModuleType:
+    """Import a module when one of its attributes is accessed for the first time
 
-def evaluate(node: tp.Union[cst.CSTNode, str]) -> str:
+    Used for heavy pure python dependencies so that only the commands that use them pay for importing them.
+
+    :param name: Absolute name of the module
+    :type name: str
+    :return: The module if it is already imported. Otherwise a module that is executed on the first attribute access
+    :rtype: :py:class:`types.ModuleType`
+
+    :raise :py:exc:`ModuleNotFoundError`:
+        If the module is not found
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+if tp.TYPE_CHECKING:
+    import libcst as cst
+else:
+    cst = lazy_import("libcst")
+
+
+@lru_cache(maxsize=None)
+def _get_empty_module() -> "cst.Module":
+    """Module used by :py:func:`evaluate` to generate code with the default indentation and newlines"""
+    return cst.parse_module("")
+
+
+def evaluate(node: tp.Union["cst.CSTNode", str]) -> str:
     """Get string representation of :py:class:`libcst.CSTNode`
 
+    Code is generated in the context of a single empty module, so no source is parsed on each call.
+
     :param node: Node to evaluate.
     :type node: :py:class:`libcst.CSTNode` | str
     :return: String representing node
@@ -17,7 +61,38 @@ def evaluate(node: tp.Union[cst.CSTNode, str]) -> str:
     """
     if isinstance(node, str):
         return node
-    return cst.parse_module("").code_for_node(node)
+    return _get_empty_module().code_for_node(node)
+
+
+RootFiles = tp.Union[str, Path, tp.Iterable[tp.Union[str, Path]]]
+"""A root file or several root files of a project"""
+
+
+def get_root_files(root_files: RootFiles) -> tp.List[Path]:
+    """Get a list of unique absolute root files
+
+    :param root_files: A root file or several root files
+    :type root_files: str | :py:class:`pathlib.Path` | Iterable[str | :py:class:`pathlib.Path`]
+    :return: Absolute paths of the root files in the order they are passed
+    :rtype: list[:py:class:`pathlib.Path`]
+    """
+    if isinstance(root_files, (str, Path)):
+        root_files = [root_files]
+    return list(dict.fromkeys(Path(root_file).absolute() for root_file in root_files))
+
+
+def split_dotted_name(name: str) -> tp.Optional[tp.List[str]]:
+    """Split a name that consists of identifiers separated by dots
+
+    :param name: Name to split
+    :type name: str
+    :return: Identifiers. None if ``name`` is not a dotted name
+    :rtype: list[str], optional
+    """
+    parts = name.split(".")
+    if all(part.isidentifier() and not keyword.iskeyword(part) for part in parts):
+        return parts
+    return None
 
 
 def enquote_string(string: str) -> str:
@@ -52,3 +52,23 @@ class KeyNotFoundError(ScriptValidationError):
 
 class YamlStructureError(ParserError):
     """Raised when a yaml file does not have a correct structure"""
+
+
+class StaleCacheError(ParserError):
+    """Raised when cached contents of a namespace no longer match the project they were extracted from."""
+
+
+class SerializationError(ParserError):
+    """Raised when a project stored in json or pickle format cannot be read."""
+
+
+class ServerError(ParserError):
+    """Raised when the conversion server fails to execute a command."""
+
+
+class ServerUnavailableError(ServerError):
+    """Raised when no conversion server is running or it cannot be reached."""
+
+
+class ManifestError(ParserError):
+    """Raised when a manifest of a batch conversion does not have a correct structure."""
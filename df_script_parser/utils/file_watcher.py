@@ -0,0 +1,50 @@
+"""This module contains a polling file watcher
+"""
+import typing as tp
+from pathlib import Path
+
+Snapshot = tp.Dict[Path, tp.Tuple[int, int]]
+
+
+class FileWatcher:
+    """Watch files inside a directory for changes by comparing their modification times and sizes
+
+    :param directory: Directory to watch
+    :type directory: :py:class:`pathlib.Path`
+    :param pattern: Glob pattern of the files to watch inside ``directory``, defaults to ``"*.py"``
+    :type pattern: str
+    :param files: Additional files to watch, defaults to an empty tuple
+    :type files: Iterable[:py:class:`pathlib.Path`]
+    """
+
+    def __init__(self, directory: Path, pattern: str = "*.py", files: tp.Iterable[Path] = ()):
+        self.directory = Path(directory).absolute()
+        self.pattern = pattern
+        self.files = [Path(file).absolute() for file in files]
+        self.snapshot: Snapshot = self.take_snapshot()
+
+    def take_snapshot(self) -> Snapshot:
+        """Get modification times and sizes of the watched files
+
+        :return: Dictionary that maps files to their modification times and sizes
+        :rtype: dict[:py:class:`pathlib.Path`, tuple[int, int]]
+        """
+        snapshot = {}
+        for file in [*self.directory.rglob(self.pattern), *self.files]:
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[file.absolute()] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> tp.Set[Path]:
+        """Get files that were added, removed or modified since the last call
+
+        :return: Changed files
+        :rtype: set[:py:class:`pathlib.Path`]
+        """
+        snapshot = self.take_snapshot()
+        changed = {file for file in set(snapshot) | set(self.snapshot) if snapshot.get(file) != self.snapshot.get(file)}
+        self.snapshot = snapshot
+        return changed
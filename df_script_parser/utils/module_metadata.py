@@ -1,17 +1,28 @@
 """This module contains functions that retrieve module metadata
 """
+import hashlib
 import importlib.util
 import json
 import logging
+import os
+import re
+import site
+import sys
+import tempfile
 import typing as tp
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 
-import pkg_resources
-from isort import place_module
-
+from df_script_parser.utils import profiling
+from df_script_parser.utils.convenience_functions import lazy_import
 from df_script_parser.utils.exceptions import ModuleNotFoundParserError
 
+if tp.TYPE_CHECKING:
+    from importlib import metadata as importlib_metadata
+else:
+    importlib_metadata = lazy_import("importlib.metadata" if sys.version_info >= (3, 10) else "importlib_metadata")
+
 
 class ModuleType(Enum):
     """Types of modules being imported in a script
@@ -33,10 +44,97 @@ class ModuleType(Enum):
     LOCAL = "local"
 
 
+@lru_cache(maxsize=None)
+def get_environment_fingerprint() -> str:
+    """Get a fingerprint of the python environment
+
+    The fingerprint changes when the interpreter, :py:data:`sys.path` or the set of installed distributions changes.
+    Installing, upgrading or removing a distribution modifies its site directory, so modification times
+    of the site directories are used to track distributions.
+
+    :return: Hex digest identifying the environment
+    :rtype: str
+    """
+    site_dirs = list(getattr(site, "getsitepackages", lambda: [])())
+    if site.ENABLE_USER_SITE:
+        site_dirs.append(site.getusersitepackages())
+
+    fingerprint = hashlib.sha256()
+    for part in [sys.version, sys.executable, *sys.path]:
+        fingerprint.update(part.encode("utf-8") + b"\0")
+    for site_dir in sorted(set(site_dirs)):
+        try:
+            fingerprint.update(f"{site_dir}:{Path(site_dir).stat().st_mtime_ns}".encode("utf-8") + b"\0")
+        except OSError as error:
+            logging.debug("%s: %s\nparams:\nsite_dir=%s", type(error), error, site_dir)
+    return fingerprint.hexdigest()
+
+
+def _normalize_distribution_name(name: str) -> str:
+    """Normalize a distribution name according to :pep:`503`"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _get_pin(dist: "importlib_metadata.Distribution") -> tp.Optional[str]:
+    """Get a requirement pinning a distribution. See :py:func:`get_distribution_metadata` for the format"""
+    # find VCS info
+    try:
+        vcs_info = json.loads(dist.read_text("direct_url.json") or "")
+        return f"{vcs_info['vcs_info']['vcs']}+{vcs_info['url']}@{vcs_info['vcs_info']['commit_id']}"
+    except (
+        json.decoder.JSONDecodeError,
+        KeyError,
+        TypeError,
+    ) as error:
+        logging.debug("%s: %s\nparams:\ndistribution=%s", type(error), error, dist.metadata["Name"])
+
+    # find distribution pypi info
+    project_name = re.sub("[^A-Za-z0-9.]+", "-", dist.metadata["Name"])
+    return f"{project_name}=={dist.version}"
+
+
+class DistributionIndex(tp.NamedTuple):
+    """Metadata of installed distributions. Values are results of :py:func:`get_distribution_metadata`"""
+
+    by_import_name: tp.Dict[str, str]
+    """Metadata of distributions by top-level names they provide"""
+    by_name: tp.Dict[str, str]
+    """Metadata of distributions by their normalized names"""
+
+
+@lru_cache(maxsize=1)
+def get_distribution_index(fingerprint: str) -> DistributionIndex:  # pylint: disable=unused-argument
+    """Index installed distributions. Distributions are scanned once per environment
+
+    :param fingerprint: Result of :py:func:`get_environment_fingerprint`. The index is built again when it changes
+    :type fingerprint: str
+    :return: Distribution index
+    :rtype: :py:class:`DistributionIndex`
+    """
+    distributions: tp.Dict[str, importlib_metadata.Distribution] = {}
+    for dist in importlib_metadata.distributions():
+        if dist.metadata["Name"] is None:
+            continue
+        # the first distribution found on :py:data:`sys.path` is the one that is imported
+        distributions.setdefault(_normalize_distribution_name(dist.metadata["Name"]), dist)
+    by_name = {name: pin for name, pin in ((name, _get_pin(dist)) for name, dist in distributions.items()) if pin}
+
+    by_import_name = {}
+    for import_name, dist_names in importlib_metadata.packages_distributions().items():
+        candidates = [_normalize_distribution_name(dist_name) for dist_name in dist_names]
+        # prefer a distribution named after the module
+        candidates.sort(key=lambda candidate: candidate != _normalize_distribution_name(import_name))
+        for candidate in candidates:
+            if candidate in by_name:
+                by_import_name[import_name] = by_name[candidate]
+                break
+    return DistributionIndex(by_import_name, by_name)
+
+
 def get_distribution_metadata(
     module_name: str,
 ) -> tp.Optional[str]:
-    """Get metadata of a :py:attr:`ModuleType.PIP` distribution
+    """Get metadata of a :py:attr:`ModuleType.PIP` distribution that provides a top-level module
 
     :param module_name: Module name
     :type module_name: str
@@ -49,31 +147,13 @@ def get_distribution_metadata(
 
     :rtype: str, optional
     """
-    # find distribution
-    try:
-        dist = pkg_resources.get_distribution(module_name)
-    except pkg_resources.DistributionNotFound as error:
-        logging.debug("%s: %s\nparams:\nmodule=%s", type(error), error, module_name)
-        return None
-
-    # find VCS info
-    try:
-        vcs_info = json.load((Path(dist.egg_info) / "direct_url.json").open("r"))  # type: ignore
-        return f"{vcs_info['vcs_info']['vcs']}+{vcs_info['url']}@{vcs_info['vcs_info']['commit_id']}"
-    except (
-        AttributeError,
-        FileNotFoundError,
-        json.decoder.JSONDecodeError,
-        KeyError,
-    ) as error:
-        logging.debug("%s: %s\nparams:\nmodule=%s", type(error), error, module_name)
-
-    # find distribution pypi info
-    try:
-        return f"{dist.project_name}=={dist.version}"
-    except AttributeError as error:
-        logging.debug("%s: %s\nparams:\nmodule=%s", type(error), error, module_name)
-    return None
+    index = get_distribution_index(get_environment_fingerprint())
+    metadata = index.by_import_name.get(module_name)
+    if metadata is None:
+        metadata = index.by_name.get(_normalize_distribution_name(module_name))
+    if metadata is None:
+        logging.debug("Distribution not found\nparams:\nmodule=%s", module_name)
+    return metadata
 
 
 def get_local_module_location(
@@ -153,11 +233,152 @@ def get_other_module_location(
         return None
 
 
+class ModuleInfoCache:
+    """Memo of :py:func:`get_external_module_info` results
+
+    Results depend only on the python environment so they are keyed by module names and dropped every time
+    :py:func:`get_environment_fingerprint` changes. The memo can be stored in a json file to be reused by other runs.
+    """
+
+    def __init__(self):
+        self.fingerprint: tp.Optional[str] = None
+        self.modules: tp.Dict[str, tp.Optional[tp.Tuple[ModuleType, str]]] = {}
+
+    def _check_fingerprint(self) -> None:
+        fingerprint = get_environment_fingerprint()
+        if fingerprint != self.fingerprint:
+            self.fingerprint = fingerprint
+            self.modules = {}
+
+    def get(self, module_name: str) -> tp.Optional[tp.Tuple[ModuleType, str]]:
+        """Get information about a non-local module. Resolve the module if it is not in the memo
+
+        :param module_name: Name of the module
+        :type module_name: str
+        :return: Result of :py:func:`resolve_external_module`
+        :rtype: tuple[:py:class:`ModuleType`, str], optional
+        """
+        self._check_fingerprint()
+        profiling.count("module_info", module_name in self.modules)
+        if module_name not in self.modules:
+            self.modules[module_name] = resolve_external_module(module_name)
+        return self.modules[module_name]
+
+    def clear(self) -> None:
+        """Clear the memo
+
+        :return: None
+        """
+        self.fingerprint = None
+        self.modules = {}
+
+    def update(self, modules: tp.Dict[str, tp.Optional[tp.Tuple[ModuleType, str]]]) -> None:
+        """Add entries resolved in the same environment, e.g. by another process, to the memo
+
+        :param modules: Modules of another memo
+        :type modules: dict[str, tuple[:py:class:`ModuleType`, str], optional]
+        :return: None
+        """
+        self._check_fingerprint()
+        self.modules = {**modules, **self.modules}
+
+    def load(self, cache_file: Path) -> None:
+        """Add entries from a file created by :py:meth:`ModuleInfoCache.save` to the memo.
+        Entries created in a different environment are ignored
+
+        :param cache_file: File to load entries from
+        :type cache_file: :py:class:`pathlib.Path`
+        :return: None
+        """
+        self._check_fingerprint()
+        try:
+            with open(cache_file, "r", encoding="utf-8") as infile:
+                contents = json.load(infile)
+            if contents["fingerprint"] != self.fingerprint:
+                return
+            modules = {
+                module_name: None if info is None else (ModuleType(info[0]), str(info[1]))
+                for module_name, info in contents["modules"].items()
+            }
+        except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError) as error:
+            logging.debug("%s: %s\nparams:\ncache_file=%s", type(error), error, cache_file)
+            return
+        self.modules = {**modules, **self.modules}
+
+    def save(self, cache_file: Path) -> None:
+        """Save the memo into a file. The file is replaced atomically.
+        The memo is not saved if the file cannot be written
+
+        :param cache_file: File to save entries in
+        :type cache_file: :py:class:`pathlib.Path`
+        :return: None
+        """
+        self._check_fingerprint()
+        cache_file = Path(cache_file).absolute()
+        contents = {
+            "fingerprint": self.fingerprint,
+            "modules": {
+                module_name: None if info is None else [info[0].value, info[1]]
+                for module_name, info in self.modules.items()
+            },
+        }
+        temporary_file = None
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=cache_file.parent, suffix=".tmp", delete=False
+            ) as outfile:
+                temporary_file = outfile.name
+                json.dump(contents, outfile)
+            os.replace(temporary_file, cache_file)
+        except OSError as error:
+            logging.debug("%s: %s\nparams:\ncache_file=%s", type(error), error, cache_file)
+            if temporary_file is not None:
+                try:
+                    os.remove(temporary_file)
+                except OSError:
+                    pass
+
+
+module_info_cache = ModuleInfoCache()
+"""Memo used by :py:func:`get_module_info`"""
+
+
+def resolve_external_module(module_name: str) -> tp.Optional[tp.Tuple[ModuleType, str]]:
+    """Get information about a :py:attr:`ModuleType.PIP` or :py:attr:`ModuleType.SYSTEM` module
+
+    :param module_name: Name of the module
+    :type module_name: str
+    :return: A tuple of two elements. The first one is a :py:class:`ModuleType` instance. The second one is:
+
+        - result of :py:func:`get_distribution_metadata` if the first element is :py:attr:`ModuleType.PIP`
+        - name of the root module if the first element is :py:attr:`ModuleType.SYSTEM`
+
+        None if the module is neither :py:attr:`ModuleType.PIP` nor :py:attr:`ModuleType.SYSTEM`
+    :rtype: tuple[:py:class:`ModuleType`, str], optional
+    """
+    # isort is a compiled extension so it cannot be imported with ``lazy_import``
+    from isort import place_module  # pylint: disable=import-outside-toplevel
+
+    root_module = module_name.split(".")[0]
+
+    if root_module != "":
+        package_metadata = get_distribution_metadata(root_module)
+        if package_metadata is not None and get_other_module_location(module_name) is not None:
+            return ModuleType.PIP, package_metadata
+
+        if place_module(root_module) == "STDLIB" and get_other_module_location(module_name) is not None:
+            return ModuleType.SYSTEM, root_module
+    return None
+
+
+@profiling.profiled("module_resolution")
 def get_module_info(
     module_name: str,
     inside_dir: tp.Union[str, Path],
 ) -> tp.Tuple[ModuleType, str]:
-    """Get information about module
+    """Get information about module. Information about non-local modules is memoized in
+    :py:data:`module_info_cache`
 
     :param module_name: Name of the module
     :type module_name: str
@@ -174,15 +395,10 @@ def get_module_info(
         - result of :py:func:`get_local_module_location` if the first element is :py:attr:`ModuleType.LOCAL`
     :rtype: tuple[:py:class:`ModuleType`, str]
     """
-    root_module = module_name.split(".")[0]
-
-    if root_module != "":
-        package_metadata = get_distribution_metadata(root_module)
-        if package_metadata is not None and get_other_module_location(module_name) is not None:
-            return ModuleType.PIP, package_metadata
-
-        if place_module(root_module) == "STDLIB" and get_other_module_location(module_name) is not None:
-            return ModuleType.SYSTEM, root_module
+    if not module_name.startswith("."):
+        external_module_info = module_info_cache.get(module_name)
+        if external_module_info is not None:
+            return external_module_info
 
     location = get_local_module_location(module_name, inside_dir)
 
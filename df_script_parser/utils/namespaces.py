@@ -2,19 +2,35 @@
 and classes to support it.
 """
 import logging
+import sys
 import typing as tp
 from pathlib import Path
 
-import libcst as cst
 from ruamel.yaml.comments import CommentedMap
-from ruamel.yaml.constructor import Constructor
+from ruamel.yaml.constructor import Constructor, RoundTripConstructor
 from ruamel.yaml.representer import Representer
 
 from df_script_parser.utils.code_wrappers import Python, String
-from df_script_parser.utils.convenience_functions import evaluate, remove_suffix, get_module_name
-from df_script_parser.utils.exceptions import ObjectNotFoundError, ResolutionError, RequestParsingError
+from df_script_parser.utils.convenience_functions import (
+    evaluate,
+    get_module_name,
+    lazy_import,
+    remove_suffix,
+    split_dotted_name,
+)
+from df_script_parser.utils.exceptions import (
+    ObjectNotFoundError,
+    ResolutionError,
+    RequestParsingError,
+    StaleCacheError,
+)
 from df_script_parser.utils.module_metadata import ModuleType, get_module_info
 
+if tp.TYPE_CHECKING:
+    import libcst as cst
+else:
+    cst = lazy_import("libcst")
+
 
 class Import(Python):
     """This class is used to represent an object that is an imported module.
@@ -26,6 +42,8 @@ class Import(Python):
     :type module: str
     """
 
+    __slots__ = ()
+
     yaml_tag = "!import"
 
     def __init__(self, module):
@@ -51,14 +69,16 @@ class From(Python):
     :type obj: str
     """
 
+    __slots__ = ("module_name", "obj")
+
     yaml_tag = "!from"
 
     def __init__(self, module_name: str, obj: str):
         super().__init__(
             module_name + " " + obj, f"{module_name}.{obj}", show_yaml_tag=True, display_absolute_value=False
         )
-        self.module_name = module_name
-        self.obj = obj
+        self.module_name = sys.intern(module_name)
+        self.obj = sys.intern(obj)
 
     def __repr__(self):
         return f"from {self.module_name} import {self.obj}"
@@ -72,16 +92,22 @@ class From(Python):
 class AltName(Python):
     """This class is used to represent an object that refers to another object in the namespace."""
 
+    __slots__ = ()
+
 
 class ActorTag(Python):
     """This class is used as a key in a dictionary for :py:class:`.Call`. To be removed"""
 
+    __slots__ = ()
+
     yaml_tag = "!actor"
 
 
 class Call:
     """This class is used to represent a function call"""
 
+    __slots__ = ("name", "args")
+
     yaml_tag = "!call"  # TdOo: replace with actor
 
     def __init__(self, name: str, args: dict):
@@ -117,8 +143,11 @@ class Call:
         :param node: Yaml node
         :return: Instance of the class
         """
-        data = CommentedMap()
-        constructor.construct_mapping(node, data, deep=True)  # type: ignore
+        if isinstance(constructor, RoundTripConstructor):
+            data = CommentedMap()
+            constructor.construct_mapping(node, data, deep=True)  # type: ignore
+        else:
+            data = constructor.construct_mapping(node, deep=True)  # type: ignore
         return cls(**data)
 
 
@@ -128,10 +157,12 @@ class NamespaceTag(Python):
     - :py:attr:`df_script_parser.utils.code_wrappers.StringTag.show_yaml_tag` is set to False by default
     """
 
+    __slots__ = ()
+
     yaml_tag = "!namespace"
 
     def __hash__(self):
-        return hash(self.absolute_value)
+        return self._get_hash()
 
     def __eq__(self, other):
         if isinstance(other, NamespaceTag):
@@ -158,7 +189,7 @@ class Request:
 
     def __init__(
         self,
-        node: cst.CSTNode,
+        node: "cst.CSTNode",
         get_absolute_attributes: tp.Optional[tp.Callable[[tp.List[Python]], tp.List[Python]]] = None,
     ):
         self.attributes: tp.List[Python] = []
@@ -168,7 +199,7 @@ class Request:
         if get_absolute_attributes:
             self.attributes = get_absolute_attributes(self.attributes)
 
-    def _process_node(self, node: cst.CSTNode):
+    def _process_node(self, node: "cst.CSTNode"):
         """Recursively parse a node, fill :py:attr:`Request.attributes` and :py:attr:`Request.indices`
 
         :param node: Node to parse
@@ -187,7 +218,7 @@ class Request:
             # Note: If there are a lot of calls to evaluate and they hinder performance it's probably here.
             raise RequestParsingError(f"Node {evaluate(node)} is not a subscript, attribute or name.")
 
-    def _process_subscript(self, node: cst.Subscript):
+    def _process_subscript(self, node: "cst.Subscript"):
         """Recursively parse a node that is a Subscript
 
         :param node: Node to parse
@@ -210,7 +241,7 @@ class Request:
                 self.indices.insert(0, Python(evaluate(index.value)))
         self._process_node(node.value)
 
-    def _process_attribute(self, node: cst.Attribute):
+    def _process_attribute(self, node: "cst.Attribute"):
         """Recursively parse a node that is an Attribute
 
         :param node: Node to parse
@@ -222,7 +253,7 @@ class Request:
         self._process_node(node.value)
         self._process_node(node.attr)
 
-    def _process_name(self, node: cst.Name):
+    def _process_name(self, node: "cst.Name"):
         """Parse a node that is a Name
 
         :param node: Node to parse
@@ -261,6 +292,27 @@ class Request:
         )
 
 
+class NameTrieNode:
+    """Node of a prefix tree over dotted names of a :py:class:`Namespace`
+
+    :py:attr:`NameTrieNode.name` is the key of :py:attr:`Namespace.names` the path to the node spells, if any
+    """
+
+    __slots__ = ("children", "name")
+
+    def __init__(self):
+        self.children: tp.Dict[str, "NameTrieNode"] = {}
+        self.name: tp.Optional[Python] = None
+
+
+Operation = tp.Tuple[str, tuple, tp.Optional[str]]
+"""An operation performed on a :py:class:`Namespace`: name of the method called, arguments of the call and
+an absolute name of the imported object for import operations"""
+
+OPERATION_METHODS = frozenset(["add_import", "add_from_import", "add_alt_name", "add_dict", "add_function_call"])
+"""Names of the :py:class:`Namespace` methods recorded as :py:data:`Operation`"""
+
+
 class Namespace:
     """This class represents a namespace an all the objects inside it
 
@@ -275,6 +327,10 @@ class Namespace:
         created, defaults to None
     :type actor_args_check:
         Callable[[dict], None] | None, optional
+    :param add_name_hook: Function that is being called when an object is added to :py:attr:`Namespace.names`,
+        defaults to None
+    :type add_name_hook:
+        Callable[[:py:class:`.Namespace`, :py:class:`.Python`, Any], None] | None, optional
     """
 
     def __init__(
@@ -283,18 +339,64 @@ class Namespace:
         project_root_dir: Path,
         import_module_hook: tp.Optional[tp.Callable[[ModuleType, str], tp.Optional["Namespace"]]] = None,
         actor_args_check: tp.Optional[tp.Callable[[dict], None]] = None,
+        add_name_hook: tp.Optional[tp.Callable[["Namespace", Python, tp.Any], None]] = None,
     ):
         self.path = Path(path)
         self.project_root_dir = Path(project_root_dir)
         self.name: str = remove_suffix(get_module_name(self.path, self.project_root_dir), ".__init__")
         self.names: tp.Dict[Python, tp.Union[Import, From, Python, Call, dict]] = {}
+        self.operations: tp.List[Operation] = []
+        self.name_trie = NameTrieNode()
+        self.absolute_names: tp.Dict[str, tp.Optional[str]] = {}
         self.import_module_hook = import_module_hook
         self.actor_args_check = actor_args_check
+        self.add_name_hook = add_name_hook
 
     def __iter__(self):
         for name in self.names:
             yield name
 
+    def _set_name(self, name: Python, obj: tp.Union[Import, From, Python, Call, dict]) -> None:
+        self.names[name] = obj
+        node = self.name_trie
+        for part in name.absolute_value.split("."):
+            node = node.children.setdefault(part, NameTrieNode())
+        if node.name is None:
+            node.name = name
+        self.absolute_names.clear()
+        if self.add_name_hook:
+            self.add_name_hook(self, name, obj)
+
+    def clear(self) -> None:
+        """Remove all the objects and recorded operations from the namespace
+
+        :return: None
+        """
+        self.names = {}
+        self.operations = []
+        self.name_trie = NameTrieNode()
+        self.absolute_names = {}
+
+    def replay(self, operations: tp.List["Operation"]) -> None:
+        """Fill the namespace by repeating operations recorded in :py:attr:`Namespace.operations` of another namespace
+        created from the same file
+
+        Import hooks and actor argument checks are called as if the file was parsed.
+
+        :param operations: Recorded operations
+        :type operations: list[:py:data:`.Operation`]
+        :return: None
+
+        :raise :py:exc:`df_script_parser.utils.exceptions.StaleCacheError`:
+            If an import now refers to a different module than the one it referred to when it was recorded
+        """
+        for method, args, absolute_value in operations:
+            getattr(self, method)(*args)
+            if absolute_value is not None and self.operations[-1][2] != absolute_value:
+                raise StaleCacheError(
+                    f"Import {args} in {self.name} refers to {self.operations[-1][2]} instead of {absolute_value}"
+                )
+
     def process_module_import(
         self,
         module_name: str,
@@ -337,7 +439,8 @@ class Namespace:
         :return: None
         """
         import_object = Import(self.process_module_import(module_name)[0])
-        self.names[Python(alias) if alias else Python(module_name)] = import_object
+        self._set_name(Python(alias) if alias else Python(module_name), import_object)
+        self.operations.append(("add_import", (module_name, alias), import_object.absolute_value))
 
     def add_from_import(
         self,
@@ -360,7 +463,8 @@ class Namespace:
         if namespace:
             if Python(obj) not in namespace.names:
                 logging.warning("Object %s not found in %s", obj, namespace.name)
-        self.names[Python(alias) if alias else Python(obj)] = import_object
+        self._set_name(Python(alias) if alias else Python(obj), import_object)
+        self.operations.append(("add_from_import", (module_name, obj, alias), import_object.absolute_value))
 
     def add_alt_name(
         self,
@@ -377,7 +481,8 @@ class Namespace:
         """
         if Python(obj) not in self:
             raise ObjectNotFoundError(f"Not found {obj} in {self.names}")
-        self.names[Python(alias)] = AltName(obj, absolute_value=self.get_absolute_name(obj))
+        self._set_name(Python(alias), AltName(obj, absolute_value=self.get_absolute_name(obj)))
+        self.operations.append(("add_alt_name", (obj, alias), None))
 
     def add_dict(self, name: str, dictionary: dict) -> None:
         """Add a dictionary to the namespace
@@ -388,7 +493,8 @@ class Namespace:
         :type dictionary: dict
         :return:
         """
-        self.names[Python(name)] = dictionary
+        self._set_name(Python(name), dictionary)
+        self.operations.append(("add_dict", (name, dictionary), None))
 
     def add_function_call(
         self,
@@ -413,20 +519,31 @@ class Namespace:
         """
         if check_args and self.actor_args_check:
             self.actor_args_check(args)
-        self.names[ActorTag(name)] = Call(func_name, args)
+        self._set_name(ActorTag(name), Call(func_name, args))
+        self.operations.append(("add_function_call", (name, func_name, args, check_args), None))
 
     def get_absolute_name(self, name: str) -> tp.Optional[str]:
         """Get an absolute variant of a name
 
+        Results are memoized until the namespace changes
+
         :param name: Name of a local object
         :type name: str
         :return: Absolute name of the object if possible. None otherwise
         :rtype: str, optional
         """
+        if name in self.absolute_names:
+            return self.absolute_names[name]
+        parts = split_dotted_name(name)
         try:
-            return repr(Request.from_str(name, self.get_absolute_name_list))
+            if parts is not None:
+                absolute_name: tp.Optional[str] = ".".join(self._get_absolute_parts(parts))
+            else:
+                absolute_name = repr(Request.from_str(name, self.get_absolute_name_list))
         except ResolutionError:
-            return None
+            absolute_name = None
+        self.absolute_names[name] = absolute_name
+        return absolute_name
 
     def get_absolute_name_list(self, names: tp.List[Python]) -> tp.List[Python]:
         """Make an object name absolute
@@ -439,24 +556,36 @@ class Namespace:
         :return: Absolute name of the object
         :rtype: list[:py:class:`.code_wrappers.Python`]
         """
-        stack = []
-        for item in names:
-            stack.append(item)
-            name = Python(".".join(map(repr, stack)))
-            if name in self:
-                obj = self.names[name]
-                names_left = names[len(stack) :]  # noqa: E203
-                while isinstance(obj, AltName):
-                    name = obj
-                    obj = self.names[Python(name.display_value)]
-                if isinstance(obj, From):
-                    return list(map(Python, obj.module_name.split(".") + obj.obj.split("."))) + names_left
-                if isinstance(obj, Import):
-                    return list(map(Python, obj.absolute_value.split("."))) + names_left
-                if isinstance(obj, dict):
-                    if len(stack) != len(names):
-                        raise ResolutionError(
-                            f"Attempted access to an attribute {'.'.join(map(repr, names_left))} of a dict {obj}"
-                        )
-                    return list(map(Python, self.name.split("."))) + [name]
-        raise ObjectNotFoundError(f"Not found object {'.'.join(map(repr, names))} in {self.names}")
+        return list(map(Python, self._get_absolute_parts(list(map(repr, names)))))
+
+    def _get_absolute_parts(self, parts: tp.List[str]) -> tp.List[str]:
+        """Make an object name absolute. Names of the namespace are looked up in :py:attr:`Namespace.name_trie`
+
+        :param parts: Module and object names
+        :type parts: list[str]
+        :return: Absolute name of the object
+        :rtype: list[str]
+        """
+        node = self.name_trie
+        for index, part in enumerate(parts):
+            child = node.children.get(part)
+            if child is None:
+                break
+            node = child
+            if node.name is None:
+                continue
+            name: Python = node.name
+            obj = self.names[name]
+            names_left = parts[index + 1 :]  # noqa: E203
+            while isinstance(obj, AltName):
+                name = obj
+                obj = self.names[Python(name.display_value)]
+            if isinstance(obj, From):
+                return obj.module_name.split(".") + obj.obj.split(".") + names_left
+            if isinstance(obj, Import):
+                return obj.absolute_value.split(".") + names_left
+            if isinstance(obj, dict):
+                if names_left:
+                    raise ResolutionError(f"Attempted access to an attribute {'.'.join(names_left)} of a dict {obj}")
+                return self.name.split(".") + [repr(name)]
+        raise ObjectNotFoundError(f"Not found object {'.'.join(parts)} in {self.name}")
@@ -0,0 +1,149 @@
+"""This module contains a persistent cache of namespace contents extracted from parsed files
+"""
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import typing as tp
+from pathlib import Path
+
+from df_script_parser import __version__
+from df_script_parser.dumpers_loaders import load_pickle
+from df_script_parser.utils.exceptions import SerializationError
+from df_script_parser.utils.module_metadata import get_environment_fingerprint
+from df_script_parser.utils.namespaces import OPERATION_METHODS
+
+DEFAULT_MAX_CACHE_SIZE = 256 * 1024 * 1024
+"""Default size cap of a cache directory in bytes"""
+
+
+def _is_operation_list(operations: tp.Any) -> bool:
+    return isinstance(operations, list) and all(
+        isinstance(operation, tuple)
+        and len(operation) == 3
+        and operation[0] in OPERATION_METHODS
+        and isinstance(operation[1], tuple)
+        and (operation[2] is None or isinstance(operation[2], str))
+        for operation in operations
+    )
+
+
+class ParseCache:
+    """On-disk cache of :py:attr:`df_script_parser.utils.namespaces.Namespace.operations`
+
+    Entries are keyed by a hash of the file contents, the module name, the package version and
+    the environment fingerprint. Entries are written atomically so the cache directory can be shared by
+    several processes. Entries are loaded with :py:func:`df_script_parser.dumpers_loaders.load_pickle`
+    which only creates value classes of this package, invalid entries are treated as missing.
+    When the cache directory exceeds ``max_size`` least recently used entries are evicted.
+    Resolved non-local modules are stored in :py:attr:`ParseCache.module_info_file`
+    (see :py:class:`df_script_parser.utils.module_metadata.ModuleInfoCache`).
+
+    :param cache_dir: Directory to store cache entries in
+    :type cache_dir: :py:class:`pathlib.Path`
+    :param max_size: Maximum total size of the cache entries in bytes, defaults to :py:data:`DEFAULT_MAX_CACHE_SIZE`
+    :type max_size: int
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int = DEFAULT_MAX_CACHE_SIZE):
+        self.cache_dir = Path(cache_dir).absolute() / "namespaces"
+        self.module_info_file = Path(cache_dir).absolute() / "module_info.json"
+        self.max_size = max_size
+
+    @staticmethod
+    def get_key(contents: str, module_name: str) -> str:
+        """Get a key of a cache entry
+
+        :param contents: Contents of a file
+        :type contents: str
+        :param module_name: Name of the namespace the file is parsed into
+        :type module_name: str
+        :return: Key of the entry
+        :rtype: str
+        """
+        key = hashlib.sha256()
+        for part in [__version__, get_environment_fingerprint(), module_name]:
+            key.update(part.encode("utf-8") + b"\0")
+        key.update(contents.encode("utf-8"))
+        return key.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / (key + ".pickle")
+
+    def load(self, key: str) -> tp.Optional[list]:
+        """Load a cache entry, mark it as recently used
+
+        :param key: Key of the entry
+        :type key: str
+        :return: Cached operations if the entry exists and is a valid list of operations. None otherwise
+        :rtype: list, optional
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as entry:
+                operations = load_pickle(entry)
+        except FileNotFoundError:
+            return None
+        except (OSError, SerializationError) as error:
+            logging.debug("%s: %s\nparams:\nentry=%s", type(error), error, path)
+            return None
+        if not _is_operation_list(operations):
+            logging.debug("Cache entry is not a list of operations\nparams:\nentry=%s", path)
+            return None
+        try:
+            os.utime(path)
+        except OSError as error:
+            logging.debug("%s: %s\nparams:\nentry=%s", type(error), error, path)
+        return operations
+
+    def save(self, key: str, operations: list) -> None:
+        """Save a cache entry. The entry is not saved if the operations cannot be pickled
+        or the cache directory cannot be written
+
+        :param key: Key of the entry
+        :type key: str
+        :param operations: Operations to store
+        :type operations: list
+        :return: None
+        """
+        entry_name = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile("wb", dir=self.cache_dir, suffix=".tmp", delete=False) as entry:
+                entry_name = entry.name
+                pickle.dump(operations, entry, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(entry_name, self._entry_path(key))
+        except (OSError, pickle.PicklingError, AttributeError, TypeError) as error:
+            logging.debug("%s: %s\nparams:\nkey=%s", type(error), error, key)
+            if entry_name is not None:
+                try:
+                    os.remove(entry_name)
+                except OSError:
+                    pass
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache size does not exceed :py:attr:`ParseCache.max_size`
+
+        :return: None
+        """
+        entries = []
+        for path in self.cache_dir.glob("*.pickle"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as error:
+                logging.debug("%s: %s\nparams:\nentry=%s", type(error), error, path)
+                continue
+            total_size -= size
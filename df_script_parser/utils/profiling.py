@@ -0,0 +1,252 @@
+"""This module contains a lightweight profiler of conversion stages
+
+Stages are measured only while a profiler is active (see :py:func:`profile`). Otherwise :py:func:`stage`,
+:py:func:`iterate`, :py:func:`count` and functions decorated with :py:func:`profiled` do nothing
+except checking that no profiler is active.
+
+Stages measured by :py:func:`df_script_parser.tools.py2yaml`:
+
+- ``"py2yaml"``: the whole conversion
+- ``"parse_file"``: adding the contents of a file to its namespace. Files imported by the file are parsed
+  inside its ``"transform"`` stage
+- ``"read"``: reading a file
+- ``"replay"``: replaying cached operations of a file
+- ``"libcst_parse"``: parsing a file with libcst
+- ``"transform"``: transforming a parsed file with :py:class:`df_script_parser.processors.parse.Parser`
+- ``"check_values"``: checking values of a dictionary for correctness
+- ``"pyflakes"``: pyflakes runs made while checking values
+- ``"module_resolution"``: :py:func:`df_script_parser.utils.module_metadata.get_module_info`
+- ``"check_actor_args"``: validation of the :py:class:`~df_engine.core.actor.Actor` arguments
+- ``"dump"``: writing the output file
+
+:py:func:`df_script_parser.tools.validate` measures the same stages except ``"dump"``.
+Its whole run is measured as the ``"validate"`` stage instead of ``"py2yaml"``.
+
+Stages measured by :py:func:`df_script_parser.tools.yaml2py`:
+
+- ``"yaml2py"``: the whole conversion
+- ``"load"``: reading a namespace from the input file
+- ``"render"``: rendering the source code of a namespace
+- ``"format"``: formatting the source code with black
+- ``"write"``: writing a file
+
+Stages executed in worker processes (``workers > 1``) are not measured.
+"""
+import json
+import time
+import typing as tp
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+
+class StageStats:
+    """Time spent in a stage
+
+    ``wall_time`` and ``cpu_time`` include nested stages, ``self_wall_time`` and ``self_cpu_time`` do not.
+    """
+
+    __slots__ = ("calls", "wall_time", "cpu_time", "self_wall_time", "self_cpu_time")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.self_wall_time = 0.0
+        self.self_cpu_time = 0.0
+
+    def add(self, wall_time: float, cpu_time: float, child_wall_time: float, child_cpu_time: float) -> None:
+        """Add a call of the stage
+
+        :param wall_time: Wall time of the call in seconds
+        :type wall_time: float
+        :param cpu_time: CPU time of the call in seconds
+        :type cpu_time: float
+        :param child_wall_time: Wall time of the nested stages in seconds
+        :type child_wall_time: float
+        :param child_cpu_time: CPU time of the nested stages in seconds
+        :type child_cpu_time: float
+        :return: None
+        """
+        self.calls += 1
+        self.wall_time += wall_time
+        self.cpu_time += cpu_time
+        self.self_wall_time += wall_time - child_wall_time
+        self.self_cpu_time += cpu_time - child_cpu_time
+
+    def to_dict(self) -> tp.Dict[str, tp.Union[int, float]]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class Profiler:
+    """Collect wall time, CPU time and call counts of stages in total and per file. Collect cache hit rates"""
+
+    def __init__(self):
+        self.stages: tp.Dict[str, StageStats] = {}
+        self.files: tp.Dict[str, tp.Dict[str, StageStats]] = {}
+        self.caches: tp.Dict[str, tp.Dict[str, int]] = {}
+        self._children: tp.List[tp.List[float]] = []
+        self._files: tp.List[str] = []
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str, file: tp.Optional[tp.Union[str, Path]] = None) -> tp.Iterator[None]:
+        """Measure a stage
+
+        :param name: Name of the stage
+        :type name: str
+        :param file: File processed by the stage and its nested stages.
+            If None the stage is attributed to the file of the enclosing stage, defaults to None
+        :type file: str | :py:class:`pathlib.Path`, optional
+        """
+        if file is not None:
+            self._files.append(str(file))
+        children = [0.0, 0.0]
+        self._children.append(children)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall_time, cpu_time = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            self._children.pop()
+            if self._children:
+                self._children[-1][0] += wall_time
+                self._children[-1][1] += cpu_time
+            self.stages.setdefault(name, StageStats()).add(wall_time, cpu_time, *children)
+            if self._files:
+                self.files.setdefault(self._files[-1], {}).setdefault(name, StageStats()).add(
+                    wall_time, cpu_time, *children
+                )
+            if file is not None:
+                self._files.pop()
+
+    def iterate(self, name: str, iterable: tp.Iterable) -> tp.Iterator:
+        """Measure getting every item of an iterable as a stage
+
+        :param name: Name of the stage
+        :type name: str
+        :param iterable: Iterable to measure
+        :type iterable: Iterable
+        :return: Items of the iterable
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, cache: str, hit: bool) -> None:
+        """Count a cache lookup
+
+        :param cache: Name of the cache
+        :type cache: str
+        :param hit: Whether the lookup found an entry
+        :type hit: bool
+        :return: None
+        """
+        counts = self.caches.setdefault(cache, {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += 1
+
+    def to_dict(self) -> dict:
+        """Represent collected statistics in a dictionary
+
+        :return: Dictionary with the total wall and CPU time, statistics of stages in total and per file
+            and cache hit rates
+        :rtype: dict
+        """
+        return {
+            "wall_time": time.perf_counter() - self._wall_start,
+            "cpu_time": time.process_time() - self._cpu_start,
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+            "files": {
+                file: {name: stats.to_dict() for name, stats in stages.items()} for file, stages in self.files.items()
+            },
+            "caches": {
+                cache: {**counts, "hit_rate": counts["hits"] / (counts["hits"] + counts["misses"])}
+                for cache, counts in self.caches.items()
+            },
+        }
+
+    def save(self, output_file: Path) -> None:
+        """Save collected statistics into a json file
+
+        :param output_file: File to save statistics in
+        :type output_file: :py:class:`pathlib.Path`
+        :return: None
+        """
+        with open(output_file, "w", encoding="utf-8") as outfile:
+            json.dump(self.to_dict(), outfile, indent=2)
+
+
+class _NullContext:
+    """Context manager that does nothing"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_CONTEXT = _NullContext()
+
+_active: tp.Optional[Profiler] = None
+"""Profiler that collects statistics. None if profiling is disabled"""
+
+
+@contextmanager
+def profile() -> tp.Iterator[Profiler]:
+    """Collect statistics of the stages executed inside the context
+
+    :return: Profiler that collects the statistics
+    """
+    global _active  # pylint: disable=global-statement,invalid-name
+    previous, _active = _active, Profiler()
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+def stage(name: str, file: tp.Optional[tp.Union[str, Path]] = None) -> tp.ContextManager[None]:
+    """Measure a stage with the active profiler. See :py:meth:`Profiler.stage`"""
+    if _active is None:
+        return _NULL_CONTEXT
+    return _active.stage(name, file)
+
+
+def iterate(name: str, iterable: tp.Iterable) -> tp.Iterable:
+    """Measure getting every item of an iterable with the active profiler. See :py:meth:`Profiler.iterate`"""
+    if _active is None:
+        return iterable
+    return _active.iterate(name, iterable)
+
+
+def count(cache: str, hit: bool) -> None:
+    """Count a cache lookup with the active profiler. See :py:meth:`Profiler.count`"""
+    if _active is not None:
+        _active.count(cache, hit)
+
+
+def profiled(name: str) -> tp.Callable[[tp.Callable], tp.Callable]:
+    """Decorator that measures every call of a function as a stage
+
+    :param name: Name of the stage
+    :type name: str
+    """
+
+    def decorator(function: tp.Callable) -> tp.Callable:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return function(*args, **kwargs)
+            with _active.stage(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
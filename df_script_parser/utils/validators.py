@@ -2,23 +2,45 @@
 """
 import re
 import typing as tp
+from functools import lru_cache
 
 import libcst as cst
-from df_engine.core.keywords import Keywords  # type: ignore
 
 from df_script_parser.utils.code_wrappers import Python, String
 from df_script_parser.utils.convenience_functions import evaluate
 from df_script_parser.utils.exceptions import WrongFileStructureError, ScriptValidationError
 from df_script_parser.utils.namespaces import Call
 
-keywords_dict = {
-    k: [Python(k, "df_engine.core.keywords." + k), Python(k, "df_engine.core.keywords.Keywords." + k)]
-    for k in Keywords.__members__
-}
 
-keywords_list = list(map(lambda x: Python(x, "df_engine.core.keywords." + x), Keywords.__members__)) + list(
-    map(lambda x: Python(x, "df_engine.core.keywords.Keywords." + x), Keywords.__members__)
-)
+@lru_cache(maxsize=None)
+def get_keywords() -> tp.Tuple[tp.Dict[str, tp.List[Python]], tp.List[Python]]:
+    """Get names that refer to members of :py:class:`df_engine.core.keywords.Keywords`.
+    df_engine is imported on the first call
+
+    :return: Dictionary that maps every keyword to the names referring to it and a list of all the names
+    :rtype: tuple[dict[str, list[:py:class:`df_script_parser.utils.code_wrappers.Python`]],
+        list[:py:class:`df_script_parser.utils.code_wrappers.Python`]]
+    """
+    from df_engine.core.keywords import Keywords  # type: ignore # pylint: disable=import-outside-toplevel
+
+    keywords_dict = {
+        k: [Python(k, "df_engine.core.keywords." + k), Python(k, "df_engine.core.keywords.Keywords." + k)]
+        for k in Keywords.__members__
+    }
+
+    keywords_list = list(map(lambda x: Python(x, "df_engine.core.keywords." + x), Keywords.__members__)) + list(
+        map(lambda x: Python(x, "df_engine.core.keywords.Keywords." + x), Keywords.__members__)
+    )
+    return keywords_dict, keywords_list
+
+
+def __getattr__(name: str) -> tp.Any:
+    """Load ``keywords_dict`` and ``keywords_list`` on first access, see :py:func:`get_keywords`"""
+    if name == "keywords_dict":
+        return get_keywords()[0]
+    if name == "keywords_list":
+        return get_keywords()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def check_file_structure(
@@ -76,6 +98,7 @@ def validate_path(
         - If the first element of ``traversed_path`` is not :py:obj:`df_engine.core.keywords.GLOBAL` but the third
           element does not exist or is not in :py:mod:`df_engine.core.keywords`
     """
+    keywords_dict, keywords_list = get_keywords()
     if len(traversed_path) < 1:
         raise ScriptValidationError(f"No keys in a traversed path.\n" f"Keys point to: {final_value}")
     if traversed_path[0] in keywords_dict["GLOBAL"]:
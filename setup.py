@@ -66,6 +66,7 @@ setup(
     tests_require=test_requirements,
     entry_points="""
     [console_scripts]
+    df_script_parser=df_script_parser:main_cli
     df_script_parser.py2yaml=df_script_parser:py2yaml_cli
     df_script_parser.yaml2py=df_script_parser:yaml2py_cli
     """,
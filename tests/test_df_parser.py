@@ -1,12 +1,26 @@
 """Parser tests."""
+import pickle
 from pathlib import Path
 
 import pytest
 
 from df_script_parser import __version__
+from df_script_parser.processors import dict_processors
+from df_script_parser.server import ProjectPool
+from df_script_parser.processors.dict_processors import (
+    CHECK_MODES,
+    Disambiguator,
+    check_values,
+    classify,
+    get_bound_names,
+    is_correct,
+)
+from df_script_parser.utils.code_wrappers import Python, String
 from df_script_parser.utils.convenience_functions import get_module_name
 from df_script_parser.utils.exceptions import ModuleNotFoundParserError
-from df_script_parser.utils.module_metadata import get_module_info, ModuleType
+from df_script_parser.utils import module_metadata, profiling, validators
+from df_script_parser.utils.module_metadata import get_module_info, ModuleInfoCache, ModuleType
+from df_script_parser.utils.namespaces import Call, From, Import, Namespace, NamespaceTag
 
 
 def test_version():
@@ -133,3 +147,271 @@ class TestSimpleFunctions:
                 get_module_info(*args)
         else:
             assert get_module_info(*args) == answer
+
+    def test_module_info_cache(self, tmp_path, monkeypatch):
+        resolved = []
+
+        def _resolve(module_name):
+            resolved.append(module_name)
+            return module_metadata.ModuleType.SYSTEM, module_name.split(".")[0]
+
+        monkeypatch.setattr(module_metadata, "resolve_external_module", _resolve)
+        cache = ModuleInfoCache()
+        assert cache.get("os.path") == (ModuleType.SYSTEM, "os")
+        assert cache.get("os.path") == (ModuleType.SYSTEM, "os")
+        assert resolved == ["os.path"]
+
+        cache.save(tmp_path / "module_info.json")
+        new_cache = ModuleInfoCache()
+        new_cache.load(tmp_path / "module_info.json")
+        assert new_cache.get("os.path") == (ModuleType.SYSTEM, "os")
+        assert resolved == ["os.path"]
+
+        monkeypatch.setattr(module_metadata, "get_environment_fingerprint", lambda: "other environment")
+        new_cache = ModuleInfoCache()
+        new_cache.load(tmp_path / "module_info.json")
+        assert new_cache.get("os.path") == (ModuleType.SYSTEM, "os")
+        assert resolved == ["os.path", "os.path"]
+
+        # a file that cannot be written does not stop parsing
+        new_cache.save(tmp_path / "module_info.json" / "module_info.json")
+        assert [path.name for path in tmp_path.iterdir()] == ["module_info.json"]
+
+    @pytest.mark.parametrize(
+        "direct_url,answer",
+        [
+            (None, "fake.dist-name==1.0"),
+            (
+                '{"url": "https://example.com/repo.git", "vcs_info": {"vcs": "git", "commit_id": "abc"}}',
+                "git+https://example.com/repo.git@abc",
+            ),
+        ],
+    )
+    def test_get_distribution_metadata(self, tmp_path, monkeypatch, direct_url, answer):
+        dist_info = tmp_path / "fake.dist_name-1.0.dist-info"
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: fake.dist_name\nVersion: 1.0\n")
+        (dist_info / "top_level.txt").write_text("fake_module\n")
+        if direct_url:
+            (dist_info / "direct_url.json").write_text(direct_url)
+        monkeypatch.syspath_prepend(str(tmp_path))
+        module_metadata.get_environment_fingerprint.cache_clear()
+        try:
+            assert module_metadata.get_distribution_metadata("fake_module") == answer
+            assert module_metadata.get_distribution_metadata("fake_dist_name") == answer
+            assert module_metadata.get_distribution_metadata("not_installed_module") is None
+        finally:
+            monkeypatch.undo()
+            module_metadata.get_environment_fingerprint.cache_clear()
+
+    def test_get_absolute_name(self):
+        namespace = Namespace(Path("tests/test_directory/file.py"), Path("tests/test_directory"))
+        namespace.add_import("os.path")
+        namespace.add_import("os", "operating_system")
+        namespace.add_from_import("os", "path", "p")
+        namespace.add_dict("d", {})
+        namespace.add_alt_name("d", "e")
+        dict_name = f"{namespace.name}.d"
+        for name, absolute_name in [
+            ("operating_system.sep", "os.sep"),
+            ("os.path.join", "os.path.join"),
+            ("p.join", "os.path.join"),
+            ("d", dict_name),
+            ("e", dict_name),
+            ("d.attribute", None),
+            ("os", None),
+            ("cnd.true()", None),
+            ("p['key']", "os.path['key']"),
+            ("later", None),
+        ]:
+            assert namespace.get_absolute_name(name) == absolute_name
+            assert namespace.get_absolute_name(name) == absolute_name
+
+        namespace.add_dict("later", {})
+        assert namespace.get_absolute_name("later") == f"{namespace.name}.later"
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            Python("RESPONSE", "df_engine.core.keywords.RESPONSE"),
+            String("Hello"),
+            Import("os"),
+            From("os", "path"),
+            NamespaceTag("main"),
+            Call("Actor", {"script": Python("script")}),
+        ],
+    )
+    def test_value_objects(self, value):
+        assert not hasattr(value, "__dict__")
+        copy = pickle.loads(pickle.dumps(value))
+        assert repr(copy) == repr(value)
+        if not isinstance(value, Call):
+            hash(value)
+            assert copy == value
+            assert hash(copy) == hash(value)
+            assert copy.__getstate__() == value.__getstate__()
+            assert "_hash" not in value.__getstate__()
+
+    def test_value_objects_interning(self):
+        absolute_value = "".join(["df_engine.core.keywords.", "RESPONSE"])
+        first = Python("RESPONSE", absolute_value)
+        second = Python("RESPONSE", "df_engine.core.keywords." + "RESPONSE".lower().upper())
+        assert first.absolute_value is second.absolute_value
+        assert From("os", "path").absolute_value is From("os", "path").absolute_value
+
+    def test_keywords(self):
+        from df_script_parser.utils.validators import keywords_dict, keywords_list
+
+        assert keywords_dict is validators.get_keywords()[0]
+        assert keywords_list is validators.get_keywords()[1]
+        assert Python("RESPONSE", "df_engine.core.keywords.RESPONSE") in keywords_dict["RESPONSE"]
+        with pytest.raises(AttributeError):
+            getattr(validators, "missing_attribute")
+
+
+value_check_names = ["cnd", "lbl", "df_engine.core.keywords", "RESPONSE", "re"]
+value_check_values = [
+    "Hi, how are you?",
+    "node1",
+    "cnd",
+    "RESPONSE",
+    "df_engine.core.keywords.RESPONSE",
+    "df_engine.labels.repeat()",
+    'cnd.regexp(r"hi|hello", re.IGNORECASE)',
+    "cnd.all([cnd.true(),\ncnd.false()])",
+    "undefined_name(cnd)",
+    "",
+    "1",
+    "print",
+    "lambda ctx: ctx",
+    "x = 1",
+    "x",
+    "(y := 2)",
+    "import os",
+    "del cnd",
+    "cnd.true()\nlbl.repeat()",
+    "f'no placeholders'",
+    "'%s %s' % (1,)",
+    "line\rbreak",
+    "yield cnd",
+    "  indented",
+    "from __future__ import annotations",
+    "__file__",
+    "re.IGNORECASE",
+    "df_engine",
+    "'a' 'b'",
+    "...",
+    "-1",
+    "1 2",
+    "node1.",
+    "None",
+]
+
+
+class TestValueChecks:
+    @pytest.mark.parametrize(
+        "names",
+        [[], value_check_names, value_check_names + ["a[1]"]],
+    )
+    @pytest.mark.parametrize("mode", CHECK_MODES)
+    def test_check_values(self, names, mode):
+        assert check_values(names, value_check_values, mode=mode) == [
+            is_correct(names, value) for value in value_check_values
+        ]
+
+    @pytest.mark.parametrize("value", value_check_values)
+    def test_classify(self, value):
+        result = classify(get_bound_names(value_check_names), value)
+        if result is not None:
+            assert result == is_correct(value_check_names, value)
+
+    def test_get_bound_names(self):
+        assert get_bound_names(value_check_names) == {"cnd", "lbl", "df_engine", "RESPONSE", "re"}
+        assert get_bound_names(value_check_names + ["a[1]"]) is None
+
+    def test_unknown_check_mode(self):
+        with pytest.raises(ValueError):
+            check_values(value_check_names, value_check_values, mode="unknown")
+
+    def test_check_values_workers(self, monkeypatch):
+        monkeypatch.setattr(dict_processors, "MIN_VALUES_PER_WORKER", 1)
+        assert check_values(value_check_names, value_check_values, workers=2) == [
+            is_correct(value_check_names, value) for value in value_check_values
+        ]
+
+    @pytest.mark.parametrize("mode", CHECK_MODES)
+    def test_disambiguator(self, mode, monkeypatch):
+        calls = []
+
+        def _check_values(names, values, *args, **kwargs):
+            calls.append(values)
+            return check_values(names, values, *args, **kwargs)
+
+        monkeypatch.setattr(dict_processors, "check_values", _check_values)
+        disambiguator = Disambiguator(mode)
+        for name in value_check_names:
+            disambiguator.add_name(name)
+        value = {"key": value_check_values, value_check_values[-1]: {"node1": ["node1", 1]}}
+        result = disambiguator(value)
+        assert len(calls) == 1
+        assert sorted(calls[0]) == sorted(set(value_check_values) | {"key"})
+        assert [type(element) for element in list(result.values())[0]] == [
+            Python if is_correct(value_check_names, element) else String for element in value_check_values
+        ]
+        assert list(result.values())[1] == {String("node1"): [String("node1"), 1]}
+
+
+class TestProfiling:
+    def test_disabled(self):
+        profiled_function = profiling.profiled("stage")(lambda x: x + 1)
+        assert profiling.stage("stage") is profiling.stage("other_stage")
+        assert profiled_function(1) == 2
+        items = [1, 2]
+        assert profiling.iterate("stage", items) is items
+        profiling.count("cache", True)
+
+    def test_stages(self):
+        with profiling.profile() as profiler:
+            with profiling.stage("outer", "file.py"):
+                with profiling.stage("inner"):
+                    pass
+                with profiling.stage("inner", "other_file.py"):
+                    pass
+            assert list(profiling.iterate("item", [1, 2])) == [1, 2]
+            profiling.count("cache", True)
+            profiling.count("cache", False)
+            profiling.count("cache", False)
+        assert profiling.stage("stage") is profiling.stage("other_stage")
+
+        report = profiler.to_dict()
+        assert {name: stats["calls"] for name, stats in report["stages"].items()} == {"inner": 2, "outer": 1, "item": 3}
+        outer, inner = report["stages"]["outer"], report["stages"]["inner"]
+        assert outer["wall_time"] >= inner["wall_time"]
+        assert outer["self_wall_time"] == pytest.approx(outer["wall_time"] - inner["wall_time"])
+        assert report["files"]["file.py"]["inner"]["calls"] == 1
+        assert report["files"]["other_file.py"]["inner"]["calls"] == 1
+        assert report["caches"] == {"cache": {"hits": 1, "misses": 2, "hit_rate": 1 / 3}}
+
+
+class TestProjectPool:
+    def test_lru(self, tmp_path):
+        first, second = tmp_path / "first", tmp_path / "second"
+        first.mkdir()
+        second.mkdir()
+        pool = ProjectPool(max_projects=1)
+        first_parser = pool.get(first)
+        assert pool.get(first) is first_parser
+        assert pool.get(first, check_mode="batch") is not first_parser
+        second_parser = pool.get(second)
+        assert pool.get(second) is second_parser
+        assert pool.get(first) is not first_parser
+
+    def test_invalidation(self, tmp_path):
+        pool = ProjectPool()
+        recursive_parser = pool.get(tmp_path)
+        file = tmp_path / "main.py"
+        file.write_text("a = 1\n", encoding="utf-8")
+        recursive_parser.imported_by[file] = set()
+        recursive_parser.memo[file] = ("key", [])
+        assert pool.get(tmp_path) is recursive_parser
+        assert file not in recursive_parser.memo
@@ -0,0 +1,57 @@
+"""Test startup time of the cli."""
+import subprocess
+import sys
+import typing as tp
+
+import pytest
+
+IMPORT_TIME_BUDGET = 0.5
+"""Maximum cumulative time of importing :py:mod:`df_script_parser` in seconds"""
+
+RUNS = 3
+"""Number of measurements. The fastest one is compared with the budget"""
+
+HEAVY_MODULES = ["black", "libcst", "pyflakes.api", "isort", "df_engine", "pkg_resources", "df_script_parser.server"]
+"""Modules that must be imported only by the commands that use them"""
+
+COMMANDS = {
+    "import": "import df_script_parser",
+    "py2yaml --help": "from df_script_parser import py2yaml_cli; sys.argv = ['py2yaml', '--help']; py2yaml_cli()",
+    "yaml2py --help": "from df_script_parser import yaml2py_cli; sys.argv = ['yaml2py', '--help']; yaml2py_cli()",
+    "df_script_parser --help": "from df_script_parser import main_cli; sys.argv = ['df_script_parser', '--help']; "
+    "main_cli()",
+}
+
+
+def _import_times(code: str) -> tp.Dict[str, float]:
+    """Run code with ``python -X importtime``
+
+    :return: Dictionary that maps imported modules to cumulative import times in seconds
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import sys; " + code],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")  # noqa: E203
+        times[module.strip()] = int(cumulative) / 1e6
+    return times
+
+
+@pytest.mark.parametrize("command", list(COMMANDS))
+def test_heavy_modules_not_imported(command):
+    imported = _import_times(COMMANDS[command])
+    assert "df_script_parser" in imported
+    for module in HEAVY_MODULES:
+        assert module not in imported, f"{module} is imported by {command}"
+
+
+def test_import_time_budget():
+    import_time = min(_import_times(COMMANDS["import"])["df_script_parser"] for _ in range(RUNS))
+    assert import_time < IMPORT_TIME_BUDGET, f"Importing df_script_parser takes {import_time:.3f}s"
@@ -1,14 +1,51 @@
 """Test parser as a whole."""
-from io import StringIO
+import ast
+import json
+import os
+import pickle
+import threading
+from io import BytesIO, StringIO
 from pathlib import Path
 from filecmp import dircmp
+from shutil import copytree
 
 import pytest
+from ruamel.yaml import YAML
+from ruamel.yaml.nodes import ScalarNode, SequenceNode
 
-from df_script_parser.dumpers_loaders import yaml_dumper_loader
+from df_script_parser.dumpers_loaders import (
+    YAML_MODES,
+    JsonReader,
+    PickleReader,
+    YamlStreamReader,
+    detect_format,
+    from_json,
+    to_json,
+    yaml_dumper_loader,
+)
+from df_script_parser import server as server_module
+from df_script_parser import tools as tools_module
+from df_script_parser.cli import run_command, run_profiled
+from df_script_parser.processors import dict_processors
+from df_script_parser.processors.dict_processors import CHECK_MODES
+from df_script_parser.processors import recursive_parser as recursive_parser_module
 from df_script_parser.processors.recursive_parser import RecursiveParser
-from df_script_parser.utils.exceptions import ScriptValidationError, KeyNotFoundError
-from df_script_parser.tools import yaml2py
+from df_script_parser.utils.code_wrappers import Python, String
+from df_script_parser.utils.exceptions import (
+    KeyNotFoundError,
+    ManifestError,
+    ResolutionError,
+    ScriptValidationError,
+    SerializationError,
+    ServerError,
+    StarredError,
+    ServerUnavailableError,
+    YamlStructureError,
+)
+from df_script_parser.utils.file_watcher import FileWatcher
+from df_script_parser.utils.namespaces import Namespace, NamespaceTag, Request
+from df_script_parser.utils.parse_cache import ParseCache
+from df_script_parser.tools import load_manifest, py2yaml, py2yaml_batch, validate, yaml2py
 
 
 py2yaml_params = [
@@ -57,12 +94,13 @@ py2yaml_params = [
     "project_root_dir,main_file,script,exception",
     py2yaml_params,
 )
-def test_py2yaml(project_root_dir, main_file, script, exception):
+@pytest.mark.parametrize("check_mode", CHECK_MODES)
+def test_py2yaml(project_root_dir, main_file, script, exception, check_mode):
     """Test the py2yaml part of the parser."""
 
     def _test_py2yaml():
         buffer = StringIO()
-        recursive_parser = RecursiveParser(Path(project_root_dir))
+        recursive_parser = RecursiveParser(Path(project_root_dir), check_mode=check_mode)
         recursive_parser.parse_project_dir(Path(main_file))
         yaml_dumper_loader.dump(recursive_parser.to_dict(), buffer)
         buffer.seek(0)
@@ -76,6 +114,464 @@ def test_py2yaml(project_root_dir, main_file, script, exception):
         _test_py2yaml()
 
 
+@pytest.mark.parametrize(
+    "project_root_dir,main_file,script,exception",
+    py2yaml_params,
+)
+def test_py2yaml_workers(project_root_dir, main_file, script, exception):
+    """Test that py2yaml output does not depend on the number of workers."""
+
+    def _test_py2yaml():
+        buffer = StringIO()
+        recursive_parser = RecursiveParser(Path(project_root_dir), workers=2)
+        recursive_parser.parse_project_dir(Path(main_file))
+        yaml_dumper_loader.dump(recursive_parser.to_dict(), buffer)
+        with open(script, "r", encoding="utf-8") as correct_result:
+            assert buffer.getvalue() == correct_result.read()
+
+    if exception:
+        with pytest.raises(exception):
+            _test_py2yaml()
+    else:
+        _test_py2yaml()
+
+
+def test_py2yaml_check_workers(tmp_path, monkeypatch):
+    """Test that values are checked in several processes and the output does not change."""
+    executors = []
+
+    class _ProcessPoolExecutor(dict_processors.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            executors.append(args)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(dict_processors, "MIN_VALUES_PER_WORKER", 1)
+    monkeypatch.setattr(dict_processors, "ProcessPoolExecutor", _ProcessPoolExecutor)
+    project_root_dir = Path("tests/test_py2yaml/complex_tests/test_1/python_files")
+    py2yaml(
+        project_root_dir / "main.py",
+        project_root_dir,
+        tmp_path / "script.yaml",
+        check_mode="batch",
+        check_workers=2,
+    )
+    assert executors
+    with open("tests/test_py2yaml/complex_tests/test_1/yaml_files/script.yaml", "r", encoding="utf-8") as infile:
+        assert (tmp_path / "script.yaml").read_text(encoding="utf-8") == infile.read()
+
+
+def test_prefetch_process_pool(tmp_path, monkeypatch):
+    """Test that the process pool is started only when several files need parsing."""
+    executors = []
+
+    class _ProcessPoolExecutor(recursive_parser_module.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            executors.append(args)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(recursive_parser_module, "ProcessPoolExecutor", _ProcessPoolExecutor)
+    project_root_dir = Path("tests/test_py2yaml/complex_tests/test_1/python_files").absolute()
+
+    RecursiveParser(project_root_dir, ParseCache(tmp_path), workers=2).prefetch(project_root_dir / "main.py")
+    assert len(executors) == 1
+
+    recursive_parser = RecursiveParser(project_root_dir, ParseCache(tmp_path), workers=2)
+    recursive_parser.prefetch(project_root_dir / "main.py")
+    assert len(executors) == 1
+    assert project_root_dir / "main.py" in recursive_parser.memo
+
+    (tmp_path / "single").mkdir()
+    with open(tmp_path / "single" / "main.py", "w", encoding="utf-8") as outfile:
+        outfile.write("import json\n")
+    recursive_parser = RecursiveParser(tmp_path / "single", workers=2)
+    recursive_parser.prefetch(tmp_path / "single" / "main.py")
+    assert len(executors) == 1
+    assert tmp_path / "single" / "main.py" in recursive_parser.memo
+
+
+@pytest.mark.parametrize(
+    "project_root_dir,main_file,script,exception",
+    [params for params in py2yaml_params if params[3] is None],
+)
+def test_py2yaml_cache(project_root_dir, main_file, script, exception, tmp_path, monkeypatch):
+    """Test that py2yaml output does not change when files are loaded from the cache."""
+
+    def _parse_with_cache():
+        buffer = StringIO()
+        recursive_parser = RecursiveParser(Path(project_root_dir), ParseCache(tmp_path))
+        recursive_parser.parse_project_dir(Path(main_file))
+        yaml_dumper_loader.dump(recursive_parser.to_dict(), buffer)
+        return buffer.getvalue()
+
+    with open(script, "r", encoding="utf-8") as correct_result:
+        correct = correct_result.read()
+    assert _parse_with_cache() == correct
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("Cached file was parsed")
+
+    monkeypatch.setattr(recursive_parser_module.cst, "parse_module", _fail)
+    assert _parse_with_cache() == correct
+
+
+def _compose(yaml_file):
+    """Get comparable representation of yaml file nodes. Namespaces are not ordered"""
+
+    def _to_tuple(node):
+        if isinstance(node, ScalarNode):
+            return node.tag, node.value
+        if isinstance(node, SequenceNode):
+            return node.tag, [_to_tuple(item) for item in node.value]
+        return node.tag, [(_to_tuple(key), _to_tuple(value)) for key, value in node.value]
+
+    with open(yaml_file, "r", encoding="utf-8") as infile:
+        document = YAML().compose(infile)
+    result = {key.value: _to_tuple(value) for key, value in document.value}
+    result["namespaces"] = dict(result["namespaces"][1])
+    return result
+
+
+@pytest.mark.parametrize(
+    "project_root_dir,main_file,script,exception",
+    [params for params in py2yaml_params if params[3] is None],
+)
+def test_py2yaml_stream(project_root_dir, main_file, script, exception, tmp_path):
+    """Test that streamed py2yaml output contains the same namespaces."""
+    py2yaml(Path(main_file), Path(project_root_dir), tmp_path / "script.yaml", stream=True)
+    with open(tmp_path / "script.yaml", "r", encoding="utf-8") as output:
+        assert output.readline() == "namespaces:\n"
+    assert _compose(tmp_path / "script.yaml") == _compose(script)
+
+
+@pytest.mark.parametrize(
+    "project_root_dir,main_file,script,exception",
+    [params for params in py2yaml_params if params[3] is None],
+)
+@pytest.mark.parametrize(
+    "output_file,stream,reader_class",
+    [("script.json", False, JsonReader), ("script.json", True, JsonReader), ("script.pickle", False, PickleReader)],
+)
+def test_py2yaml_formats(project_root_dir, main_file, script, exception, output_file, stream, reader_class, tmp_path):
+    """Test that json and pickle outputs contain the same data as the yaml output."""
+    py2yaml(Path(main_file), Path(project_root_dir), tmp_path / output_file, stream=stream)
+    assert detect_format(tmp_path / output_file) == Path(output_file).suffix[1:]
+
+    def _dump(data):
+        buffer = StringIO()
+        yaml_dumper_loader.dump(data, buffer)
+        return buffer.getvalue()
+
+    with open(tmp_path / output_file, "rb") as infile:
+        reader = reader_class(infile)
+        namespaces = {name: _dump(names) for name, names in reader.namespaces()}
+    with open(script, "r", encoding="utf-8") as infile:
+        loaded = yaml_dumper_loader.load(infile)
+    assert namespaces == {name: _dump(names) for name, names in loaded["namespaces"].items()}
+    assert reader.requirements == loaded["requirements"]
+
+
+def test_py2yaml_formats_errors(tmp_path):
+    project_root_dir = Path("tests/test_py2yaml/simple_tests/test_1/python_files")
+    with pytest.raises(ValueError):
+        py2yaml(project_root_dir / "main.py", project_root_dir, tmp_path / "script.pickle", stream=True)
+    with pytest.raises(ValueError):
+        py2yaml(project_root_dir / "main.py", project_root_dir, tmp_path / "script", output_format="xml")
+    with pytest.raises(ValueError):
+        py2yaml(project_root_dir / "main.py", project_root_dir, tmp_path / "script.yaml", yaml_mode="c")
+
+    with pytest.raises(SerializationError):
+        list(JsonReader(StringIO('{"format": "df_script_parser", "version": 0, "namespaces": {}}')).namespaces())
+    with pytest.raises(SerializationError):
+        list(JsonReader(StringIO('{"namespaces": {}, "requirements": []}')).namespaces())
+    with pytest.raises(SerializationError):
+        from_json({"a": {"!unknown": ""}})
+    snapshot = pickle.dumps({"format": "df_script_parser", "version": 1, "namespaces": {"main": os.system}})
+    with pytest.raises(SerializationError):
+        list(PickleReader(BytesIO(snapshot)).namespaces())
+
+
+@pytest.mark.parametrize(
+    "module_name,global_name",
+    [
+        ("df_script_parser.tools", "logging.os.getcwd"),
+        ("df_script_parser.utils.namespaces", "String.__init__.__globals__"),
+        ("df_script_parser.tools", "py2yaml"),
+        ("builtins", "eval"),
+    ],
+)
+def test_pickle_forbidden_globals(module_name, global_name, monkeypatch):
+    """Test that only the value classes can be created from a pickle snapshot."""
+    calls = []
+    monkeypatch.setattr(os, "getcwd", lambda: calls.append("getcwd"))
+
+    def _unicode(string):
+        encoded = string.encode("utf-8")
+        return pickle.SHORT_BINUNICODE + bytes([len(encoded)]) + encoded
+
+    snapshot = (
+        pickle.PROTO
+        + bytes([4])
+        + _unicode(module_name)
+        + _unicode(global_name)
+        + pickle.STACK_GLOBAL
+        + pickle.EMPTY_TUPLE
+        + pickle.REDUCE
+        + pickle.STOP
+    )
+    with pytest.raises(SerializationError):
+        list(PickleReader(BytesIO(snapshot)).namespaces())
+    assert calls == []
+
+
+@pytest.mark.parametrize(
+    "project_root_dir,main_file,script,exception",
+    [params for params in py2yaml_params if params[3] is None],
+)
+@pytest.mark.parametrize("stream", [False, True])
+def test_py2yaml_fast_yaml_mode(project_root_dir, main_file, script, exception, stream, tmp_path):
+    """Test that the fast yaml dumper writes the same data."""
+    py2yaml(Path(main_file), Path(project_root_dir), tmp_path / "script.yaml", stream=stream, yaml_mode="fast")
+    assert _compose(tmp_path / "script.yaml") == _compose(script)
+
+
+def test_profile(tmp_path):
+    project_root_dir = Path("tests/test_py2yaml/complex_tests/test_1/python_files")
+    py2yaml_profile = tmp_path / "py2yaml_profile.json"
+    yaml2py_profile = tmp_path / "yaml2py_profile.json"
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    py2yaml_args = {
+        "root_file": project_root_dir / "main.py",
+        "project_root_dir": project_root_dir,
+        "output_file": tmp_path / "script.yaml",
+        "profile": py2yaml_profile,
+    }
+    run_profiled(py2yaml, py2yaml_args)
+    yaml2py_args = {
+        "yaml_file": tmp_path / "script.yaml",
+        "extract_to_directory": output_dir,
+        "profile": yaml2py_profile,
+    }
+    run_profiled(yaml2py, yaml2py_args)
+
+    with open(py2yaml_profile, "r", encoding="utf-8") as infile:
+        report = json.load(infile)
+    assert {"py2yaml", "parse_file", "read", "libcst_parse", "transform", "check_actor_args", "dump"} <= set(
+        report["stages"]
+    )
+    assert report["stages"]["py2yaml"]["calls"] == 1
+    assert str((project_root_dir / "main.py").absolute()) in report["files"]
+    assert "module_info" in report["caches"]
+
+    with open(yaml2py_profile, "r", encoding="utf-8") as infile:
+        report = json.load(infile)
+    assert {"yaml2py", "load", "render", "format", "write"} <= set(report["stages"])
+    assert str((output_dir / "python_files" / "main.py").absolute()) in report["files"]
+
+
+@pytest.mark.parametrize("cache_dir_state", ["read-only", "not a directory"])
+def test_parse_cache_unwritable(cache_dir_state, tmp_path):
+    """Test that a cache directory that cannot be written does not stop the conversion."""
+    project_root_dir = Path("tests/test_py2yaml/complex_tests/test_1/python_files")
+    if cache_dir_state == "read-only":
+        if hasattr(os, "geteuid") and os.geteuid() == 0:
+            pytest.skip("permissions are not checked for root")
+        cache_dir = tmp_path / "cache"
+        (cache_dir / "namespaces").mkdir(parents=True)
+        for directory in [cache_dir / "namespaces", cache_dir]:
+            directory.chmod(0o500)
+    else:
+        (tmp_path / "cache").write_text("")
+        cache_dir = tmp_path / "cache" / "cache"
+    try:
+        py2yaml(project_root_dir / "main.py", project_root_dir, tmp_path / "script.yaml", cache_dir=cache_dir)
+    finally:
+        if cache_dir_state == "read-only":
+            for directory in [cache_dir, cache_dir / "namespaces"]:
+                directory.chmod(0o700)
+    with open("tests/test_py2yaml/complex_tests/test_1/yaml_files/script.yaml", "r", encoding="utf-8") as infile:
+        assert (tmp_path / "script.yaml").read_text(encoding="utf-8") == infile.read()
+    if cache_dir_state == "read-only":
+        assert list(cache_dir.rglob("*")) == [cache_dir / "namespaces"]
+
+
+def test_parse_cache_eviction(tmp_path):
+    cache = ParseCache(tmp_path, max_size=0)
+    cache.save("first", [("add_dict", ("a", {}), None)])
+    assert cache.load("first") == [("add_dict", ("a", {}), None)]
+    cache.evict()
+    assert cache.load("first") is None
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        pickle.dumps([("add_dict", ("a", {"b": os.getcwd}), None)]),
+        pickle.dumps([("__setattr__", ("name", "other"), None)]),
+        pickle.dumps({"add_dict": ("a", {})}),
+        b"not a pickle",
+    ],
+)
+def test_parse_cache_invalid_entries(entry, tmp_path, monkeypatch):
+    """Test that entries with other objects or operations are treated as missing."""
+    calls = []
+    monkeypatch.setattr(os, "getcwd", lambda: calls.append("getcwd"))
+    cache = ParseCache(tmp_path)
+    cache.save("first", [])
+    (cache.cache_dir / "first.pickle").write_bytes(entry)
+    assert cache.load("first") is None
+    assert calls == []
+
+
+def test_py2yaml_incremental(tmp_path, monkeypatch):
+    """Test that only changed files and the files that import them are parsed again."""
+    project_root_dir = tmp_path / "python_files"
+    copytree("tests/test_py2yaml/complex_tests/test_1/python_files", project_root_dir)
+    recursive_parser = RecursiveParser(project_root_dir)
+    recursive_parser.parse_project_dir(project_root_dir / "main.py")
+    watcher = FileWatcher(project_root_dir)
+
+    changed_file = project_root_dir / "nodes" / "fallback_node.py"
+    changed_file.write_text('from df_engine.core.keywords import RESPONSE as rp\n\nfallback_node = {rp: "see you"}\n')
+    assert watcher.poll() == {changed_file}
+
+    affected = recursive_parser.invalidate({changed_file})
+    assert affected == {
+        changed_file,
+        project_root_dir / "nodes" / "__init__.py",
+        project_root_dir / "flows" / "start_flow.py",
+        project_root_dir / "flows" / "fallback_flow.py",
+        project_root_dir / "flows" / "__init__.py",
+        project_root_dir / "main.py",
+    }
+
+    parsed_modules = []
+
+    def _parse_module(source):
+        if source:
+            parsed_modules.append(source)
+        return parse_module(source)
+
+    parse_module = recursive_parser_module.cst.parse_module
+    monkeypatch.setattr(recursive_parser_module.cst, "parse_module", _parse_module)
+    recursive_parser.reset()
+    dictionary = recursive_parser.parse_project_dir(project_root_dir / "main.py")
+
+    assert len(parsed_modules) == len(affected)
+    buffer = StringIO()
+    yaml_dumper_loader.dump(dictionary, buffer)
+    assert "see you" in buffer.getvalue()
+
+
+def test_py2yaml_watch_after_failure(tmp_path, monkeypatch):
+    """Test that a change of a file not reached by a failed run triggers a rebuild."""
+    project_root_dir = tmp_path / "python_files"
+    copytree("tests/test_py2yaml/complex_tests/test_1/python_files", project_root_dir)
+    output_file = tmp_path / "script.yaml"
+    fill_namespace_from_file = RecursiveParser.fill_namespace_from_file
+    failed_files = []
+
+    def _fill_namespace_from_file(self, file, namespace):
+        # the first run fails while parsing main.py so the other files are not reached
+        if not failed_files:
+            failed_files.append(file)
+            raise StarredError("ImportStar is not allowed")
+        return fill_namespace_from_file(self, file, namespace)
+
+    def _edit_unreached_file():
+        assert not output_file.exists()
+        (project_root_dir / "nodes" / "start_node.py").write_text(
+            'from df_engine.core.keywords import RESPONSE as rsp\n\nstart_node = {rsp: "hello again"}\n'
+        )
+
+    steps = [_edit_unreached_file]
+
+    def _sleep(interval):
+        if not steps:
+            raise KeyboardInterrupt()
+        steps.pop(0)()
+
+    monkeypatch.setattr(RecursiveParser, "fill_namespace_from_file", _fill_namespace_from_file)
+    monkeypatch.setattr(tools_module.time, "sleep", _sleep)
+    with pytest.raises(KeyboardInterrupt):
+        py2yaml(project_root_dir / "main.py", project_root_dir, output_file, watch=True, poll_interval=0)
+    assert failed_files == [project_root_dir / "main.py"]
+    assert "hello again" in output_file.read_text(encoding="utf-8")
+
+
+def test_get_object(tmp_path):
+    for file in ["a.py", "b.py"]:
+        (tmp_path / file).touch()
+    recursive_parser = RecursiveParser(tmp_path)
+    namespace_a, namespace_b = [
+        Namespace(tmp_path / file, tmp_path, add_name_hook=recursive_parser.index_name) for file in ["a.py", "b.py"]
+    ]
+    recursive_parser.namespaces[NamespaceTag("a")] = namespace_a
+    recursive_parser.namespaces[NamespaceTag("b")] = namespace_b
+
+    namespace_a.add_dict("d", {String("key"): String("value")})
+    namespace_b.add_from_import("a", "d", "alias")
+    namespace_b.add_import("a", "module")
+    assert recursive_parser.get_object_by_name("b.alias") == {String("key"): String("value")}
+    assert recursive_parser.get_object(Request.from_str("b.module.d[1]")) == {String("key"): String("value")}
+
+    namespace_a.add_dict("d", {})
+    assert recursive_parser.get_object_by_name("b.alias") == {}
+
+    namespace_a.add_from_import("b", "cycle")
+    namespace_b.add_from_import("a", "cycle")
+    with pytest.raises(ResolutionError):
+        recursive_parser.get_object_by_name("a.cycle")
+    with pytest.raises(ResolutionError):
+        recursive_parser.get_object_by_name("b.not_found")
+
+
+def test_traverse_dict(tmp_path, monkeypatch):
+    (tmp_path / "a.py").touch()
+    recursive_parser = RecursiveParser(tmp_path)
+    namespace = Namespace(tmp_path / "a.py", tmp_path, add_name_hook=recursive_parser.index_name)
+    recursive_parser.namespaces[NamespaceTag("a")] = namespace
+    namespace.add_dict("shared", {Python("key"): String("value")})
+    namespace.add_dict("loop", {Python("key"): Python("loop", "a.loop")})
+
+    resolved = []
+    get_object_by_name = recursive_parser.get_object_by_name
+
+    def _get_object_by_name(name):
+        resolved.append(name)
+        return get_object_by_name(name)
+
+    monkeypatch.setattr(recursive_parser, "get_object_by_name", _get_object_by_name)
+
+    leaves = []
+    script = {
+        Python("flow"): {
+            Python("node_1"): Python("shared", "a.shared"),
+            Python("node_2"): Python("shared", "a.shared"),
+            Python("node_3"): Python("unknown"),
+        }
+    }
+    recursive_parser.traverse_dict(script, lambda path, value: leaves.append((list(map(repr, path)), value)))
+    assert leaves == [
+        (["flow", "node_1", "key"], String("value")),
+        (["flow", "node_2", "key"], String("value")),
+        (["flow", "node_3"], Python("unknown")),
+    ]
+    assert resolved == ["a.shared", "unknown"]
+
+    deep_script: dict = {}
+    node = deep_script
+    for _ in range(10000):
+        node[Python("key")] = node = {}
+    node[Python("key")] = String("value")
+    leaves = []
+    recursive_parser.traverse_dict(deep_script, lambda path, value: leaves.append(len(path)))
+    assert leaves == [10001]
+
+    with pytest.raises(ScriptValidationError):
+        recursive_parser.traverse_dict({Python("flow"): Python("loop", "a.loop")}, lambda path, value: None)
+
+
 yaml2py_params = [
     *[
         (
@@ -110,13 +606,19 @@ yaml2py_params = [
     "script,output_dir,exception",
     yaml2py_params,
 )
-def test_yaml2py(script, output_dir, exception, tmp_path):
+@pytest.mark.parametrize(
+    "workers,format_mode,yaml_mode", [(1, "full", "rt"), (2, "full", "rt"), (1, "fast", "rt"), (1, "fast", "fast")]
+)
+def test_yaml2py(script, output_dir, exception, tmp_path, workers, format_mode, yaml_mode):
     """Test yaml2py
 
     :param script: Yaml script to convert
     :param output_dir: Directory with a correct answer
     :param exception: Exception raised during converting
     :param tmp_path: Temporary path to convert to
+    :param workers: Number of processes used to write files
+    :param format_mode: Mode of formatting files
+    :param yaml_mode: Mode of the yaml loader
     :return:
     """
 
@@ -133,7 +635,7 @@ def test_yaml2py(script, output_dir, exception, tmp_path):
             for subdir in dir_cmp.subdirs.values():
                 _assert_dir_eq(subdir)
 
-        yaml2py(Path(script), tmp_path)
+        yaml2py(Path(script), tmp_path, workers, format_mode, yaml_mode=yaml_mode)
         _assert_dir_eq(dircmp(output_dir, tmp_path))
 
     if exception:
@@ -141,3 +643,260 @@ def test_yaml2py(script, output_dir, exception, tmp_path):
             _test_yaml2py()
     else:
         _test_yaml2py()
+
+
+@pytest.mark.parametrize(
+    "script,output_dir,exception",
+    [params for params in yaml2py_params if params[2] is None],
+)
+def test_yaml2py_unformatted(script, output_dir, exception, tmp_path):
+    yaml2py(Path(script), tmp_path, format_mode="none")
+    for file in Path(output_dir).rglob("*.py"):
+        extracted_file = tmp_path / file.relative_to(output_dir)
+        assert ast.dump(ast.parse(extracted_file.read_text())) == ast.dump(ast.parse(file.read_text()))
+
+
+@pytest.mark.parametrize(
+    "script,output_dir,exception",
+    yaml2py_params,
+)
+@pytest.mark.parametrize("yaml_mode", YAML_MODES)
+def test_yaml_stream_reader(script, output_dir, exception, yaml_mode):
+    """Test that namespaces read one at a time are the same as the namespaces of the loaded file"""
+
+    def _dump(data):
+        buffer = StringIO()
+        yaml_dumper_loader.dump(data, buffer)
+        return buffer.getvalue()
+
+    with open(script, "r", encoding="utf-8") as infile:
+        loaded = yaml_dumper_loader.load(infile)
+    with open(script, "r", encoding="utf-8") as infile:
+        reader = YamlStreamReader(infile, yaml_mode)
+        namespaces = list(reader.namespaces())
+    assert [name for name, _ in namespaces] == list(loaded["namespaces"])
+    assert _dump(dict(namespaces)) == _dump(dict(loaded["namespaces"]))
+    assert reader.requirements == loaded["requirements"]
+
+
+@pytest.mark.parametrize(
+    "script,output_dir,exception",
+    yaml2py_params,
+)
+def test_json_conversion(script, output_dir, exception):
+    """Test that converting loaded yaml to json and back does not change it"""
+
+    def _dump(data):
+        buffer = StringIO()
+        yaml_dumper_loader.dump(data, buffer)
+        return buffer.getvalue()
+
+    with open(script, "r", encoding="utf-8") as infile:
+        loaded = yaml_dumper_loader.load(infile)
+    assert _dump(from_json(json.loads(json.dumps(to_json(loaded))))) == _dump(loaded)
+
+
+@pytest.mark.parametrize("input_format", ["json", "pickle"])
+def test_yaml2py_formats(input_format, tmp_path):
+    project_root_dir = Path("tests/test_py2yaml/complex_tests/test_1/python_files")
+    py2yaml(project_root_dir / "main.py", project_root_dir, tmp_path / "script", output_format=input_format)
+    py2yaml(project_root_dir / "main.py", project_root_dir, tmp_path / "script.yaml")
+    for file, directory in [("script", input_format), ("script.yaml", "yaml")]:
+        (tmp_path / directory).mkdir()
+        yaml2py(tmp_path / file, tmp_path / directory, format_mode="fast")
+    dir_cmp = dircmp(tmp_path / "yaml", tmp_path / input_format)
+    assert dir_cmp.left_only == dir_cmp.right_only == dir_cmp.diff_files == []
+
+
+@pytest.mark.parametrize("yaml_mode", YAML_MODES)
+def test_yaml_stream_reader_structure(yaml_mode):
+    with pytest.raises(YamlStructureError):
+        list(YamlStreamReader(StringIO("- not a mapping"), yaml_mode).namespaces())
+
+
+@pytest.fixture
+def conversion_server(tmp_path):
+    """Run a conversion server in a thread, yield its server file"""
+    server = server_module.ConversionServer()
+    server_file = tmp_path / "server.json"
+    server.save_address(server_file)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server, server_file
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def test_server(conversion_server, tmp_path):
+    server, server_file = conversion_server
+    project_root_dir = Path("tests/test_py2yaml/complex_tests/test_1/python_files")
+    script = Path("tests/test_py2yaml/complex_tests/test_1/yaml_files/script.yaml")
+    args = {"root_file": project_root_dir / "main.py", "project_root_dir": project_root_dir}
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+
+    for _ in range(2):
+        server_module.send_command("py2yaml", {**args, "output_file": tmp_path / "script.yaml"}, server_file)
+        with open(tmp_path / "script.yaml", "r", encoding="utf-8") as result:
+            with open(script, "r", encoding="utf-8") as correct:
+                assert result.read() == correct.read()
+    assert server_module.get_status(server_file)["projects"] == [str(project_root_dir.absolute())]
+    recursive_parser = server.projects.get(project_root_dir)
+    assert (project_root_dir / "main.py").absolute() in recursive_parser.memo
+
+    assert server_module.send_command("validate", args, server_file) == validate(**args)
+    server_module.send_command("yaml2py", {"yaml_file": script, "extract_to_directory": output_dir}, server_file)
+    assert (output_dir / "python_files" / "main.py").exists()
+
+    server.token = "other"
+    with pytest.raises(ServerError):
+        server_module.get_status(server_file)
+    server.save_address(server_file)
+
+    project_root_dir = Path("tests/test_py2yaml/simple_tests/test_6/python_files")
+    with pytest.raises(KeyNotFoundError):
+        server_module.send_command(
+            "validate", {"root_file": project_root_dir / "main.py", "project_root_dir": project_root_dir}, server_file
+        )
+    with pytest.raises(ValueError):
+        server_module.send_command(
+            "py2yaml", {**args, "output_file": tmp_path / "script.yaml", "watch": True}, server_file
+        )
+
+
+def test_server_unavailable(tmp_path):
+    project_root_dir = Path("tests/test_py2yaml/complex_tests/test_1/python_files")
+    args = {"root_file": project_root_dir / "main.py", "project_root_dir": project_root_dir}
+    with pytest.raises(ServerUnavailableError):
+        server_module.send_command("validate", args, tmp_path / "server.json")
+    with open(tmp_path / "server.json", "w", encoding="utf-8") as outfile:
+        json.dump({"host": "127.0.0.1", "port": 1, "token": "", "version": server_module.__version__}, outfile)
+    with pytest.raises(ServerUnavailableError):
+        server_module.send_command("validate", args, tmp_path / "server.json")
+
+    cli_args = {**args, "server_file": tmp_path / "server.json", "no_server": False}
+    assert run_command("validate", cli_args) == validate(**args)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_py2yaml_batch(workers, tmp_path):
+    complex_test = Path("tests/test_py2yaml/complex_tests/test_1").absolute()
+    failing_test = Path("tests/test_py2yaml/simple_tests/test_6").absolute()
+    manifest = tmp_path / "manifest.yaml"
+    with open(manifest, "w", encoding="utf-8") as outfile:
+        YAML(typ="safe").dump(
+            [
+                {
+                    "root_file": str(failing_test / "python_files" / "main.py"),
+                    "project_root_dir": str(failing_test / "python_files"),
+                    "output_file": "failing.yaml",
+                },
+                {
+                    "root_file": str(complex_test / "python_files" / "main.py"),
+                    "project_root_dir": str(complex_test / "python_files"),
+                    "output_file": "complex.yaml",
+                },
+            ],
+            outfile,
+        )
+
+    reports = py2yaml_batch(load_manifest(manifest), workers=workers, cache_dir=tmp_path / "cache")
+    assert [(report["status"], report["error"]) for report in reports] == [
+        ("failed", "KeyNotFoundError"),
+        ("ok", None),
+    ]
+    assert reports[1]["output_file"] == str(tmp_path / "complex.yaml")
+    with open(tmp_path / "complex.yaml", "r", encoding="utf-8") as result:
+        with open(complex_test / "yaml_files" / "script.yaml", "r", encoding="utf-8") as correct:
+            assert result.read() == correct.read()
+    assert (tmp_path / "cache" / "module_info.json").exists()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_py2yaml_batch_module_info(workers, tmp_path):
+    entries = []
+    for project, module in (("first", "colorsys"), ("second", "sched")):
+        (tmp_path / project).mkdir()
+        with open(tmp_path / project / "main.py", "w", encoding="utf-8") as outfile:
+            outfile.write(f"import {module}\n")
+        entries.append(
+            {
+                "root_file": tmp_path / project / "main.py",
+                "project_root_dir": tmp_path / project,
+                "output_file": tmp_path / f"{project}.yaml",
+            }
+        )
+
+    reports = py2yaml_batch(entries, workers=workers, cache_dir=tmp_path / "cache")
+    assert [report["status"] for report in reports] == ["ok", "ok"]
+    with open(tmp_path / "cache" / "module_info.json", "r", encoding="utf-8") as infile:
+        modules = json.load(infile)["modules"]
+    assert {"colorsys", "sched"} <= set(modules)
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [
+        "root_file: main.py",
+        "- root_file: main.py\n  project_root_dir: .",
+        "- root_file: main.py\n  project_root_dir: .\n  output_file: script.yaml\n  watch: true",
+        "- [",
+    ],
+)
+def test_load_manifest_errors(contents, tmp_path):
+    manifest = tmp_path / "manifest.yaml"
+    manifest.write_text(contents, encoding="utf-8")
+    with pytest.raises(ManifestError):
+        load_manifest(manifest)
+
+
+def test_multiple_root_files(tmp_path, monkeypatch):
+    project_root_dir = tmp_path / "python_files"
+    copytree("tests/test_py2yaml/complex_tests/test_1/python_files", project_root_dir)
+    (project_root_dir / "second_main.py").write_text(
+        "\n".join(
+            [
+                "from df_engine.core.actor import Actor",
+                "from df_engine.core.keywords import GLOBAL, RESPONSE",
+                "",
+                "import flows",
+                "",
+                'script = {GLOBAL: {RESPONSE: "second"}, "start_flow": flows.sf}',
+                "",
+                'actor = Actor(start_label=("start_flow", "start_node"), script=script)',
+            ]
+        ),
+        encoding="utf-8",
+    )
+    parsed_files = []
+    parse_module = recursive_parser_module.cst.parse_module
+
+    def _parse_module(contents, *args, **kwargs):
+        parsed_files.append(contents)
+        return parse_module(contents, *args, **kwargs)
+
+    monkeypatch.setattr(recursive_parser_module.cst, "parse_module", _parse_module)
+
+    single_root = RecursiveParser(project_root_dir).parse_project_dir(project_root_dir / "main.py")
+    single_root_files = len(parsed_files)
+    parsed_files.clear()
+    multiple_roots = RecursiveParser(project_root_dir).parse_project_dir(
+        [project_root_dir / "main.py", project_root_dir / "second_main.py", project_root_dir / "main.py"]
+    )
+    assert len(parsed_files) <= single_root_files + 1
+    assert len(set(parsed_files)) == len(parsed_files)
+    assert (project_root_dir / "second_main.py").read_text(encoding="utf-8") in parsed_files
+    assert list(map(str, multiple_roots["namespaces"])) == [
+        *map(str, single_root["namespaces"]),
+        "python_files.second_main",
+    ]
+    assert multiple_roots["requirements"] == single_root["requirements"]
+
+    root_files = [project_root_dir / "main.py", project_root_dir / "second_main.py"]
+    py2yaml(root_files, project_root_dir, tmp_path / "out.yaml")
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    yaml2py(tmp_path / "out.yaml", output_dir)
+    assert (output_dir / "python_files" / "main.py").exists()
+    assert (output_dir / "python_files" / "second_main.py").exists()